@@ -0,0 +1,69 @@
+"""create flight_fares materialized view
+
+Revision ID: 0a6d2f8e4c19
+Revises: f3a9c1d7e2b5
+Create Date: 2026-10-18 19:48:37.902611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6d2f8e4c19'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c1d7e2b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Step 1: total harga dan nama bandara/kota sudah dihitung, pertanyaan harga tidak perlu join lagi
+    op.execute("""
+        CREATE MATERIALIZED VIEW flight_fares AS
+        SELECT
+            fp.id,
+            fp.flight_number,
+            fp.class,
+            fp.origin,
+            o.name AS origin_name,
+            o.city AS origin_city,
+            o.country AS origin_country,
+            fp.destination,
+            d.name AS destination_name,
+            d.city AS destination_city,
+            d.country AS destination_country,
+            fp.base_price,
+            fp.tax,
+            fp.fee,
+            fp.base_price + fp.tax + fp.fee AS total_price,
+            fp.currency,
+            fp.valid_from,
+            fp.valid_to
+        FROM flight_prices fp
+        JOIN airports o ON o.code = fp.origin
+        JOIN airports d ON d.code = fp.destination
+    """)
+
+    # Step 2: unique index wajib untuk REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index('ux_flight_fares_id', 'flight_fares', ['id'], unique=True)
+    # termurah per rute: scan berurutan total_price, berhenti di baris valid pertama
+    op.create_index('ix_flight_fares_route_total_price', 'flight_fares', ['origin', 'destination', 'total_price'])
+    op.create_index('ix_flight_fares_route_validity', 'flight_fares', ['origin', 'destination', 'valid_from', 'valid_to'])
+    op.create_index('ix_flight_fares_valid_from_id', 'flight_fares', ['valid_from', 'id'])
+    op.create_index('ix_flight_fares_total_price', 'flight_fares', ['total_price'])
+
+    # Step 3: versi flight_prices yang sudah tercermin di view
+    op.execute("""
+        INSERT INTO data_versions (table_name, version)
+        SELECT 'flight_fares', version FROM data_versions WHERE table_name = 'flight_prices'
+        ON CONFLICT (table_name) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM data_versions WHERE table_name = 'flight_fares'")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS flight_fares")
@@ -0,0 +1,128 @@
+"""create fx_rates and normalized fares
+
+Revision ID: 1b7e3a9d5f42
+Revises: 0a6d2f8e4c19
+Create Date: 2026-10-18 20:31:05.417263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7e3a9d5f42'
+down_revision: Union[str, Sequence[str], None] = '0a6d2f8e4c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FARE_COLUMNS = """
+    fp.id,
+    fp.flight_number,
+    fp.class,
+    fp.origin,
+    o.name AS origin_name,
+    o.city AS origin_city,
+    o.country AS origin_country,
+    fp.destination,
+    d.name AS destination_name,
+    d.city AS destination_city,
+    d.country AS destination_country,
+    fp.base_price,
+    fp.tax,
+    fp.fee,
+    fp.base_price + fp.tax + fp.fee AS total_price,
+    fp.currency,
+    fp.valid_from,
+    fp.valid_to
+"""
+
+FARE_INDEXES = {
+    'ix_flight_fares_route_total_price': ['origin', 'destination', 'total_price'],
+    'ix_flight_fares_route_validity': ['origin', 'destination', 'valid_from', 'valid_to'],
+    'ix_flight_fares_valid_from_id': ['valid_from', 'id'],
+    'ix_flight_fares_total_price': ['total_price'],
+}
+
+NORMALIZED_INDEXES = {
+    'ix_flight_fares_route_total_price_normalized': ['origin', 'destination', 'total_price_normalized'],
+    'ix_flight_fares_total_price_normalized': ['total_price_normalized'],
+}
+
+
+def create_fare_view(normalized: bool):
+    if normalized:
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW flight_fares AS
+            SELECT
+                {FARE_COLUMNS},
+                round((fp.base_price + fp.tax + fp.fee) * fx.rate_to_base, 2) AS total_price_normalized,
+                fx.base_currency AS normalized_currency
+            FROM flight_prices fp
+            JOIN airports o ON o.code = fp.origin
+            JOIN airports d ON d.code = fp.destination
+            LEFT JOIN fx_rates fx ON fx.currency = fp.currency
+        """)
+    else:
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW flight_fares AS
+            SELECT {FARE_COLUMNS}
+            FROM flight_prices fp
+            JOIN airports o ON o.code = fp.origin
+            JOIN airports d ON d.code = fp.destination
+        """)
+
+    op.create_index('ux_flight_fares_id', 'flight_fares', ['id'], unique=True)
+    indexes = {**FARE_INDEXES, **NORMALIZED_INDEXES} if normalized else FARE_INDEXES
+    for name, columns in indexes.items():
+        op.create_index(name, 'flight_fares', columns)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Step 1: kurs ke mata uang dasar, 1 unit currency = rate_to_base unit base_currency
+    op.create_table('fx_rates',
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('base_currency', sa.String(length=3), nullable=False),
+        sa.Column('rate_to_base', sa.Numeric(precision=18, scale=8), nullable=False),
+        sa.Column('source', sa.String(length=255), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('currency')
+    )
+    op.execute("INSERT INTO fx_rates (currency, base_currency, rate_to_base, source) VALUES ('USD', 'USD', 1, 'migration')")
+
+    # Step 2: perubahan kurs ikut menaikkan versi, sama seperti flight_prices/airports
+    op.execute("INSERT INTO data_versions (table_name, version) VALUES ('fx_rates', 1) ON CONFLICT (table_name) DO NOTHING")
+    op.execute("""
+        CREATE TRIGGER trg_fx_rates_data_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON fx_rates
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+    """)
+
+    # Step 3: view dibuat ulang dengan harga ternormalisasi, kolom baru tidak bisa di-ALTER ke materialized view
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS flight_fares")
+    create_fare_view(normalized=True)
+
+    # Step 4: versi flight_fares = jumlah versi sumbernya (flight_prices + fx_rates)
+    op.execute("""
+        UPDATE data_versions SET version = (
+            SELECT coalesce(sum(version), 0) FROM data_versions
+            WHERE table_name IN ('flight_prices', 'fx_rates')
+        )
+        WHERE table_name = 'flight_fares'
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS flight_fares")
+    create_fare_view(normalized=False)
+    op.execute("""
+        UPDATE data_versions SET version = (SELECT version FROM data_versions WHERE table_name = 'flight_prices')
+        WHERE table_name = 'flight_fares'
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS trg_fx_rates_data_version ON fx_rates")
+    op.execute("DELETE FROM data_versions WHERE table_name = 'fx_rates'")
+    op.drop_table('fx_rates')
@@ -0,0 +1,44 @@
+"""add flight_prices fare key
+
+Revision ID: 2c8f4b1e7a63
+Revises: 1b7e3a9d5f42
+Create Date: 2026-10-18 21:12:48.266094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8f4b1e7a63'
+down_revision: Union[str, Sequence[str], None] = '1b7e3a9d5f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FARE_KEY = ['flight_number', 'class', 'origin', 'destination', 'valid_from']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Step 1: duplikat lama dibuang, yang terakhir diubah/dibuat yang dipertahankan
+    op.execute(f"""
+        DELETE FROM flight_prices fp
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY {', '.join(FARE_KEY)}
+                ORDER BY coalesce(updated_at, created_at) DESC, id
+            ) AS rank
+            FROM flight_prices
+        ) ranked
+        WHERE fp.id = ranked.id AND ranked.rank > 1
+    """)
+
+    # Step 2: target ON CONFLICT untuk upsert ingestion
+    op.create_index('ux_flight_prices_fare_key', 'flight_prices', FARE_KEY, unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_flight_prices_fare_key', table_name='flight_prices')
@@ -0,0 +1,65 @@
+"""add langchain_pg_embedding content hash index
+
+Revision ID: 3d9a6c2f8b17
+Revises: 2c8f4b1e7a63
+Create Date: 2026-10-18 21:58:20.731549
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from api.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9a6c2f8b17'
+down_revision: Union[str, Sequence[str], None] = '2c8f4b1e7a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# sama dengan b94f0e3a6d18
+EMBEDDING_DIMENSIONS = settings.EMBEDDING_DIMENSIONS
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Step 1: tabel PGVector, dibuat di sini kalau belum pernah ada PGVector.from_documents;
+    # ingestion batch menulis langsung ke tabel ini
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS langchain_pg_collection (
+            name varchar,
+            cmetadata jsonb,
+            uuid uuid PRIMARY KEY
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS langchain_pg_embedding (
+            collection_id uuid REFERENCES langchain_pg_collection (uuid) ON DELETE CASCADE,
+            embedding vector,
+            document varchar,
+            cmetadata jsonb,
+            custom_id varchar,
+            uuid uuid PRIMARY KEY
+        )
+    """)
+
+    # Step 2: index HNSW dari b94f0e3a6d18, yang dilewati kalau tabelnya belum ada saat itu
+    op.execute(f"""
+        CREATE INDEX IF NOT EXISTS ix_langchain_pg_embedding_hnsw
+        ON langchain_pg_embedding
+        USING hnsw ((embedding::vector({EMBEDDING_DIMENSIONS})) vector_cosine_ops)
+    """)
+
+    # Step 3: dedup ingestion vector store, satu konten per collection;
+    # dokumen lama tanpa hash (NULL) tidak terpengaruh
+    op.execute("""
+        CREATE UNIQUE INDEX ux_langchain_pg_embedding_content_hash
+        ON langchain_pg_embedding (collection_id, (cmetadata->>'content_hash'))
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_langchain_pg_embedding_content_hash', table_name='langchain_pg_embedding')
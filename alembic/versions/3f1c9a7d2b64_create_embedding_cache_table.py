@@ -0,0 +1,41 @@
+"""create embedding cache table
+
+Revision ID: 3f1c9a7d2b64
+Revises: a8f49162d4d7
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = 'a8f49162d4d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    op.create_table('embedding_cache',
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('text_hash', sa.String(length=64), nullable=False),
+        sa.Column('embedding', Vector(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('model', 'text_hash', name='pk_embedding_cache')
+    )
+    # dipakai saat prune entry yang paling lama tidak dipakai
+    op.create_index('ix_embedding_cache_last_used_at', 'embedding_cache', ['last_used_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embedding_cache_last_used_at', table_name='embedding_cache')
+    op.drop_table('embedding_cache')
@@ -0,0 +1,85 @@
+"""create semantic answer cache and data versions
+
+Revision ID: 7b2e5d90c4a1
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 13:40:02.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+from api.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e5d90c4a1'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = ('flight_prices', 'airports')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('data_versions',
+        sa.Column('table_name', sa.String(length=63), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+    # Step 1: function yang menaikkan versi tabel setiap ada perubahan data
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO data_versions (table_name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, now())
+            ON CONFLICT (table_name)
+            DO UPDATE SET version = data_versions.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Step 2: trigger level statement, jadi bulk load hanya menaikkan versi sekali
+    for table_name in TRACKED_TABLES:
+        op.execute(f"INSERT INTO data_versions (table_name, version) VALUES ('{table_name}', 1)")
+        op.execute(f"""
+            CREATE TRIGGER trg_{table_name}_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table_name}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+        """)
+
+    op.create_table('semantic_answer_cache',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('question', sa.Text(), nullable=False),
+        sa.Column('embedding', Vector(settings.EMBEDDING_DIMENSIONS), nullable=False),
+        sa.Column('sql', sa.Text(), nullable=False),
+        sa.Column('result_fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('answer', sa.Text(), nullable=False),
+        sa.Column('data_version', sa.BigInteger(), nullable=False),
+        sa.Column('resolved_date', sa.Date(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.execute("""
+        CREATE INDEX ix_semantic_answer_cache_embedding
+        ON semantic_answer_cache USING hnsw (embedding vector_cosine_ops)
+    """)
+    op.create_index('ix_semantic_answer_cache_version_date', 'semantic_answer_cache', ['data_version', 'resolved_date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_semantic_answer_cache_version_date', table_name='semantic_answer_cache')
+    op.drop_index('ix_semantic_answer_cache_embedding', table_name='semantic_answer_cache')
+    op.drop_table('semantic_answer_cache')
+
+    for table_name in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_data_version ON {table_name}")
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    op.drop_table('data_versions')
@@ -0,0 +1,45 @@
+"""add hnsw index to langchain_pg_embedding
+
+Revision ID: b94f0e3a6d18
+Revises: 7b2e5d90c4a1
+Create Date: 2026-10-18 15:02:19.804417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from api.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b94f0e3a6d18'
+down_revision: Union[str, Sequence[str], None] = '7b2e5d90c4a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIMENSIONS = settings.EMBEDDING_DIMENSIONS
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # langchain_pg_embedding dibuat oleh PGVector, bukan oleh alembic.
+    # Kolom embedding tidak punya dimensi, jadi index dibuat di atas expression
+    # cast ke vector(EMBEDDING_DIMENSIONS) yang sama persis dengan query di ChatBotRepositories.
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF to_regclass('langchain_pg_embedding') IS NOT NULL THEN
+                CREATE INDEX IF NOT EXISTS ix_langchain_pg_embedding_hnsw
+                ON langchain_pg_embedding
+                USING hnsw ((embedding::vector({EMBEDDING_DIMENSIONS})) vector_cosine_ops);
+            END IF;
+        END
+        $$;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_langchain_pg_embedding_hnsw")
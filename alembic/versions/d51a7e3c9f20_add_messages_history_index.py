@@ -0,0 +1,33 @@
+"""add messages history index
+
+Revision ID: d51a7e3c9f20
+Revises: b94f0e3a6d18
+Create Date: 2026-10-18 16:11:42.530187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd51a7e3c9f20'
+down_revision: Union[str, Sequence[str], None] = 'b94f0e3a6d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # dipakai MessageRepository.get_recent_messages: keyset (created_at, id) per conversation
+    op.create_index(
+        'ix_messages_conversation_created_at_id',
+        'messages',
+        ['conversation_id', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_conversation_created_at_id', table_name='messages')
@@ -0,0 +1,32 @@
+"""add summary to conversations
+
+Revision ID: e8c2b4f61a37
+Revises: d51a7e3c9f20
+Create Date: 2026-10-18 16:48:05.211934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c2b4f61a37'
+down_revision: Union[str, Sequence[str], None] = 'd51a7e3c9f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('conversations', sa.Column('summary_message_id', sa.UUID(), nullable=True))
+    op.add_column('conversations', sa.Column('summary_updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('conversations', 'summary_updated_at')
+    op.drop_column('conversations', 'summary_message_id')
+    op.drop_column('conversations', 'summary')
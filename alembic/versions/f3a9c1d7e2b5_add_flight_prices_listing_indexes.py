@@ -0,0 +1,38 @@
+"""add flight_prices listing indexes
+
+Revision ID: f3a9c1d7e2b5
+Revises: e8c2b4f61a37
+Create Date: 2026-10-18 19:02:14.318440
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c1d7e2b5'
+down_revision: Union[str, Sequence[str], None] = 'e8c2b4f61a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# dipakai flight_listing_stmt: filter equality di depan, lalu keyset (valid_from, id)
+LISTING_INDEXES = {
+    'ix_flight_prices_valid_from_id': ['valid_from', 'id'],
+    'ix_flight_prices_origin_valid_from_id': ['origin', 'valid_from', 'id'],
+    'ix_flight_prices_destination_valid_from_id': ['destination', 'valid_from', 'id'],
+    'ix_flight_prices_route_valid_from_id': ['origin', 'destination', 'valid_from', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in LISTING_INDEXES.items():
+        op.create_index(name, 'flight_prices', columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in LISTING_INDEXES:
+        op.drop_index(name, table_name='flight_prices')
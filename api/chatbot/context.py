@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import logging
+import time
+
+from api.chatbot.repositories import ChatBotRepositories
+from api.config import settings
+from api.database.client import engine
+
+
+class SchemaContextCache:
+    """
+    Prebuilt "SCHEMA DATABASE" context for the prompts.
+
+    The schema documents only change when the vector store is written, so
+    they are loaded once, joined into the prompt context and stamped with a
+    version that is bumped whenever their content changes. While the whole
+    store fits in one retrieval (SCHEMA_CONTEXT_MAX_DOCUMENTS), questions
+    are served from this context and skip the embedding and vector search.
+    """
+
+    def __init__(
+            self,
+            max_documents: int,
+            chatbot_repo: ChatBotRepositories | None = None,
+        ):
+        self.max_documents = max_documents
+        self.__chatbot_repo = chatbot_repo or ChatBotRepositories()
+        self.context = ""
+        self.document_count = 0
+        self.version = 0
+        self.refreshed_at: float | None = None
+        self._content_hash: str | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def covers_store(self) -> bool:
+        """True when the prebuilt context holds every schema document."""
+        return self.refreshed_at is not None and 0 < self.document_count <= self.max_documents
+
+    @property
+    def context_version(self) -> str:
+        return f"schema-v{self.version}"
+
+    async def refresh(self) -> int:
+        async with self._lock:
+            async with engine.connect() as conn:
+                # ambil satu dokumen lebih untuk tahu apakah store melebihi batas
+                documents = await self.__chatbot_repo.get_documents(conn=conn, limit=self.max_documents + 1)
+
+            context = "\n\n".join([doc.document for doc in documents])
+            content_hash = hashlib.sha256(context.encode("utf-8")).hexdigest()
+            if content_hash != self._content_hash:
+                self._content_hash = content_hash
+                self.context = context
+                self.version += 1
+                logging.info(f"Schema context refreshed to version {self.version} ({len(documents)} documents)")
+
+            self.document_count = len(documents)
+            self.refreshed_at = time.monotonic()
+            return self.version
+
+    async def refresh_safely(self):
+        # kegagalan refresh tidak boleh menggagalkan request, context lama tetap dipakai
+        try:
+            await self.refresh()
+        except Exception as e:
+            logging.warning(f"Schema context refresh failed: {e}")
+
+    async def refresh_periodically(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh_safely()
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "document_count": self.document_count,
+            "covers_store": self.covers_store,
+            "age_seconds": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at else None,
+        }
+
+
+schema_context_cache = SchemaContextCache(max_documents=settings.SCHEMA_CONTEXT_MAX_DOCUMENTS)
@@ -8,4 +8,11 @@ class ChatBotInterFace:
         conn: AsyncConnection, 
         message:list,
         similarity_threshold: float = 0.7,
-    ): ...
\ No newline at end of file
+        limit: int = 10
+    ) -> Sequence[RowMapping]: ...
+
+    async def get_documents(
+        self,
+        conn: AsyncConnection,
+        limit: int | None = None
+    ) -> Sequence[RowMapping]: ...
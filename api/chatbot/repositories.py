@@ -1,11 +1,39 @@
 from typing import Sequence
 from sqlalchemy.ext.asyncio import AsyncConnection
-from sqlalchemy import RowMapping, select, func, cast, insert, desc
-from sqlalchemy.sql.operators import eq
+from sqlalchemy import Integer, RowMapping, Table, Select, select, cast
+
+from pgvector.sqlalchemy import Vector
 
 from api.chatbot.interface import ChatBotInterFace
+from api.config import settings
 from api.langchain_pg.models import langchain_pg_embedding
-# from api.flights.models import flight_price
+
+
+def similarity_search_stmt(
+    table: Table,
+    message: list,
+    similarity_threshold: float,
+    limit: int,
+) -> Select:
+    """
+    Top-k cosine search pushed down to Postgres.
+
+    The cast to a fixed-size vector matches the expression of the HNSW
+    index, so ORDER BY distance + LIMIT is served by the index instead of
+    scanning and shipping every row.
+    """
+    distance = cast(table.c.embedding, Vector(settings.EMBEDDING_DIMENSIONS)).cosine_distance(message)
+    return (
+        select(
+            table.c.document,
+            table.c.cmetadata,
+            (1 - distance).label('similarity_score')
+        )
+        .where(distance <= 1 - similarity_threshold)
+        .order_by(distance)
+        .limit(limit)
+    )
+
 
 class ChatBotRepositories(ChatBotInterFace):
     async def search_similiar_embeddings(
@@ -14,17 +42,13 @@ class ChatBotRepositories(ChatBotInterFace):
         message:list,
         similarity_threshold: float = 0.7,
         limit: int = 10
-    ):
-        stmt = select(
-            langchain_pg_embedding.c.embedding,
-            langchain_pg_embedding.c.document,
-            (1 - langchain_pg_embedding.c.embedding.cosine_distance(message)).label('similarity_score')
+    ) -> Sequence[RowMapping]:
+        stmt = similarity_search_stmt(
+            table=langchain_pg_embedding,
+            message=message,
+            similarity_threshold=similarity_threshold,
+            limit=limit,
         )
-        # .where(
-        #     eq(flight_price.c.integration_wizard_id,flight_price),
-        # )
-
-        query = stmt.order_by(desc('similarity_score')).limit(limit)
         try:
             # Execute data query
             data_result = await conn.execute(statement=stmt)
@@ -32,4 +56,27 @@ class ChatBotRepositories(ChatBotInterFace):
 
             return data
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
+
+    async def get_documents(
+        self,
+        conn: AsyncConnection,
+        limit: int | None = None
+    ) -> Sequence[RowMapping]:
+        stmt = (
+            select(
+                langchain_pg_embedding.c.document,
+                langchain_pg_embedding.c.cmetadata,
+            )
+            .order_by(
+                langchain_pg_embedding.c.cmetadata["source_hash"].astext,
+                langchain_pg_embedding.c.cmetadata["chunk"].astext.cast(Integer),
+                langchain_pg_embedding.c.document,
+            )
+            .limit(limit)
+        )
+        try:
+            result = await conn.execute(statement=stmt)
+            return result.mappings().fetchall()
+        except Exception as e:
+            raise e
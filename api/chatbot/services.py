@@ -1,10 +1,7 @@
 from datetime import datetime
 
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain.chat_models import init_chat_model
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_community.llms import OpenAI
 
 from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy.sql import text
@@ -13,20 +10,20 @@ from sqlalchemy.exc import ProgrammingError
 from api.chatbot.schemas import APIMessageParams, MessageDataResponse
 from api.chatbot.repositories import ChatBotRepositories
 from api.database.client import engine
+from api.llm.registry import LLMClientRegistry, llm_registry
 
 NOW = datetime.now()
 
 class ChatBotAI:
     def __init__(
             self, 
-            params: APIMessageParams
+            params: APIMessageParams,
+            registry: LLMClientRegistry = llm_registry,
         ):
         self.prompt = params.message
-        self.llm = OpenAI(temperature = 0)
-        self.model = init_chat_model(
-            model="gpt-4o-mini",
-            stream_usage=True,
-        )
+        self.llm = registry.completion_model
+        self.model = registry.chat_model
+        self.embedding_cache = registry.embedding_cache
 
     async def chat(self) -> MessageDataResponse:
 
@@ -50,7 +47,7 @@ class ChatBotAI:
             params: APIMessageParams,
     ) -> MessageDataResponse:
         # try:
-            query_embeddings = OpenAIEmbeddings().embed_query(
+            query_embeddings = await self.embedding_cache.aembed_query(
                 params.message
             )
             
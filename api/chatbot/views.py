@@ -4,15 +4,17 @@ from fastapi.responses import StreamingResponse
 from api.chatbot.services import ChatBotAI
 from api.chatbot.schemas import APIMessageParams, ChatModelResponse, ChatModelErrorResponse
 from api.database.database import DBConnection
+from api.llm.registry import LLMRegistry
 
 chat_router = APIRouter(prefix='/api/v1/chat', tags=["Chat"])
 
 @chat_router.post("/")
 async def chat(
     request: Request,
+    registry: LLMRegistry,
     params: APIMessageParams
 ):
-    chat = await ChatBotAI(params=params).chat()
+    chat = await ChatBotAI(params=params, registry=registry).chat()
     return chat
 
 @chat_router.post("/v2")
@@ -20,10 +22,11 @@ async def chat_v2(
     request: Request,
     response:Response,
     db: DBConnection,
+    registry: LLMRegistry,
     params: APIMessageParams
 ):
     try:
-        chat = await ChatBotAI(params=params).chat_v2(conn=db, params=params)
+        chat = await ChatBotAI(params=params, registry=registry).chat_v2(conn=db, params=params)
         return ChatModelResponse(resp=chat)
     except HTTPException as ex:
         response.status_code = ex.status_code
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import RedisDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -22,8 +23,111 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str
     POSTGRES_DB: str
 
-    # OPEN AI Settings
-    OPENAI_API_KEY: str
+    # SQLAlchemy connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+
+    # Guarded execution of generated SQL
+    SQL_STATEMENT_TIMEOUT_MS: int = 5000
+    SQL_MAX_ROWS: int = 500
+    SQL_FETCH_SIZE: int = 100
+
+    # Query results in the report prompt
+    REPORT_RESULT_MAX_TOKENS: int = 1500
+    REPORT_RESULT_FORMAT: str = "csv"
+
+    # Model providers: "openai", atau "local" (deterministik, tanpa network) untuk benchmark/profiling
+    LLM_PROVIDER: Literal["openai", "local"] = "openai"
+    EMBEDDING_PROVIDER: Literal["openai", "local"] = "openai"
+    LOCAL_LLM_LATENCY_MS: float = 0.0
+    # jeda antar chunk saat streaming
+    LOCAL_LLM_CHUNK_LATENCY_MS: float = 0.0
+    LOCAL_EMBEDDING_LATENCY_MS: float = 0.0
+    LOCAL_LLM_SQL: str = (
+        "SELECT flight_number, origin_city, destination_city, total_price, currency, valid_from "
+        "FROM flight_fares ORDER BY total_price_normalized NULLS LAST LIMIT 5"
+    )
+
+    # OPEN AI Settings, tidak dipakai provider local
+    OPENAI_API_KEY: str = ""
+    OPENAI_CHAT_MODEL: str = "gpt-4o-mini"
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    # harus sama dengan dimensi index HNSW di alembic
+    EMBEDDING_DIMENSIONS: int = 1536
+    OPENAI_REQUEST_TIMEOUT: float = 60.0
+
+    # Shared HTTP connection pool for LLM clients
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Query embedding cache (in-process LRU + embedding_cache table)
+    EMBEDDING_CACHE_MAX_ITEMS: int = 10000
+    EMBEDDING_CACHE_DB_ENABLED: bool = True
+    EMBEDDING_CACHE_DB_MAX_ROWS: int = 200000
+    EMBEDDING_CACHE_DB_PRUNE_EVERY: int = 500
+
+    # Micro-batching of concurrent embedding requests
+    EMBEDDING_BATCH_WINDOW_MS: float = 10.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+
+    # Vector store batch ingestion
+    VECTOR_CHUNK_SIZE: int = 4000
+    VECTOR_CHUNK_OVERLAP: int = 200
+    VECTOR_EMBED_BATCH_SIZE: int = 64
+    VECTOR_EMBED_CONCURRENCY: int = 4
+
+    # Intent -> SQL cache
+    SQL_CACHE_MAX_ITEMS: int = 2000
+    SQL_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Prebuilt schema context
+    SCHEMA_CONTEXT_REFRESH_SECONDS: float = 300.0
+    # jika jumlah dokumen schema <= nilai ini, vector search dilewati
+    SCHEMA_CONTEXT_MAX_DOCUMENTS: int = 10
+
+    # Conversation history window
+    HISTORY_WINDOW_MESSAGES: int = 20
+    HISTORY_MAX_TOKENS: int = 2000
+    HISTORY_CACHE_MAX_CONVERSATIONS: int = 5000
+    HISTORY_CACHE_TTL_SECONDS: float = 900.0
+
+    # Turn writes: flush after the response instead of before it
+    CONVERSATION_WRITES_AFTER_RESPONSE: bool = False
+
+    # Rule-based fast path for common flight questions
+    FAST_PATH_ENABLED: bool = True
+    FAST_PATH_RESULT_LIMIT: int = 20
+
+    AIRPORT_GAZETTEER_REFRESH_SECONDS: float = 60.0
+    AIRPORT_FUZZY_MIN_SIMILARITY: float = 0.5
+    # cek flight_fares tertinggal dari flight_prices/fx_rates
+    FARE_VIEW_REFRESH_SECONDS: float = 30.0
+
+    # Currency normalization
+    FX_BASE_CURRENCY: str = "USD"
+    # file kurs lokal (JSON/CSV) yang dimuat saat startup, untuk operasi offline
+    FX_RATES_FILE: str | None = None
+    FX_REFRESH_SECONDS: float = 300.0
+
+    # Bulk fare ingestion (COPY)
+    INGEST_CHUNK_SIZE: int = 50000
+
+    # Rolling conversation summary
+    SUMMARY_ENABLED: bool = True
+    SUMMARY_TRIGGER_TOKENS: int = 1200
+    SUMMARY_KEEP_TURNS: int = 2
+    SUMMARY_MAX_WORDS: int = 150
+
+    # Semantic answer cache (pgvector)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_PRUNE_EVERY: int = 100
+
+    # Prometheus /metrics: per-stage histograms, pool checkout wait, in-flight requests
+    METRICS_ENABLED: bool = True
 
     # CORS Settings
     CORS_ALLOW_ORIGINS: str = "*"
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import re
+
+from sqlalchemy import RowMapping
+
+from api.config import settings
+from api.conversations.entities import SemanticCacheEntities
+from api.conversations.helpers import generate_uuid
+from api.conversations.repositories import SemanticCacheRepository
+from api.database.client import engine
+from api.helpers.cache import LRUCache
+
+
+def normalize_intent(intent: str) -> str:
+    intent = intent.strip().strip("\"'`").casefold()
+    intent = re.sub(r"\s+", " ", intent)
+    return intent.rstrip(" .?!")
+
+
+def build_context_version(context: str) -> str:
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprint_rows(rows) -> str:
+    payload = json.dumps([dict(row) for row in rows], default=str, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IntentSQLCache:
+    """
+    Maps a normalized QUERY_INTENT to SQL that already passed
+    `validate_sql_output`, so a repeated intent skips the SQL LLM call.
+
+    The key also carries the schema-context version and the date the turn
+    was resolved against, so SQL never outlives the schema or the day it
+    was written for.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def key(self, intent: str, context_version: str, current_date: str) -> tuple[str, str, str]:
+        return (normalize_intent(intent), context_version, current_date)
+
+    def get(self, intent: str, context_version: str, current_date: str) -> str | None:
+        return self._cache.get(self.key(intent, context_version, current_date))
+
+    def set(self, intent: str, context_version: str, current_date: str, sql: str):
+        self._cache.set(self.key(intent, context_version, current_date), sql)
+
+    def invalidate(self, intent: str, context_version: str, current_date: str):
+        self._cache.pop(self.key(intent, context_version, current_date))
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+intent_sql_cache = IntentSQLCache(
+    maxsize=settings.SQL_CACHE_MAX_ITEMS,
+    ttl=settings.SQL_CACHE_TTL_SECONDS,
+)
+
+
+class SemanticAnswerCache:
+    """
+    Answers of past stand-alone questions, looked up by cosine similarity of
+    the question embedding in `semantic_answer_cache`.
+
+    Every entry is stamped with the version the `flight_fares` view was
+    refreshed to when the answer was computed, and only entries of the
+    current version are served, so a fare or rate change invalidates the
+    cache once the view reflects it, without any explicit purge. Every
+    SEMANTIC_CACHE_PRUNE_EVERY stores, rows of an old version or of a
+    past date are deleted.
+
+    The embedding column must have the configured EMBEDDING_DIMENSIONS;
+    `check_dimensions` disables the cache at startup when it does not.
+    """
+
+    def __init__(
+            self,
+            enabled: bool,
+            similarity_threshold: float,
+            dimensions: int,
+            cache_repo: SemanticCacheRepository | None = None,
+        ):
+        self.enabled = enabled
+        self.similarity_threshold = similarity_threshold
+        self.dimensions = dimensions
+        self.__cache_repo = cache_repo or SemanticCacheRepository()
+        self.hits = 0
+        self.misses = 0
+        self._stores = 0
+
+    async def check_dimensions(self) -> bool:
+        if not self.enabled:
+            return False
+        try:
+            async with engine.connect() as conn:
+                column_dimensions = await self.__cache_repo.get_embedding_dimensions(conn=conn)
+        except Exception as e:
+            logging.warning(f"Checking semantic_answer_cache embedding dimensions failed: {e}")
+            return False
+
+        if column_dimensions != self.dimensions:
+            # setiap write akan gagal, lebih baik dimatikan dan terlihat di log
+            logging.error(
+                f"semantic_answer_cache.embedding has {column_dimensions} dimensions but EMBEDDING_DIMENSIONS is "
+                f"{self.dimensions}; semantic answer cache disabled. Recreate the table or fix the setting."
+            )
+            self.enabled = False
+            return False
+        return True
+
+    async def lookup(self, embedding: list[float], resolved_date: str) -> RowMapping | None:
+        try:
+            async with engine.connect() as conn:
+                row = await self.__cache_repo.find_similar(
+                    conn=conn,
+                    embedding=embedding,
+                    similarity_threshold=self.similarity_threshold,
+                    resolved_date=resolved_date,
+                )
+        except Exception as e:
+            logging.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row
+
+    async def get_data_version(self) -> int | None:
+        try:
+            async with engine.connect() as conn:
+                return await self.__cache_repo.get_data_version(conn=conn)
+        except Exception as e:
+            logging.warning(f"Reading fare data version failed: {e}")
+            return None
+
+    async def store(
+            self,
+            question: str,
+            embedding: list[float],
+            sql: str,
+            results,
+            answer: str,
+            data_version: int,
+            resolved_date: str,
+        ):
+        payload = SemanticCacheEntities(
+            id=generate_uuid(),
+            question=question,
+            embedding=embedding,
+            sql=sql,
+            result_fingerprint=fingerprint_rows(results),
+            answer=answer,
+            data_version=data_version,
+            resolved_date=resolved_date,
+        )
+        try:
+            async with engine.connect() as conn:
+                await self.__cache_repo.create_entry(conn=conn, payload=payload)
+                self._stores += 1
+                if self._stores % settings.SEMANTIC_CACHE_PRUNE_EVERY == 0:
+                    # resolved_date turn ini adalah tanggal hari ini
+                    pruned = await self.__cache_repo.delete_stale(conn=conn, current_date=resolved_date)
+                    logging.info(f"Pruned {pruned} stale rows from semantic_answer_cache")
+        except Exception as e:
+            logging.warning(f"Semantic cache write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "similarity_threshold": self.similarity_threshold,
+            "dimensions": self.dimensions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+semantic_cache = SemanticAnswerCache(
+    enabled=settings.SEMANTIC_CACHE_ENABLED,
+    similarity_threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+    dimensions=settings.EMBEDDING_DIMENSIONS,
+)
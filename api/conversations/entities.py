@@ -1,3 +1,4 @@
+from datetime import date
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -12,6 +13,8 @@ class ConversationEntities(AuditBaseModel):
     integration_wizard_id: UUID | None = None
     llm_model_id: UUID | None = None
     created_by: str | None = None
+    summary: str | None = None
+    summary_message_id: UUID | None = None
 
 class MessageEntities(AuditBaseModel):
     id: UUID | None = None
@@ -22,6 +25,16 @@ class MessageEntities(AuditBaseModel):
     created_by: str | None = None
     metadata: dict | None = None
 
+class SemanticCacheEntities(BaseModel):
+    id: UUID | None = None
+    question: str | None = None
+    embedding: list[float] | None = None
+    sql: str | None = None
+    result_fingerprint: str | None = None
+    answer: str | None = None
+    data_version: int | None = None
+    resolved_date: date | None = None
+
 class ConversationsFilter(BaseModel):
     limit: int = 10
     offset: int = 0
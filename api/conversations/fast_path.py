@@ -0,0 +1,333 @@
+import re
+import time
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+
+from sqlalchemy import Select
+
+from api.config import settings
+from api.flights.fx import FXRateCache, fx_rates
+from api.flights.gazetteer import AirportGazetteer, airport_gazetteer
+from api.flights.repositories import fare_search_stmt
+from api.helpers.cache import LRUCache
+
+MONTHS = {
+    "januari": 1, "january": 1, "jan": 1,
+    "februari": 2, "february": 2, "feb": 2, "pebruari": 2,
+    "maret": 3, "march": 3, "mar": 3,
+    "april": 4, "apr": 4,
+    "mei": 5, "may": 5,
+    "juni": 6, "june": 6, "jun": 6,
+    "juli": 7, "july": 7, "jul": 7,
+    "agustus": 8, "august": 8, "agu": 8, "aug": 8, "agt": 8,
+    "september": 9, "sep": 9, "sept": 9,
+    "oktober": 10, "october": 10, "okt": 10, "oct": 10,
+    "november": 11, "nov": 11, "nopember": 11,
+    "desember": 12, "december": 12, "des": 12, "dec": 12,
+}
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+
+RELATIVE_DAYS = {"hari ini": 0, "today": 0, "besok": 1, "tomorrow": 1, "lusa": 2}
+
+SORT_PHRASES = {
+    "paling murah": "cheapest", "termurah": "cheapest", "cheapest": "cheapest",
+    "lowest price": "cheapest", "paling hemat": "cheapest",
+    "paling mahal": "most_expensive", "termahal": "most_expensive",
+    "most expensive": "most_expensive", "highest price": "most_expensive",
+}
+
+CLASS_PHRASES = {
+    "kelas ekonomi": "economy", "economy class": "economy", "ekonomi": "economy", "economy": "economy",
+    "kelas bisnis": "business", "business class": "business", "bisnis": "business", "business": "business",
+    "first class": "first", "kelas utama": "first", "kelas satu": "first",
+}
+
+ORIGIN_MARKERS = {"dari", "from", "asal"}
+DESTINATION_MARKERS = {"ke", "to", "menuju", "tujuan"}
+# boleh ada di antara marker dan nama tempat: "dari bandara soekarno hatta"
+PLACE_QUALIFIERS = {"bandara", "airport", "kota", "city"}
+
+# kata yang boleh ada di pertanyaan tanpa mengubah arti query;
+# kata lain di luar daftar ini membuat pertanyaan diteruskan ke LLM
+FILLER_WORDS = {
+    "tiket", "pesawat", "penerbangan", "flight", "flights", "ticket", "tickets", "fare", "fares",
+    "harga", "price", "prices", "tarif", "berapa", "how", "much", "is", "are", "the", "a", "an",
+    "cari", "carikan", "tolong", "please", "show", "me", "find", "list", "search", "cek", "check",
+    "ada", "apa", "saja", "aja", "yang", "paling", "tersedia", "available", "any", "what",
+    "mau", "ingin", "pengen", "saya", "aku", "i", "want", "need", "butuh", "untuk", "for", "buat",
+    "tanggal", "tgl", "pada", "on", "di", "kelas", "class", "kak", "dong", "ya", "nih", "min",
+    "of", "with", "dengan", "jadwal", "schedule", "pergi", "berangkat", "go", "fly", "terbang",
+    "and", "dan", "kalau", "kalo", "gimana", "bagaimana", "which", "one", "option", "options",
+} | PLACE_QUALIFIERS
+
+
+@dataclass(frozen=True)
+class FlightQuery:
+    origins: tuple[str, ...] = ()
+    destinations: tuple[str, ...] = ()
+    travel_date: date | None = None
+    flight_class: str | None = None
+    sort: str | None = None
+
+    @property
+    def is_complete(self) -> bool:
+        return bool(self.origins or self.destinations)
+
+    def merge(self, previous: "FlightQuery") -> "FlightQuery":
+        """Follow-up question: slots it does not mention come from the previous turn."""
+        return replace(
+            self,
+            origins=self.origins or previous.origins,
+            destinations=self.destinations or previous.destinations,
+            travel_date=self.travel_date or previous.travel_date,
+            flight_class=self.flight_class or previous.flight_class,
+        )
+
+    def describe(self) -> str:
+        parts = [
+            f"origin={','.join(self.origins) or '*'}",
+            f"destination={','.join(self.destinations) or '*'}",
+            f"date={self.travel_date.isoformat() if self.travel_date else '*'}",
+            f"class={self.flight_class or '*'}",
+            f"sort={self.sort or 'price'}",
+        ]
+        return "fast_path " + " ".join(parts)
+
+    def statement(self, limit: int) -> Select:
+        return fare_search_stmt(
+            origins=self.origins,
+            destinations=self.destinations,
+            travel_date=self.travel_date,
+            flight_class=self.flight_class,
+            descending=self.sort == "most_expensive",
+            # "paling murah/mahal" cukup satu baris teratas
+            limit=1 if self.sort else limit,
+        )
+
+
+def _resolve_year(day: int, month: int, year: int | None, today: date) -> date | None:
+    try:
+        if year is not None:
+            return date(year if year > 99 else 2000 + year, month, day)
+        candidate = date(today.year, month, day)
+        # tanpa tahun: tanggal berikutnya yang belum lewat
+        return candidate if candidate >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+class FlightQuestionParser:
+    """
+    Deterministic parser for the common flight questions ("tiket dari X ke Y
+    tanggal Z", "yang paling murah", "cheapest business flight to Bali").
+
+    Every word of the question has to be understood (a location, a date, a
+    class, a sort modifier or a known filler word); anything else returns
+    None so the question goes through the LLM path unchanged. Misspelled
+    place names are only corrected directly after "dari"/"ke" and friends,
+    and three-letter airport codes only count when written in uppercase.
+    """
+
+    DATE_PATTERNS = (
+        (re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b"), "ymd"),
+        (re.compile(r"\b(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?\b"), "dmy"),
+        # dengan titik tahunnya wajib, "10.30" itu jam, bukan tanggal
+        (re.compile(r"\b(\d{1,2})\.(\d{1,2})\.(\d{2,4})\b"), "dmy"),
+        (re.compile(rf"\b(\d{{1,2}})\s+({_MONTH})\b(?:\s+(\d{{4}}))?"), "d_month_y"),
+        (re.compile(rf"\b({_MONTH})\s+(\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s+(\d{{4}}))?"), "month_d_y"),
+    )
+
+    def __init__(self, gazetteer: AirportGazetteer):
+        self.gazetteer = gazetteer
+
+    def _take_date(self, text: str, today: date) -> tuple[date | None, str, bool]:
+        """(date, text without the date, ok); ok is False for a date that does not exist."""
+        for phrase, days in RELATIVE_DAYS.items():
+            match = re.search(rf"\b{phrase}\b", text)
+            if match:
+                return today + timedelta(days=days), text[:match.start()] + " " + text[match.end():], True
+
+        for pattern, kind in self.DATE_PATTERNS:
+            match = pattern.search(text)
+            if not match:
+                continue
+            groups = match.groups()
+            if kind == "ymd":
+                value = _resolve_year(int(groups[2]), int(groups[1]), int(groups[0]), today)
+            elif kind == "dmy":
+                value = _resolve_year(int(groups[0]), int(groups[1]), int(groups[2]) if groups[2] else None, today)
+            elif kind == "d_month_y":
+                value = _resolve_year(int(groups[0]), MONTHS[groups[1]], int(groups[2]) if groups[2] else None, today)
+            else:
+                value = _resolve_year(int(groups[1]), MONTHS[groups[0]], int(groups[2]) if groups[2] else None, today)
+            return value, text[:match.start()] + " " + text[match.end():], value is not None
+        return None, text, True
+
+    @staticmethod
+    def _take_phrase(text: str, phrases: dict[str, str]) -> tuple[str | None, str]:
+        for phrase in sorted(phrases, key=len, reverse=True):
+            match = re.search(rf"\b{phrase}\b", text)
+            if match:
+                return phrases[phrase], text[:match.start()] + " " + text[match.end():]
+        return None, text
+
+    @staticmethod
+    def _marker(words: list[str], index: int) -> str | None:
+        """The word before `words[index]`, looking past place qualifiers."""
+        index -= 1
+        while index >= 0 and words[index] in PLACE_QUALIFIERS:
+            index -= 1
+        return words[index] if index >= 0 else None
+
+    def parse(self, question: str, today: date) -> FlightQuery | None:
+        text = question.casefold()
+        travel_date, text, ok = self._take_date(text, today)
+        if not ok:
+            return None
+        sort, text = self._take_phrase(text, SORT_PHRASES)
+        flight_class, text = self._take_phrase(text, CLASS_PHRASES)
+
+        words = re.findall(r"[a-z0-9]+", text)
+        # kode bandara hanya dihitung kalau ditulis kapital, "ada"/"apa" bukan ADA/APA
+        upper_codes = {token.casefold() for token in re.findall(r"\b[A-Z]{3}\b", question)}
+        origins, destinations, unmarked = (), (), []
+        index = 0
+        while index < len(words):
+            codes, size = frozenset(), 0
+            # nama tempat terpanjang dulu, "kuala lumpur" sebelum "kuala"
+            for size in range(min(self.gazetteer.max_words, len(words) - index), 0, -1):
+                name = " ".join(words[index:index + size])
+                if size == 1 and (
+                    name in FILLER_WORDS | ORIGIN_MARKERS | DESTINATION_MARKERS
+                    or (self.gazetteer.kind(name) == "code" and name not in upper_codes)
+                ):
+                    continue
+                codes = self.gazetteer.lookup(name)
+                if codes:
+                    break
+            if not codes:
+                if words[index] in FILLER_WORDS | ORIGIN_MARKERS | DESTINATION_MARKERS:
+                    index += 1
+                    continue
+                # salah ketik seperti "denpsar" hanya ditebak tepat setelah "dari"/"ke":
+                # kata lain ("malam", "balik") terlalu mudah mirip nama kota
+                if len(words[index]) < 4 or self._marker(words, index) not in ORIGIN_MARKERS | DESTINATION_MARKERS:
+                    return None
+                codes, size = self.gazetteer.resolve(words[index]), 1
+                if not codes:
+                    return None
+
+            marker = self._marker(words, index)
+            codes = tuple(sorted(codes))
+            if marker in ORIGIN_MARKERS and not origins:
+                origins = codes
+            elif marker in DESTINATION_MARKERS and not destinations:
+                destinations = codes
+            else:
+                unmarked.append(codes)
+            index += size
+
+        # lokasi tanpa "dari"/"ke" hanya dipakai kalau tidak ada marker sama sekali:
+        # "ke bali dan singapore" itu daftar tujuan, bukan rute SIN -> DPS
+        if unmarked and (origins or destinations):
+            return None
+        if len(unmarked) == 2:
+            origins, destinations = unmarked
+        elif len(unmarked) == 1:
+            destinations = unmarked[0]
+        elif unmarked:
+            return None
+
+        return FlightQuery(
+            origins=origins,
+            destinations=destinations,
+            travel_date=travel_date,
+            flight_class=flight_class,
+            sort=sort,
+        )
+
+
+class FastPathRouter:
+    """
+    Sends recognizable flight questions straight to parameterized SQL,
+    skipping the intent and SQL LLM calls. Follow-ups ("yang paling murah")
+    reuse the slots of the conversation's previous fast-path turn.
+
+    Latency saved is estimated from the intent + SQL LLM time of the turns
+    that did go through the LLM path. While some fare currency has no FX
+    rate, prices cannot be ranked in one currency and every question goes
+    to the LLM path instead.
+    """
+
+    def __init__(
+            self,
+            enabled: bool,
+            result_limit: int,
+            gazetteer: AirportGazetteer = airport_gazetteer,
+            fx: FXRateCache = fx_rates,
+        ):
+        self.enabled = enabled
+        self.fx = fx
+        self.result_limit = result_limit
+        self.parser = FlightQuestionParser(gazetteer)
+        self._slots = LRUCache(
+            maxsize=settings.HISTORY_CACHE_MAX_CONVERSATIONS,
+            ttl=settings.HISTORY_CACHE_TTL_SECONDS,
+        )
+        self.attempts = 0
+        self.hits = 0
+        self.unrated_skips = 0
+        self.parse_seconds = 0.0
+        self.llm_turns = 0
+        self.llm_path_seconds = 0.0
+
+    def match(self, question: str, conversation_id: str, today: date) -> FlightQuery | None:
+        if not self.enabled:
+            return None
+        self.attempts += 1
+        if self.fx.unrated_currencies:
+            self.unrated_skips += 1
+            return None
+        start = time.perf_counter()
+        query = self.parser.parse(question, today)
+        if query is not None and conversation_id:
+            previous = self._slots.get(conversation_id)
+            if previous is not None:
+                query = query.merge(previous)
+        if query is not None and not query.is_complete:
+            query = None
+        self.parse_seconds += time.perf_counter() - start
+
+        if query is not None:
+            self.hits += 1
+        return query
+
+    def remember(self, conversation_id, query: FlightQuery):
+        self._slots.set(str(conversation_id), query)
+
+    def forget(self, conversation_id):
+        # turn lewat LLM: slot lama tidak lagi mewakili percakapan
+        self._slots.pop(str(conversation_id))
+
+    def record_llm_turn(self, timings_ms: dict[str, float]):
+        self.llm_turns += 1
+        self.llm_path_seconds += (timings_ms.get("intent_llm", 0.0) + timings_ms.get("sql_llm", 0.0)) / 1000
+
+    def stats(self) -> dict:
+        mean_llm_path_ms = self.llm_path_seconds / self.llm_turns * 1000 if self.llm_turns else 0.0
+        return {
+            "enabled": self.enabled,
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "unrated_currency_skips": self.unrated_skips,
+            "hit_rate": round(self.hits / self.attempts, 4) if self.attempts else 0.0,
+            "mean_parse_ms": round(self.parse_seconds / self.attempts * 1000, 3) if self.attempts else 0.0,
+            "mean_llm_path_ms": round(mean_llm_path_ms, 2),
+            "estimated_saved_ms": round(self.hits * mean_llm_path_ms, 2),
+        }
+
+
+fast_path_router = FastPathRouter(
+    enabled=settings.FAST_PATH_ENABLED,
+    result_limit=settings.FAST_PATH_RESULT_LIMIT,
+)
@@ -1,3 +1,5 @@
+import json
+
 from uuid import UUID, uuid4
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -9,4 +11,7 @@ def generate_uuid() -> UUID:
     return uuid4()
 
 def generate_time_now():
-    return datetime.now(tz=timezone)
\ No newline at end of file
+    return datetime.now(tz=timezone)
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,46 @@
+from collections import deque
+
+from langchain_core.messages import BaseMessage
+
+from api.config import settings
+from api.helpers.cache import LRUCache
+
+
+class ConversationHistoryCache:
+    """
+    Bounded per-conversation window of the most recent messages.
+
+    A conversation is loaded from the DB once (last N messages, keyset
+    query) and afterwards kept current by appending every message this
+    process writes, so a turn reads its history from memory.
+    """
+
+    def __init__(self, max_conversations: int, window: int, ttl: float):
+        self.window = window
+        self._cache = LRUCache(maxsize=max_conversations, ttl=ttl)
+
+    def get(self, conversation_id) -> list[BaseMessage] | None:
+        messages = self._cache.get(str(conversation_id))
+        return None if messages is None else list(messages)
+
+    def put(self, conversation_id, messages: list[BaseMessage]):
+        self._cache.set(str(conversation_id), deque(messages, maxlen=self.window))
+
+    def append(self, conversation_id, message: BaseMessage):
+        # hanya update window yang sudah di-load, sisanya di-load dari DB saat dibutuhkan
+        messages = self._cache.peek(str(conversation_id))
+        if messages is not None:
+            messages.append(message)
+
+    def evict(self, conversation_id):
+        self._cache.pop(str(conversation_id))
+
+    def stats(self) -> dict:
+        return {"window": self.window, **self._cache.stats()}
+
+
+history_cache = ConversationHistoryCache(
+    max_conversations=settings.HISTORY_CACHE_MAX_CONVERSATIONS,
+    window=settings.HISTORY_WINDOW_MESSAGES,
+    ttl=settings.HISTORY_CACHE_TTL_SECONDS,
+)
@@ -3,12 +3,29 @@ from typing import Protocol, Sequence
 from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy import RowMapping
 
-from api.conversations.entities import MessageEntities
+from api.conversations.entities import ConversationEntities, MessageEntities, SemanticCacheEntities
 
 class ConversationInterFace(Protocol):
     async def create_conversation(self, conn: AsyncConnection, payload: MessageEntities): ...
 
+    async def update_summary(self, conn: AsyncConnection, payload: ConversationEntities): ...
+
 class MessageInterFace(Protocol):
     async def create_message(self, conn: AsyncConnection, payload: MessageEntities): ...
 
-    async def get_messages_by_conversation_id(self, conn: AsyncConnection, conversation_id: str) -> Sequence[RowMapping]: ...
\ No newline at end of file
+    async def create_messages(self, conn: AsyncConnection, payloads: list[MessageEntities]): ...
+
+    async def get_recent_messages(self, conn: AsyncConnection, conversation_id, limit: int, before: tuple | None = None) -> Sequence[RowMapping]: ...
+
+    async def get_messages_by_conversation_id(self, conn: AsyncConnection, conversation_id: str) -> Sequence[RowMapping]: ...
+
+class SemanticCacheInterFace(Protocol):
+    async def get_embedding_dimensions(self, conn: AsyncConnection) -> int | None: ...
+
+    async def get_data_version(self, conn: AsyncConnection) -> int: ...
+
+    async def find_similar(self, conn: AsyncConnection, embedding: list[float], similarity_threshold: float, resolved_date) -> RowMapping | None: ...
+
+    async def create_entry(self, conn: AsyncConnection, payload: SemanticCacheEntities): ...
+
+    async def delete_stale(self, conn: AsyncConnection, current_date) -> int: ...
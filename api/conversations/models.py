@@ -1,11 +1,14 @@
 import uuid
 from enum import StrEnum
 
-from sqlalchemy import Table, Column, String, Numeric, Date, UUID, ForeignKey, ForeignKeyConstraint, Text, Enum
+from pgvector.sqlalchemy import Vector
+
+from sqlalchemy import Table, Column, String, Numeric, Date, UUID, ForeignKey, ForeignKeyConstraint, Text, Enum, BigInteger, Integer, DateTime
 from sqlalchemy.dialects.postgresql import JSONB
 
 from sqlalchemy.sql import func
 
+from api.config import settings
 from api.models.base import get_audit_columns
 from api.database.client import metadata
 
@@ -18,6 +21,9 @@ conversation = Table(
     metadata,
     Column("id", UUID, primary_key=True, default=uuid.uuid4),
     Column("title", String, nullable=False),
+    Column("summary", Text, nullable=True),
+    Column("summary_message_id", UUID, nullable=True),
+    Column("summary_updated_at", DateTime(timezone=True), nullable=True),
     *get_audit_columns(),
 )
 
@@ -35,3 +41,18 @@ message = Table(
     ),
     *get_audit_columns(),
 )
+
+semantic_answer_cache = Table(
+    "semantic_answer_cache",
+    metadata,
+    Column("id", UUID, primary_key=True, default=uuid.uuid4),
+    Column("question", Text, nullable=False),
+    Column("embedding", Vector(settings.EMBEDDING_DIMENSIONS), nullable=False),
+    Column("sql", Text, nullable=False),
+    Column("result_fingerprint", String(64), nullable=False),
+    Column("answer", Text, nullable=False),
+    Column("data_version", BigInteger, nullable=False),  # fare_view_version() saat jawaban dibuat: versi gabungan flight_prices + fx_rates di view flight_fares
+    Column("resolved_date", Date, nullable=False),
+    Column("hit_count", Integer, nullable=False, server_default="0"),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
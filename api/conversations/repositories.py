@@ -1,22 +1,29 @@
+import logging
+
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.messages import AIMessage, HumanMessage, BaseMessage
 
 from typing import Sequence
 from sqlalchemy.ext.asyncio import AsyncConnection
-from sqlalchemy import RowMapping, select, func, cast, insert, desc, String, delete
+from sqlalchemy import RowMapping, select, func, cast, insert, desc, String, delete, update, Date, tuple_, text
 from sqlalchemy.sql.operators import eq
 
-from api.conversations.interface import ConversationInterFace, MessageInterFace
-from api.conversations.models import conversation, message, MessageTypeEnum
-from api.conversations.entities import ConversationEntities, MessageEntities
+from api.conversations.interface import ConversationInterFace, MessageInterFace, SemanticCacheInterFace
+from api.conversations.models import conversation, message, semantic_answer_cache, MessageTypeEnum
+from api.flights.repositories import fare_view_version
+from api.conversations.entities import ConversationEntities, MessageEntities, SemanticCacheEntities
+from api.conversations.history import history_cache
+from api.config import settings
+from api.helpers.tokens import trim_to_token_budget
 from api.conversations.schemas import APIMessageParams, CreateConversationRequest, CreateMessageRequest, MessageDataResponse, ChatModelResponse
 
 class ConversationRepository(ConversationInterFace):
-    async def create_conversation(self, conn: AsyncConnection, payload: ConversationEntities):
+    async def create_conversation(self, conn: AsyncConnection, payload: ConversationEntities, commit: bool = True):
         stmt = insert(conversation).values(**payload.model_dump(exclude_unset=True)).returning(conversation.c.id)
         try:
             await conn.execute(statement=stmt)
-            await conn.commit()
+            if commit:
+                await conn.commit()
         except Exception as e:
             raise e
         return payload
@@ -29,6 +36,35 @@ class ConversationRepository(ConversationInterFace):
         result = await conn.execute(statement=stmt)
         return result.fetchall()
     
+    async def get_conversation(self, conn: AsyncConnection, payload: ConversationEntities) -> RowMapping | None:
+        stmt = select(
+            conversation.c.id,
+            conversation.c.title,
+            conversation.c.created_by,
+            conversation.c.summary,
+            conversation.c.summary_message_id,
+        ).where(eq(conversation.c.id, payload.id))
+        try:
+            result = await conn.execute(statement=stmt)
+            return result.mappings().first()
+        except Exception as e:
+            raise e
+
+    async def update_summary(self, conn: AsyncConnection, payload: ConversationEntities):
+        stmt = (
+            update(conversation)
+            .where(eq(conversation.c.id, payload.id))
+            .values(
+                summary=payload.summary,
+                summary_message_id=payload.summary_message_id,
+                summary_updated_at=func.now(),
+            )
+        )
+        try:
+            await conn.execute(statement=stmt)
+        except Exception as e:
+            raise e
+
     async def get_conversation_by_id(self, conn: AsyncConnection, payload: ConversationEntities) -> Sequence[RowMapping]:
         messages_cte = (
             select(
@@ -74,6 +110,47 @@ class MessageRepository(MessageInterFace):
             raise e
         return payload
     
+    async def create_messages(self, conn: AsyncConnection, payloads: list[MessageEntities]):
+        """Inserts all payloads with one multi-row INSERT, committing is up to the caller."""
+        if not payloads:
+            return payloads
+        stmt = insert(message).values([payload.model_dump(exclude_unset=True) for payload in payloads])
+        try:
+            await conn.execute(statement=stmt)
+        except Exception as e:
+            raise e
+        return payloads
+
+    async def get_recent_messages(
+            self,
+            conn: AsyncConnection,
+            conversation_id,
+            limit: int,
+            before: tuple | None = None,
+        ) -> Sequence[RowMapping]:
+        """
+        Last `limit` messages of a conversation, oldest first. `before` is a
+        (created_at, id) keyset cursor for loading the window before it.
+        """
+        stmt = (
+            select(
+                message.c.id,
+                message.c.content,
+                cast(message.c.message_type, String).label("message_type"),
+                message.c.created_at,
+            )
+            .where(eq(message.c.conversation_id, conversation_id))
+            .order_by(desc(message.c.created_at), desc(message.c.id))
+            .limit(limit)
+        )
+        if before is not None:
+            stmt = stmt.where(tuple_(message.c.created_at, message.c.id) < tuple_(*before))
+        try:
+            result = await conn.execute(statement=stmt)
+            return list(reversed(result.mappings().fetchall()))
+        except Exception as e:
+            raise e
+
     async def delete_message(self, conn: AsyncConnection, payload: MessageEntities):
         stmt = delete(message).where(eq(message.c.id, payload.id))
         try:
@@ -84,10 +161,106 @@ class MessageRepository(MessageInterFace):
         return payload
 
 
+class SemanticCacheRepository(SemanticCacheInterFace):
+    async def get_embedding_dimensions(self, conn: AsyncConnection) -> int | None:
+        # typmod kolom vector(n) adalah n; None kalau tabelnya belum ada
+        stmt = text("""
+            SELECT atttypmod FROM pg_attribute
+            WHERE attrelid = to_regclass('semantic_answer_cache') AND attname = 'embedding'
+        """)
+        try:
+            result = await conn.execute(statement=stmt)
+            return result.scalar()
+        except Exception as e:
+            raise e
+
+    async def get_data_version(self, conn: AsyncConnection) -> int:
+        # versi yang sudah tercermin di view flight_fares, bukan versi tabel sumber:
+        # jawaban dari view yang belum di-refresh tidak boleh ditandai lebih baru
+        stmt = select(fare_view_version())
+        try:
+            result = await conn.execute(statement=stmt)
+            return int(result.scalar() or 0)
+        except Exception as e:
+            raise e
+
+    async def find_similar(
+            self,
+            conn: AsyncConnection,
+            embedding: list[float],
+            similarity_threshold: float,
+            resolved_date,
+        ) -> RowMapping | None:
+        current_version = fare_view_version()
+        distance = semantic_answer_cache.c.embedding.cosine_distance(embedding)
+        stmt = (
+            select(
+                semantic_answer_cache.c.id,
+                semantic_answer_cache.c.question,
+                semantic_answer_cache.c.sql,
+                semantic_answer_cache.c.answer,
+                (1 - distance).label("similarity_score"),
+            )
+            .where(
+                eq(semantic_answer_cache.c.data_version, current_version),
+                eq(semantic_answer_cache.c.resolved_date, cast(resolved_date, Date)),
+                distance <= 1 - similarity_threshold,
+            )
+            .order_by(distance)
+            .limit(1)
+        )
+        try:
+            result = await conn.execute(statement=stmt)
+            row = result.mappings().first()
+            if row is not None:
+                await conn.execute(
+                    update(semantic_answer_cache)
+                    .where(eq(semantic_answer_cache.c.id, row["id"]))
+                    .values(hit_count=semantic_answer_cache.c.hit_count + 1)
+                )
+                await conn.commit()
+            return row
+        except Exception as e:
+            raise e
+
+    async def create_entry(self, conn: AsyncConnection, payload: SemanticCacheEntities):
+        stmt = insert(semantic_answer_cache).values(**payload.model_dump(exclude_unset=True))
+        try:
+            await conn.execute(statement=stmt)
+            await conn.commit()
+        except Exception as e:
+            raise e
+        return payload
+
+    async def delete_stale(self, conn: AsyncConnection, current_date) -> int:
+        current_version = fare_view_version()
+        # entry untuk tanggal yang sudah lewat tidak akan pernah cocok lagi
+        stmt = delete(semantic_answer_cache).where(
+            (semantic_answer_cache.c.data_version != current_version)
+            | (semantic_answer_cache.c.resolved_date < cast(current_date, Date))
+        )
+        try:
+            result = await conn.execute(statement=stmt)
+            await conn.commit()
+        except Exception as e:
+            raise e
+        return result.rowcount
+
+
+def to_langchain_message(message_type: str, content: str, message_id=None) -> BaseMessage:
+    # id pesan ikut disimpan supaya ringkasan percakapan tahu sampai pesan mana yang sudah diringkas
+    message_id = str(message_id) if message_id is not None else None
+    if message_type == MessageTypeEnum.question:
+        return HumanMessage(content=content, id=message_id)
+    return AIMessage(content=content, id=message_id)
+
+
 class InMemoryChatMessageHistory(BaseChatMessageHistory):
-    def __init__(self, conn, conversation_id: str):
+    def __init__(self, conn, conversation_id: str, summarizer=None, unit_of_work=None):
         self.conn = conn
         self.conversation_id = conversation_id
+        self.summarizer = summarizer
+        self.unit_of_work = unit_of_work
         self._messages_cache = []
 
     @property
@@ -99,26 +272,35 @@ class InMemoryChatMessageHistory(BaseChatMessageHistory):
         return self._messages_cache
 
     async def aget_messages(self):
-        """Load messages dari DB"""
+        """Load window pesan terakhir, dari cache jika ada, selain itu dari DB"""
 
         if self.conversation_id != '':
-            # ✅ Selalu load fresh dari DB
-            data = await ConversationRepository().get_conversation_by_id(
-                conn=self.conn,
-                payload=ConversationEntities(id=self.conversation_id)
-            )
+            msgs = history_cache.get(self.conversation_id)
+            if msgs is None:
+                rows = await MessageRepository().get_recent_messages(
+                    conn=self.conn,
+                    conversation_id=self.conversation_id,
+                    limit=settings.HISTORY_WINDOW_MESSAGES,
+                )
+                msgs = [to_langchain_message(r["message_type"], r["content"], r["id"]) for r in rows]
+                if self.unit_of_work is not None:
+                    # pesan turn ini yang masih di-buffer, belum ada di DB
+                    msgs += [
+                        to_langchain_message(p.message_type, p.content, p.id)
+                        for p in self.unit_of_work.pending_messages(self.conversation_id)
+                    ]
+                history_cache.put(self.conversation_id, msgs)
+                logging.debug(f"Loaded {len(msgs)} messages for conversation {self.conversation_id}")
 
-            msgs = []
-            for r in data.get("messages", []):
-                if r["message_type"] == "question":
-                    msgs.append(HumanMessage(content=r["content"]))
-                else:
-                    msgs.append(AIMessage(content=r["content"]))
-            
+            # ringkasan + pesan yang belum diringkas, bukan seluruh history
+            summary = None
+            if self.summarizer is not None:
+                summary, msgs = self.summarizer.split(self.conversation_id, msgs)
+            msgs = trim_to_token_budget(msgs, settings.HISTORY_MAX_TOKENS)
+            if summary is not None:
+                msgs = [summary, *msgs]
             self._messages_cache = msgs
             self._loaded = True
-            
-            print(f"📜 Loaded {len(msgs)} messages for conversation {self.conversation_id}")  # ✅ Debug
             return msgs
         else:
             print(f"📜 New conversation detection")  # ✅ Debug
@@ -132,19 +314,22 @@ class InMemoryChatMessageHistory(BaseChatMessageHistory):
         
         print(f"💾 Saving message: {message_type.value} - {message.content[:50]}...")  # ✅ Debug
 
-        await MessageRepository().create_message(
-            conn=self.conn,
-            payload=CreateMessageRequest(
-                conversation_id=conversation_id,
-                content=message.content,
-                message_type=message_type,
-                token_usage={},
-                created_by="system",
-                metadata={}
-            ).transform()
-        )
+        payload = CreateMessageRequest(
+            conversation_id=conversation_id,
+            content=message.content,
+            message_type=message_type,
+            token_usage={},
+            created_by="system",
+            metadata={}
+        ).transform()
+        if self.unit_of_work is not None:
+            self.unit_of_work.add_message(payload)
+        else:
+            await MessageRepository().create_message(conn=self.conn, payload=payload)
         
         # ✅ Update cache juga
+        message = message.model_copy(update={"id": str(payload.id)})
+        history_cache.append(conversation_id, message)
         if self._messages_cache is not None:
             self._messages_cache.append(message)
 
@@ -159,6 +344,7 @@ class InMemoryChatMessageHistory(BaseChatMessageHistory):
             conn=self.conn,
             payload=MessageEntities(conversation_id=self.conversation_id)
         )
+        history_cache.evict(self.conversation_id)
         self._messages_cache = []
 
     # === ✅ Method sinkron untuk clear (fallback) ===
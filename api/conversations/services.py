@@ -1,62 +1,93 @@
+import asyncio
+import logging
 import re
 
-from datetime import datetime
+from datetime import date, datetime
+from functools import partial
 
 from api.conversations.models import conversation, message, MessageTypeEnum
 from api.conversations.schemas import APIMessageParams, CreateConversationRequest, CreateMessageRequest, MessageDataResponse, ChatModelResponse
 from api.conversations.repositories import ConversationRepository, MessageRepository, InMemoryChatMessageHistory
 from api.conversations.entities import ConversationEntities, MessageEntities
+from api.chatbot.context import SchemaContextCache, schema_context_cache
 from api.chatbot.repositories import ChatBotRepositories
+from api.conversations.prompts import LANGUAGE_DETECTION_PROMPT, UNDERSTANDING_PROMPT, SQL_PROMPT, SQL_ERROR_PROMPT, REPORT_PROMPT
+from api.conversations.caches import IntentSQLCache, SemanticAnswerCache, intent_sql_cache, semantic_cache, build_context_version
+from api.conversations.history import history_cache
+from api.conversations.summary import ConversationSummarizer, conversation_summarizer
+from api.conversations.unit_of_work import TurnUnitOfWork
+from api.conversations.fast_path import FastPathRouter, FlightQuery, fast_path_router
+from api.config import settings
+from api.database.client import engine
+from api.database.executor import GuardedSQLExecutor, QueryResult, SQLExecutionError, sql_executor
+from api.flights.gazetteer import AirportGazetteer, airport_gazetteer
+from api.conversations.helpers import format_sse, generate_time_now
+from api.helpers.metrics import observe_stage, span
+from api.helpers.pipeline import Pipeline, Stage, StageTiming
+from api.helpers.results import ResultEncoder
+from api.helpers.tokens import PromptTokenCounter
+from api.llm.registry import LLMClientRegistry, llm_registry
 
-from langchain_openai import OpenAIEmbeddings, OpenAI
-from langchain.chat_models import init_chat_model
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnableWithMessageHistory
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 
-from typing import Sequence
+from typing import AsyncIterator, Sequence
 from sqlalchemy.ext.asyncio import AsyncConnection
-from sqlalchemy import RowMapping, select, func, cast, insert, desc
+from sqlalchemy import Executable, RowMapping, select, func, cast, insert, desc
 from sqlalchemy.sql.operators import eq
 from sqlalchemy.sql import text
 from sqlalchemy.exc import ProgrammingError
 
-NOW = datetime.now()
+REPORT_PREFIX_HOLD = 16
 
 class ChatBotAI:
     def __init__(
             self,
             params: APIMessageParams,
+            registry: LLMClientRegistry = llm_registry,
+            sql_cache: IntentSQLCache = intent_sql_cache,
+            answer_cache: SemanticAnswerCache = semantic_cache,
+            schema_context: SchemaContextCache = schema_context_cache,
+            summarizer: ConversationSummarizer = conversation_summarizer,
+            sql_executor: GuardedSQLExecutor = sql_executor,
+            fast_path: FastPathRouter = fast_path_router,
+            gazetteer: AirportGazetteer = airport_gazetteer,
         ):
         self.params = params
-        self.llm = OpenAI(temperature = 0)
-        self.model = init_chat_model(
-            model="gpt-4o-mini",
-            stream_usage=True,
+        self.gazetteer = gazetteer
+        self.sql_executor = sql_executor
+        self.fast_path = fast_path
+        self.result_encoder = ResultEncoder(
+            max_tokens=settings.REPORT_RESULT_MAX_TOKENS,
+            output_format=settings.REPORT_RESULT_FORMAT,
         )
+        self.schema_context = schema_context
+        self.summarizer = summarizer
+        self.sql_cache = sql_cache
+        self.answer_cache = answer_cache
+        # tanggal dihitung per turn, bukan sekali saat module di-import
+        self.current_date = generate_time_now().strftime("%Y-%m-%d")
+        self.llm = registry.completion_model
+        self.model = registry.chat_model
+        self.embedding_cache = registry.embedding_cache
         self.conversation_id = ""
+        # semua insert conversation/message di turn ini di-flush sekaligus
+        self.unit_of_work = TurnUnitOfWork()
+        # jumlah token prompt per LLM call di turn ini
+        self.prompt_tokens: dict[str, int] = {}
 
     async def language_detection(self) -> str:
-        prompt_template = """
-You are a language detection model. Your task is to identify the language of the given text.
-
-Identify the language of the following text and respond with the language name only (e.g., English, Spanish, French, etc.):
-
-Text: Halo siapa nama kamu?
-Answer: Indonesian
-
-Text: Hello What is your name?
-Answer: English
-
-Text: {text}
-"""
         prompt = PromptTemplate(
-            template=prompt_template,
+            template=LANGUAGE_DETECTION_PROMPT,
             input_variables=["text"]
         )
         formatted_prompt = prompt.format(text=self.params.message)
-        response = self.model.invoke(formatted_prompt)
+        response = await self.model.ainvoke(
+            formatted_prompt,
+            config={"callbacks": [PromptTokenCounter(self.prompt_tokens, "language")]}
+        )
 
         return response.content.strip()
 
@@ -115,211 +146,254 @@ Text: {text}
         
         return True
 
-    async def create_conversation(
-            self,
-            conn: AsyncConnection,
-        ):
-        if self.params.conversation_id == "":
+    def build_pipeline(self, include_report: bool = True, fast_query: FlightQuery | None = None) -> Pipeline:
+        """
+        Stage graph of one conversation turn. Stages run as soon as their
+        inputs are ready; the ones that touch the DB check a pooled connection
+        out only for their own query, never across an LLM call.
+        When the prebuilt schema context covers the whole vector store, the
+        embedding and vector search stages are left out. A question the
+        fast path parsed skips context, history, intent and SQL generation.
+        """
+        if fast_query is not None:
+            sql_stages = [
+                Stage("fast_path", partial(self._fast_path_sql, fast_query), outputs=("sql", "intent", "context_version")),
+            ]
+        elif self.schema_context.covers_store:
+            context_stages = [
+                Stage("schema_context", self._prebuilt_context, outputs=("context", "context_version")),
+            ]
+        else:
+            context_stages = [
+                Stage("embedding", self._embed_question, outputs=("query_embeddings",)),
+                Stage("vector_search", self._search_context, inputs=("query_embeddings",), outputs=("context", "context_version")),
+            ]
+
+        if fast_query is None:
+            sql_stages = [
+                *context_stages,
+                Stage("history_load", self._load_history, inputs=("conversation_id", "question_saved"), outputs=("history",)),
+                Stage("intent_llm", self._detect_intent, inputs=("context", "history"), outputs=("intent",)),
+                Stage("sql_llm", self._generate_sql, inputs=("intent", "context", "context_version"), outputs=("sql",)),
+            ]
+
+        stages = [
+            Stage("conversation", self._resolve_conversation, outputs=("conversation_id", "created_by")),
+            Stage("message_insert", self._insert_question, inputs=("conversation_id", "created_by"), outputs=("question_saved",)),
+            *sql_stages,
+            Stage("sql_execution", self._execute_sql, inputs=("sql", "intent", "context_version"), outputs=("results", "truncated", "query_error", "data_version")),
+            Stage("language_detection", self._detect_language, outputs=("language",)),
+        ]
+        if include_report:
+            stages.append(
+                Stage("report_llm", self._report, inputs=("results", "truncated", "query_error", "created_by"), outputs=("response",))
+            )
+        return Pipeline(stages=stages)
+
+    async def create_conversation(self):
+        try:
+            return await self._answer()
+        finally:
+            if not settings.CONVERSATION_WRITES_AFTER_RESPONSE:
+                await self.flush_writes()
+
+    async def _answer(self) -> MessageDataResponse:
+        cached = await self._lookup_cached_answer()
+        if cached is not None:
+            return await self._answer_from_cache(cached)
+
+        fast_query = self._match_fast_path()
+        result = await self.build_pipeline(fast_query=fast_query).run(context={}, on_stage_end=observe_stage)
+        logging.debug(f"Stage timings (ms): {result.timings_ms()} total={result.total * 1000:.2f}")
+        self._record_route(fast_query, result.timings_ms())
+
+        response = result.context["response"]
+        response.metadata = {
+            **(response.metadata or {}),
+            "language": result.context["language"],
+            "stage_timings_ms": result.timings_ms(),
+            "prompt_tokens": self.prompt_tokens,
+            "result_truncated": result.context["truncated"],
+            "fast_path": fast_query is not None,
+        }
+        logging.debug(f"Prompt tokens: {self.prompt_tokens}")
+        await self._remember_answer(result.context, response.content)
+        return response
+
+    async def flush_writes(self):
+        """
+        Writes the rows buffered during this turn in one transaction. Runs
+        at the end of the turn, or as a background task after the response
+        when CONVERSATION_WRITES_AFTER_RESPONSE is set. A second call
+        after everything was written does nothing.
+        """
+        if not self.unit_of_work.has_pending:
+            return
+        try:
+            with span("persistence"):
+                await self.unit_of_work.flush()
+        except Exception:
+            # window di memory sudah berisi pesan yang gagal disimpan
+            history_cache.evict(self.conversation_id)
+            raise
+        if self.conversation_id:
+            self.summarizer.maybe_refresh(self.conversation_id)
+
+    @property
+    def uses_answer_cache(self) -> bool:
+        # hanya pertanyaan pembuka percakapan, follow-up bergantung pada history
+        return self.answer_cache.enabled and self.params.conversation_id == ""
+
+    async def _lookup_cached_answer(self):
+        if not self.uses_answer_cache:
+            return None
+        with span("embedding"):
+            query_embeddings = await self.embedding_cache.aembed_query(self.params.message)
+        cached = await self.answer_cache.lookup(embedding=query_embeddings, resolved_date=self.current_date)
+        if cached is not None:
+            logging.debug(f"Semantic cache hit ({cached['similarity_score']:.3f}): {cached['question']}")
+        return cached
+
+    async def _answer_from_cache(self, cached) -> MessageDataResponse:
+        conversation = await self._resolve_conversation()
+        await self._insert_question(**conversation)
+        await self._save_answer(content=cached["answer"], created_by=conversation["created_by"])
+
+        return MessageDataResponse(
+            conversation_id=self.conversation_id,
+            content=cached["answer"],
+            metadata={
+                "semantic_cache": {
+                    "question": cached["question"],
+                    "similarity": round(float(cached["similarity_score"]), 4),
+                }
+            },
+            token_usage={},
+            created_at=datetime.now()
+        )
+
+    async def _remember_answer(self, context: dict, answer: str):
+        if not self.uses_answer_cache or context["query_error"] is not None or context["data_version"] is None:
+            return
+        await self.answer_cache.store(
+            question=self.params.message,
+            # sudah ada di cache embedding sejak lookup
+            embedding=await self.embedding_cache.aembed_query(self.params.message),
+            sql=str(context["sql"]),
+            results=context["results"],
+            answer=answer,
+            data_version=context["data_version"],
+            resolved_date=self.current_date,
+        )
+
+    async def _resolve_conversation(self):
+        data = None
+        if self.params.conversation_id != "":
+            async with engine.connect() as conn:
+                data = await ConversationRepository().get_conversation(
+                    conn=conn,
+                    payload=ConversationEntities(id=self.params.conversation_id)
+                )
+
+        if data and data.get("id", None):
+            # get conversation_id and created_by
+            self.conversation_id = self.params.conversation_id
+            created_by = data.get("created_by", "")
+            self.summarizer.remember(self.conversation_id, data.get("summary"), data.get("summary_message_id"))
+        else:
+            # create new conversation_id when conversation_id is empty or not exists
             payload = CreateConversationRequest(
                 title=self.params.message,
                 created_by="user",
             ).transform()
-            await ConversationRepository().create_conversation(conn=conn, payload=payload)
+            self.unit_of_work.add_conversation(payload)
             self.conversation_id = payload.id
             created_by = payload.created_by
-        else:
-            data = await ConversationRepository().get_conversation_by_id(
-                conn=conn, 
-                payload=ConversationEntities(id=self.params.conversation_id)
-            )
-            if data.get("id", None):
-                # get conversation_id and created_by
-                self.conversation_id = self.params.conversation_id
-                created_by = data.get("created_by", "")
-            else:
-                # create new conversation_id when conversation_id is not exists
-                payload = CreateConversationRequest(
-                    title=self.params.message,
-                    created_by=created_by
-                ).transform()
-                await self.__conversation_repo.create_conversation(conn=conn, payload=payload)
-
-                self.conversation_id = self.params.conversation_id
-                created_by = payload.created_by
-        
+            # percakapan baru belum punya history, tidak perlu dibaca dari DB
+            history_cache.put(self.conversation_id, [])
+
+        return {"conversation_id": self.conversation_id, "created_by": created_by}
+
+    async def _insert_question(self, conversation_id, created_by: str):
         # create message from user
         message_payload = CreateMessageRequest(
-            conversation_id=self.conversation_id,
+            conversation_id=conversation_id,
             content=self.params.message,
             message_type=MessageTypeEnum.question,
             token_usage={},
             created_by=created_by,
             metadata={}
         ).transform()
-        await MessageRepository().create_message(conn=conn, payload=message_payload)
+        self.unit_of_work.add_message(message_payload)
+        history_cache.append(conversation_id, HumanMessage(content=self.params.message, id=str(message_payload.id)))
+        return {"question_saved": True}
+
+    def _match_fast_path(self) -> FlightQuery | None:
+        fast_query = self.fast_path.match(
+            self.params.message,
+            conversation_id=self.params.conversation_id,
+            today=date.fromisoformat(self.current_date),
+        )
+        if fast_query is not None:
+            logging.debug(f"Fast path: {fast_query.describe()}")
+        return fast_query
 
-        query_embeddings = OpenAIEmbeddings().embed_query(
-                self.params.message
+    def _record_route(self, fast_query: FlightQuery | None, timings_ms: dict[str, float]):
+        if fast_query is not None:
+            self.fast_path.remember(self.conversation_id, fast_query)
+        else:
+            self.fast_path.record_llm_turn(timings_ms)
+            self.fast_path.forget(self.conversation_id)
+
+    async def _fast_path_sql(self, fast_query: FlightQuery):
+        return {
+            "sql": fast_query.statement(limit=self.fast_path.result_limit),
+            "intent": fast_query.describe(),
+            "context_version": "fast-path",
+        }
+
+    async def _embed_question(self):
+        query_embeddings = await self.embedding_cache.aembed_query(self.params.message)
+        return {"query_embeddings": query_embeddings}
+
+    async def _search_context(self, query_embeddings: list):
+        async with engine.connect() as conn:
+            results = await ChatBotRepositories().search_similiar_embeddings(
+                conn=conn,
+                message=query_embeddings
             )
-            
-        results = await ChatBotRepositories().search_similiar_embeddings(
-            conn=conn,
-            message=query_embeddings
-        )
         context = "\n\n".join([doc.document for doc in results])
-#         prompt_template = """
-# Anda adalah expert SQL developer yang akan mengkonversi pertanyaan bahasa natural ke SQL query. Kamu akan menggunakan PostgreSQL untuk melakakukan task ini
-
-# TANGGAL HARI INI: {current_date}
-
-# SCHEMA DATABASE:
-# {context}
-
-# Informasi Terkait Skema:
-
-# Table: flight_prices
-# id: ID unik untuk setiap row
-# flight_number: nomor penerbangan yang dikombinasikan dengan huruf. contoh GA123
-# "class": tipe kelas dari penerbangan tsb
-# base_price: harga sebelum dikenakan pajak
-# tax: nominal besar pajak
-# fee: biaya admin yang dikenakan
-# currency: mata uang yang dipakai
-# valid_from: waktu awal tersedia 
-# valid_to: waktu akhir tersedia atau kadaluarsanya
-# created_at: kapan data diubuat
-# updated_at: kapan data diubah
-# origin_code: kode penanda tempat pemberangkatan
-# destination_code: kode penanda tempat tujuan
-
-# Table: airports 
-# code: kode 3 huruf yang menandakan suatu bandara
-# name: nama bandara
-# city: kota dimana bandara berada
-# country: negara dimana bandara berada
-# timezone: waktu setempat bandara
-# created_at: data dibuat
-# updated_at: data diubah
-
-# ATURAN PENTING:
-# 1. Gunakan HANYA tabel dan kolom yang ada di schema
-# 2. Pastikan sintaks PostgreSQL yang benar  
-# 3. Gunakan JOIN yang tepat untuk relasi antar tabel
-# 4. Untuk agregasi, gunakan GROUP BY yang sesuai
-# 5.ketika user bertanya mengenai ketersedian pada tanggal tertentu, gunakan kolom valid_from dengan inputan sesuai dengan jadwal yang diminta user dan valid_to hingga satu bulan kedepan contoh:
-# - untuk informasi waktu saat ini, gunakan tanggal hari ini yaitu {current_date}
-# - jika user menyebutkan tanggal saja, gunakan {current_date} sebagai acuan tahun dan bulan
-# - jika user tidak menyebutkan tanggal, berikan informasi tiket yang valid_from lebih besar atau sama dengan {current_date}
-# 6. Gunakan alias tabel untuk kemudahan baca (contoh: u untuk users, p untuk products, o untuk orders, oi untuk order_items)
-# 7. Return HANYA SQL query tanpa penjelasan tambahan, tanda markdown, tanpa awalan "JAWABAN:", "answer:", "query:", "sql:", etc. HANYA BERIKAN RAW QUERY.
-# 8. Berikan Query yang terbaik dan pastikan dapat dijalankan ketika mengeksekusi query. Kamu bisa memberikan detail query supaya dapat memberikan informasi lebih kepada user mengenai apa yang dia cari.
-
-# EXAMPLES:
-# Q: Tampilkan semua TIKET
-# A: SELECT * FROM flight_prices;
-
-# Q: Tampilkan tiket dari CGK ke DPS
-# A: SELECT fp.flight_number, fp.class, fp.base_price, fp.tax, fp.fee, fp.currency, fp.valid_from, fp.valid_to, fp.origin_code, fp.destination_code, a1.name AS origin_name, a2.name AS destination_name FROM flight_prices fp INNER JOIN airports a1 ON fp.origin_code = a1.code INNER JOIN airports a2 ON fp.destination_code = a2.code WHERE fp.origin_code = 'CGK' AND fp.destination_code = 'DPS';
-
-# Q: Apakah ada jadwal pesawat dari CGK ke DPS pada tanggal 7 Agustus?
-# A: SELECT fp.flight_number, fp.class, fp.base_price, fp.tax, fp.fee, fp.currency, fp.valid_from, fp.valid_to, fp.origin_code, fp.destination_code, a1.name AS origin_name, a2.name AS destination_name FROM flight_prices fp INNER JOIN airports a1 ON fp.origin_code = a1.code INNER JOIN airports a2 ON fp.destination_code = a2.code WHERE fp.origin_code = 'CGK' AND fp.destination_code = 'DPS' AND fp.valid_from >= '2025-08-07' AND valid_to <= '2025-09-07';
-
-# Q: Apakah ada jadwal pesawat dari Jakarta ke Bali pada tanggal 7 Agustus?
-# A: SELECT fp.flight_number, fp.class, fp.base_price, fp.tax, fp.fee, fp.currency, fp.valid_from, fp.valid_to, fp.origin_code, fp.destination_code, a1.name AS origin_name, a2.name AS destination_name FROM flight_prices fp INNER JOIN airports a1 ON fp.origin_code = a1.code INNER JOIN airports a2 ON fp.destination_code = a2.code WHERE a1.city = 'Jakarta' AND a2.city = 'Denpasar' AND fp.valid_from >= '2025-08-07' AND valid_to <= '2025-09-07';
-
-# Now generate SQL for the user's question below.
-# """
-
-        understanding_prompt = """
-Kamu adalah SQL analyst assistant. Tugasmu adalah memahami pertanyaan user dan context sebelumnya.
-
-TANGGAL HARI INI: {current_date}
-
-DATABASE SCHEMA:
-{context}
-
-INFORMASI TABEL:
-Table: flight_prices
-id: ID unik untuk setiap row
-flight_number: nomor penerbangan yang dikombinasikan dengan huruf. contoh GA123
-"class": tipe kelas dari penerbangan tsb
-base_price: harga sebelum dikenakan pajak
-tax: nominal besar pajak
-fee: biaya admin yang dikenakan
-currency: mata uang yang dipakai
-valid_from: waktu awal tersedia 
-valid_to: waktu akhir tersedia atau kadaluarsanya
-created_at: kapan data diubuat
-updated_at: kapan data diubah
-origin_code: kode penanda tempat pemberangkatan
-destination_code: kode penanda tempat tujuan
-
-Table: airports 
-code: kode 3 huruf yang menandakan suatu bandara
-name: nama bandara
-city: kota dimana bandara berada
-country: negara dimana bandara berada
-timezone: waktu setempat bandara
-created_at: data dibuat
-updated_at: data diubah
-
-Tugasmu:
-1. Jika user bertanya follow-up (seperti "yang paling murah?", "berapa harganya?"), identifikasi apa yang dimaksud dari percakapan sebelumnya
-2. Reformulasi pertanyaan menjadi pertanyaan lengkap yang bisa dijawab dengan SQL
-3. Output harus dalam format: "QUERY_INTENT: [penjelasan singkat apa yang harus di-query]"
-
-Contoh:
-User sebelumnya tanya: "Ada penerbangan Jakarta-Bali tanggal 7 Agustus?"
-User sekarang tanya: "Yang paling murah?"
-Output: "QUERY_INTENT: Cari penerbangan Jakarta-Bali tanggal 7 Agustus dengan harga paling murah"
-"""
-
-        sql_prompt = """
-Kamu adalah expert SQL generator. Generate ONLY valid PostgreSQL query.
-
-DATABASE SCHEMA:
-{context}
-
-ATURAN KRITIS:
-1. Return HANYA SQL query
-2. Mulai langsung dengan SELECT
-3. TIDAK BOLEH ada teks lain, prefix, atau penjelasan
-4. TIDAK BOLEH ada "AI:", "answer:", "jawaban:", atau apapun
-5. TIDAK BOLEH ada markdown atau code blocks
-
-EXAMPLES:
-Intent: Cari semua penerbangan
-Output: SELECT * FROM flight_prices;
-
-Intent: Cari penerbangan Jakarta-Bali tanggal 7 Agustus
-Output: SELECT fp.* FROM flight_prices fp INNER JOIN airports a1 ON fp.origin_code = a1.code INNER JOIN airports a2 ON fp.destination_code = a2.code WHERE a1.city = 'Jakarta' AND a2.city = 'Denpasar' AND fp.valid_from >= '2025-08-07' AND valid_to <= '2025-09-07';
-
-Intent: Cari penerbangan Jakarta-Bali dengan harga termurah
-Output: SELECT fp.* FROM flight_prices fp INNER JOIN airports a1 ON fp.origin_code = a1.code INNER JOIN airports a2 ON fp.destination_code = a2.code WHERE a1.city = 'Jakarta' AND a2.city = 'Denpasar' LIMIT 1;
-"""
+        return {"context": context, "context_version": build_context_version(context)}
+
+    async def _prebuilt_context(self):
+        return {"context": self.schema_context.context, "context_version": self.schema_context.context_version}
+
+    async def _load_history(self, conversation_id, question_saved: bool):
+        async with engine.connect() as conn:
+            history = InMemoryChatMessageHistory(
+                conn=conn,
+                conversation_id=conversation_id,
+                summarizer=self.summarizer,
+                unit_of_work=self.unit_of_work,
+            )
+            # === ✅ Load messages ke cache sebelum invoke ===
+            await history.aget_messages()
+        print("Success Load Message History")
+        return {"history": history}
+
+    def _resolve_locations(self) -> str:
+        places = self.gazetteer.find_places(self.params.message)
+        if not places:
+            return "-"
+        return "\n".join(f"- {place.name}: {self.gazetteer.describe(place.codes)}" for place in places)
 
+    async def _detect_intent(self, context: str, history: InMemoryChatMessageHistory):
         understanding_prompt_ = ChatPromptTemplate.from_messages([
-            ("system",understanding_prompt),
+            ("system", UNDERSTANDING_PROMPT),
             MessagesPlaceholder(variable_name="history"),
-            ("human","{question}")
+            ("human", "{question}")
         ])
 
-        sql_prompt_ = ChatPromptTemplate.from_messages([
-            ("system",sql_prompt),
-            ("human", "Intent: {intent}\n\nGenerate SQL:")
-        ])
-
-        # === ✅ Buat instance history di luar agar bisa di-load dulu ===
-        history = InMemoryChatMessageHistory(
-            conn=conn, 
-            conversation_id=self.conversation_id
-        )
-        print("Success Get History")
-        
-        # === ✅ Load messages ke cache sebelum invoke ===
-        await history.aget_messages()
-        print("Success Load Message History")
-
         def get_session_history(session_id: str):
             """Harus return instance yang sama"""
             return history
@@ -331,164 +405,219 @@ Output: SELECT fp.* FROM flight_prices fp INNER JOIN airports a1 ON fp.origin_co
             input_messages_key="question",
             history_messages_key="history",
         )
-        
+
         intent_output = await understanding_chain.ainvoke(
             {
                 "question": self.params.message,
                 "context": context,
-                "current_date": NOW.strftime("%Y-%m-%d")
+                "locations": self._resolve_locations(),
+                "current_date": self.current_date
             },
-            config={"configurable": {"session_id": self.params.conversation_id}}
+            config={
+                "configurable": {"session_id": self.params.conversation_id},
+                "callbacks": [PromptTokenCounter(self.prompt_tokens, "intent")],
+            }
         )
-        
+
         print(f"🧠 Intent: {intent_output}")
-        
+
         # Extract intent
         if "QUERY_INTENT:" in intent_output:
             intent = intent_output.split("QUERY_INTENT:")[1].strip()
         else:
             intent = intent_output
-        
+        return {"intent": intent}
+
+    async def _generate_sql(self, intent: str, context: str, context_version: str):
+        cached_sql = self.sql_cache.get(intent, context_version, self.current_date)
+        if cached_sql is not None:
+            logging.debug(f"Cached SQL: {cached_sql}")
+            return {"sql": cached_sql}
+
         # Chain 2: Generate SQL tanpa memory (pure generation)
-        print("Generating SQL...")
+        sql_prompt_ = ChatPromptTemplate.from_messages([
+            ("system", SQL_PROMPT),
+            ("human", "Intent: {intent}\n\nGenerate SQL:")
+        ])
         sql_chain = sql_prompt_ | self.model | StrOutputParser()
-        
-        raw_sql = await sql_chain.ainvoke({
-            "intent": intent,
-            "context": context
-        })
-        
+
+        raw_sql = await sql_chain.ainvoke(
+            {
+                "intent": intent,
+                "context": context
+            },
+            config={"callbacks": [PromptTokenCounter(self.prompt_tokens, "sql")]}
+        )
+
         print(f"🔍 Raw SQL: {raw_sql}")
-        
+
         # Clean and validate
         clean_sql = await self.clean_sql(raw_sql)
-        
+
         if not self.validate_sql_output(clean_sql):
             raise ValueError(f"Invalid SQL generated: {raw_sql}")
-        
-        print(f"✅ Clean SQL: {clean_sql}")
-        
-        # Simpan SQL ke memory (optional, untuk tracking)
-        # await history.aadd_message(AIMessage(content=f"[SQL Generated for: {question}]"))
 
-        # # Generate SQL using LLM
-        # formatted_prompt = prompt.format(context=context, question=self.params.message, current_date=NOW.strftime("%Y-%m-%d"))
-        # sql_query = self.llm(formatted_prompt).strip()
-        
-        # # Clean up the response
-        # if sql_query.startswith("```sql"):
-        #     sql_query = sql_query[6:]
-        # if sql_query.endswith("```"):
-        #     sql_query = sql_query[:-3]
+        print(f"✅ Clean SQL: {clean_sql}")
+        self.sql_cache.set(intent, context_version, self.current_date, clean_sql)
+        return {"sql": clean_sql}
 
+    async def _execute_sql(self, sql: str, intent: str, context_version: str):
+        # versi dibaca sebelum query, jadi jawaban tidak pernah ditandai lebih baru dari datanya
+        data_version = await self.answer_cache.get_data_version() if self.uses_answer_cache else None
         try:
-            # Execute SQL query
-            results = await self.execute_query(conn=conn, sql_query=clean_sql)
-            print("Success executing SQL")
-
-            # Language Detection
-            language = await self.language_detection()
-            print("Success collect Language")
-
-            # Report Agent
-            report = await self.report_agent(question=self.params.message, result_query=results, conn=conn)
-            print(f"REPORT: {report}")
-            return report
-        
-        except ProgrammingError as e:
-            await conn.rollback() 
+            result = await self.execute_query(sql_query=sql)
+            print(f"Success executing SQL: {len(result.rows)} rows, truncated={result.truncated}")
+            return {"results": result.rows, "truncated": result.truncated, "query_error": None, "data_version": data_version}
+        except (ProgrammingError, SQLExecutionError) as e:
+            # SQL yang gagal dieksekusi jangan dipakai ulang dari cache
+            self.sql_cache.invalidate(intent, context_version, self.current_date)
             print("---------ERROR---------")
-            str_error = str(e)
-
-            prompt_template = """
-Kamu adalah data analyst yang ahli yang dimana kamu bekerja untuk suatu pelayanan penerbangan. Kamu akan diberikan suatu error log dan pertanyaan dari user.
-Berikan informasi kepada user mengapa kesalahan dapat terjadi. Bisa jadi user bertanya diluar batas pengetahuanmu.
+            return {"results": None, "truncated": False, "query_error": str(e), "data_version": data_version}
 
-contoh:
-question: siapa presiden singapura
-answer: maaf kami tidak mengetahui jawaban mengenai permintaan anda. silahkan bertanya seputar tiket dan penerbangan yang kamu mau tahu ya.
+    async def _detect_language(self):
+        return {"language": await self.language_detection()}
 
-INSTRUKSI:
-1. JAWAB pertanyaan user secara LANGSUNG. Kamu boleh memodifikasi jawaban dengan lebih natural dan enak dibaca oleh user
+    async def _report(self, results, truncated: bool, query_error: str | None, created_by: str):
+        if query_error is None:
+            report = await self.report_agent(question=self.params.message, result_query=results, truncated=truncated)
+            return {"response": report}
 
-question: {question}
-error message: {error_message}
-            """
+        report = await self.model.ainvoke(
+            self._format_error_prompt(query_error),
+            config={"callbacks": [PromptTokenCounter(self.prompt_tokens, "report")]}
+        )
+        await self._save_answer(content=report.content, created_by=created_by)
 
-            prompt = PromptTemplate(
-                template=prompt_template,
-                input_variables=["question", "error_message"]
-            )
-            formatted_prompt = prompt.format(question=self.params.message, error_message=str_error)
-            report = self.model.invoke(formatted_prompt)
-            
-            message_payload = CreateMessageRequest(
+        return {
+            "response": MessageDataResponse(
                 conversation_id=self.conversation_id,
-                content=report.content,
-                message_type=MessageTypeEnum.answer,
-                token_usage={},
-                created_by=created_by,
-                metadata={}
-
-            ).transform()
-            await MessageRepository().create_message(conn=conn, payload=message_payload)
-
-            return MessageDataResponse(
                 content=report.content,
                 token_usage=report.response_metadata.get("token_usage", {}),
                 created_at=datetime.now()
             )
-    
-    async def execute_query(
-        self,
-        conn: AsyncConnection,
-        sql_query: str
-    ):
-        try:
-            # Execute paginated query
-            result = await conn.execute(text(sql_query))
-            return result.mappings().fetchall()
-        except Exception as e:
-            raise e
-
-    async def report_agent(
-            self,
-            question: str,
-            conn: AsyncConnection,
-            result_query: list
-    ):
-        prompt_template = """
-Anda adalah asisten pelaporan yang ramah dan menarik yang bekerja untuk perusahaan penerbangan.Tugas Anda adalah mengubah hasil mentah menjadi penjelasan yang lancar, alami, dan sedikit playful yang mendorong pengguna untuk menjelajahi lebih lanjut.
-
-PERTANYAAN PENGGUNA:
-{question}
-
-JAWABAN MENTAH / DATA:
-{result_query}
-
-TUGAS:
-1. Tulis ulang jawaban dengan nada ramah dan santai — seolah-olah Anda sedang menjelaskan kepada teman.
-2. Pastikan semua angka dan fakta akurat. Jangan membuat data palsu.
-3. Gunakan bahasa yang sederhana dan jelas. Tambahkan sedikit kepribadian untuk membuatnya terasa menyenangkan dan mudah didekati.
-4. Jika data kosong, berikan tanggapan yang sopan dan dorong pengguna untuk mencoba bertanya hal lain.
-5. Akhiri jawaban Anda dengan pertanyaan lanjutan yang ringan dan menarik untuk mendorong pengguna melanjutkan eksplorasi.
-6. Jangan tambahkan prefiks seperti “\n”, “AI:”, “Answer:”, “Report:”, “\n\nSystem:”, dll. Berikan JAWABAN AKHIR LANGSUNG.
+        }
 
-BAHASA TANGGAPAN:
-- Bahasa Indonesia
-
-OUTPUT:Kembalikan hanya tanggapan akhir, tanpa pengantar atau label.
-"""
+    def _format_error_prompt(self, query_error: str) -> str:
+        prompt = PromptTemplate(
+            template=SQL_ERROR_PROMPT,
+            input_variables=["question", "error_message"]
+        )
+        return prompt.format(question=self.params.message, error_message=query_error)
 
-        # === ✅ Buat instance history di luar agar bisa di-load dulu ===
-        history = InMemoryChatMessageHistory(
-            conn=conn, 
-            conversation_id=self.conversation_id
+    async def _save_answer(self, content: str, created_by: str):
+        message_payload = CreateMessageRequest(
+            conversation_id=self.conversation_id,
+            content=content,
+            message_type=MessageTypeEnum.answer,
+            token_usage={},
+            created_by=created_by,
+            metadata={}
+        ).transform()
+        self.unit_of_work.add_message(message_payload)
+        history_cache.append(self.conversation_id, AIMessage(content=content, id=str(message_payload.id)))
+
+    async def stream_conversation(self) -> AsyncIterator[str]:
+        """
+        Server-sent events for one turn: a `stage` event as each pipeline
+        stage finishes, `token` events while the answer is generated and a
+        final `done` event carrying the persisted message.
+        """
+        cached = await self._lookup_cached_answer()
+        if cached is not None:
+            yield format_sse("stage", {"stage": "semantic_cache", "duration_ms": 0})
+            response = await self._answer_from_cache(cached)
+            if not settings.CONVERSATION_WRITES_AFTER_RESPONSE:
+                await self.flush_writes()
+            yield format_sse("token", {"content": response.content})
+            yield format_sse("done", response.model_dump(mode="json"))
+            return
+
+        events: asyncio.Queue = asyncio.Queue()
+
+        def on_stage_end(timing: StageTiming, outputs: dict):
+            observe_stage(timing, outputs)
+            events.put_nowait(format_sse("stage", {"stage": timing.name, "duration_ms": round(timing.duration * 1000, 2)}))
+
+        fast_query = self._match_fast_path()
+        pipeline = self.build_pipeline(include_report=False, fast_query=fast_query)
+        task = asyncio.create_task(pipeline.run(context={}, on_stage_end=on_stage_end))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            result = await task
+        except Exception as ex:
+            yield format_sse("error", {"message": str("Failed asking the model.\n" + str(ex))})
+            return
+        finally:
+            task.cancel()
+
+        context = result.context
+        self._record_route(fast_query, result.timings_ms())
+        # report di luar pipeline saat streaming, termasuk waktu client membaca token
+        with span("report_llm"):
+            if context["query_error"] is None:
+                async for chunk in self.astream_report(question=self.params.message, result_query=context["results"], truncated=context["truncated"]):
+                    yield format_sse("token", {"content": chunk})
+                content = self.streamed_content
+            else:
+                stream = (
+                    chunk.content
+                    async for chunk in self.model.astream(
+                        self._format_error_prompt(context["query_error"]),
+                        config={"callbacks": [PromptTokenCounter(self.prompt_tokens, "report")]}
+                    )
+                )
+                async for chunk in self._stream_clean_chunks(stream):
+                    yield format_sse("token", {"content": chunk})
+                content = self.streamed_content
+                await self._save_answer(content=content, created_by=context["created_by"])
+
+        response = MessageDataResponse(
+            conversation_id=self.conversation_id,
+            content=content,
+            metadata={
+                "language": context["language"],
+                "stage_timings_ms": result.timings_ms(),
+                "prompt_tokens": self.prompt_tokens,
+                "result_truncated": context["truncated"],
+                "fast_path": fast_query is not None,
+            },
+            token_usage={},
+            created_at=datetime.now()
         )
-        print("Success Get History")
-        
-        # === ✅ Load messages ke cache sebelum invoke ===
-        await history.aget_messages()
+        await self._remember_answer(context, content)
+        if not settings.CONVERSATION_WRITES_AFTER_RESPONSE:
+            await self.flush_writes()
+        yield format_sse("done", response.model_dump(mode="json"))
+
+    async def execute_query(
+        self,
+        sql_query: str | Executable
+    ) -> QueryResult:
+        # read only, statement_timeout dan batas jumlah row, lihat GuardedSQLExecutor
+        return await self.sql_executor.execute(sql_query)
+
+    def encode_results(self, rows, truncated: bool = False) -> str:
+        # header + tabel CSV/markdown, bukan repr RowMapping/Decimal
+        encoded = self.result_encoder.encode(rows, truncated=truncated)
+        logging.debug(f"Result encoded: {encoded.rows_included}/{encoded.rows_total} rows, {encoded.tokens} tokens")
+        return encoded.text
+
+    async def _build_report_chain(self):
+        # koneksi hanya dipakai saat load history (cache miss), dilepas sebelum LLM dipanggil
+        async with engine.connect() as conn:
+            # === ✅ Buat instance history di luar agar bisa di-load dulu ===
+            history = InMemoryChatMessageHistory(
+                conn=conn, 
+                conversation_id=self.conversation_id,
+                summarizer=self.summarizer,
+                unit_of_work=self.unit_of_work,
+            )
+            print("Success Get History")
+            
+            # === ✅ Load messages ke cache sebelum invoke ===
+            await history.aget_messages()
         print("Success Load Message History")
 
         def get_session_history(session_id: str):
@@ -496,7 +625,7 @@ OUTPUT:Kembalikan hanya tanggapan akhir, tanpa pengantar atau label.
             return history
 
         prompt = ChatPromptTemplate.from_messages([
-            ("system",prompt_template),
+            ("system",REPORT_PROMPT),
             MessagesPlaceholder(variable_name="history"),
             ("human","{question}")
         ])
@@ -509,20 +638,35 @@ OUTPUT:Kembalikan hanya tanggapan akhir, tanpa pengantar atau label.
             input_messages_key="question",
             history_messages_key="history",
         )
+        return chain_with_history, history
+
+    def clean_report(self, response: str) -> str:
+        response = response.replace("\\n", "\n")
+        response = re.sub(r'^[\n\s]*(System|AI|Assistant|Answer|Report|Response|Human):\s*', '', response, flags=re.IGNORECASE)
+        return response.lstrip("\n").lstrip()
+
+    async def report_agent(
+            self,
+            question: str,
+            result_query: list,
+            truncated: bool = False,
+    ):
+        chain_with_history, history = await self._build_report_chain()
 
         print(f"Generating Report...")
         response = await chain_with_history.ainvoke(
             {
                 "question": question,
-                "result_query": result_query,
+                "result_query": self.encode_results(result_query, truncated),
             },
-            config={"configurable": {"session_id": self.params.conversation_id}}
+            config={
+                "configurable": {"session_id": self.params.conversation_id},
+                "callbacks": [PromptTokenCounter(self.prompt_tokens, "report")],
+            }
         )
 
         # Clean up response
-        response = response.replace("\\n", "\n")
-        response = re.sub(r'^[\n\s]*(System|AI|Assistant|Answer|Report|Response|Human):\s*', '', response, flags=re.IGNORECASE)
-        response = response.lstrip("\n").lstrip()
+        response = self.clean_report(response)
 
         # 💾 Simpan response AI
         await history.aadd_message(AIMessage(content=response), conversation_id=self.conversation_id)
@@ -532,4 +676,56 @@ OUTPUT:Kembalikan hanya tanggapan akhir, tanpa pengantar atau label.
             content=response,
             token_usage={},
             created_at=datetime.now()
-        )
\ No newline at end of file
+        )
+
+    async def astream_report(
+            self,
+            question: str,
+            result_query: list,
+            truncated: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Same as `report_agent` but yields the report while it is generated.
+        The label prefix the model sometimes adds is held back until the
+        first real words arrive; the full answer is saved once the stream ends.
+        """
+        chain_with_history, history = await self._build_report_chain()
+
+        print(f"Streaming Report...")
+        stream = chain_with_history.astream(
+            {
+                "question": question,
+                "result_query": self.encode_results(result_query, truncated),
+            },
+            config={
+                "configurable": {"session_id": self.params.conversation_id},
+                "callbacks": [PromptTokenCounter(self.prompt_tokens, "report")],
+            }
+        )
+        async for chunk in self._stream_clean_chunks(stream):
+            yield chunk
+
+        # 💾 Simpan response AI
+        await history.aadd_message(AIMessage(content=self.streamed_content), conversation_id=self.conversation_id)
+
+    async def _stream_clean_chunks(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        buffer = ""
+        sent = 0
+        async for chunk in stream:
+            buffer += chunk
+            if buffer.endswith("\\"):
+                # bisa jadi awal dari "\\n" literal yang belum lengkap
+                continue
+            cleaned = self.clean_report(buffer)
+            # tahan beberapa karakter pertama supaya prefix "AI:" dll bisa dibuang
+            if sent == 0 and len(cleaned) < REPORT_PREFIX_HOLD:
+                continue
+            emitted = cleaned[sent:]
+            if emitted:
+                sent = len(cleaned)
+                yield emitted
+
+        cleaned = self.clean_report(buffer)
+        if cleaned[sent:]:
+            yield cleaned[sent:]
+        self.streamed_content = cleaned
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import PromptTemplate
+
+from api.config import settings
+from api.conversations.entities import ConversationEntities
+from api.conversations.history import ConversationHistoryCache, history_cache
+from api.conversations.prompts import SUMMARY_PROMPT
+from api.conversations.repositories import ConversationRepository
+from api.database.client import engine
+from api.helpers.cache import LRUCache
+from api.helpers.tokens import count_message_tokens
+from api.llm.registry import LLMClientRegistry, llm_registry
+
+
+class ConversationSummarizer:
+    """
+    Rolling summary of a conversation, stored on the `conversations` row.
+
+    Prompts get the summary plus the messages it does not cover yet. Once
+    those pass `trigger_tokens`, a background task folds everything except
+    the last `keep_messages` into a new summary, so the history sent per
+    turn stays bounded no matter how long the conversation gets.
+    """
+
+    def __init__(
+            self,
+            enabled: bool,
+            trigger_tokens: int,
+            keep_messages: int,
+            max_words: int,
+            history: ConversationHistoryCache = history_cache,
+            registry: LLMClientRegistry = llm_registry,
+            conversation_repo: ConversationRepository | None = None,
+        ):
+        self.enabled = enabled
+        self.trigger_tokens = trigger_tokens
+        self.keep_messages = keep_messages
+        self.max_words = max_words
+        self.history = history
+        self.registry = registry
+        self.__conversation_repo = conversation_repo or ConversationRepository()
+        # conversation_id -> (summary, id pesan terakhir yang sudah diringkas)
+        self._summaries = LRUCache(
+            maxsize=settings.HISTORY_CACHE_MAX_CONVERSATIONS,
+            ttl=settings.HISTORY_CACHE_TTL_SECONDS,
+        )
+        self._running: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_ms = 0.0
+
+    def remember(self, conversation_id, summary: str | None, summary_message_id):
+        if summary:
+            self._summaries.set(str(conversation_id), (summary, str(summary_message_id)))
+
+    def split(self, conversation_id, messages: list[BaseMessage]) -> tuple[SystemMessage | None, list[BaseMessage]]:
+        """Summary as a system message, plus the messages it does not cover."""
+        state = self._summaries.get(str(conversation_id))
+        if state is None:
+            return None, messages
+
+        summary, last_message_id = state
+        uncovered = messages
+        for index, message in enumerate(messages):
+            if message.id == last_message_id:
+                uncovered = messages[index + 1:]
+                break
+        return SystemMessage(content=f"Ringkasan percakapan sebelumnya:\n{summary}"), uncovered
+
+    def maybe_refresh(self, conversation_id) -> bool:
+        """Schedules a background refresh when the unsummarized history is too long."""
+        conversation_id = str(conversation_id)
+        if not self.enabled or conversation_id in self._running:
+            return False
+
+        messages = self.history.get(conversation_id)
+        if messages is None:
+            return False
+        _, uncovered = self.split(conversation_id, messages)
+        if count_message_tokens(uncovered) <= self.trigger_tokens:
+            return False
+
+        self._running.add(conversation_id)
+        task = asyncio.create_task(self._refresh_safely(conversation_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _refresh_safely(self, conversation_id: str):
+        try:
+            await self.refresh(conversation_id)
+        except Exception as e:
+            self.failures += 1
+            logging.warning(f"Conversation summary refresh failed for {conversation_id}: {e}")
+        finally:
+            self._running.discard(conversation_id)
+
+    async def refresh(self, conversation_id: str):
+        messages = self.history.get(conversation_id)
+        if messages is None:
+            return
+        summary_message, uncovered = self.split(conversation_id, messages)
+        fold = uncovered[:-self.keep_messages] if self.keep_messages else uncovered
+        # tanpa id tidak bisa dicatat sampai mana ringkasan berlaku
+        if not fold or fold[-1].id is None:
+            return
+
+        start = time.perf_counter()
+        state = self._summaries.get(conversation_id)
+        prompt = PromptTemplate.from_template(SUMMARY_PROMPT).format(
+            summary=state[0] if state else "-",
+            conversation="\n".join(
+                f"{'User' if isinstance(message, HumanMessage) else 'Asisten'}: {message.content}"
+                for message in fold
+            ),
+            max_words=self.max_words,
+        )
+        response = await self.registry.chat_model.ainvoke(prompt)
+        summary = str(response.content).strip()
+
+        last_message_id = fold[-1].id
+        async with engine.begin() as conn:
+            await self.__conversation_repo.update_summary(
+                conn=conn,
+                payload=ConversationEntities(
+                    id=conversation_id, summary=summary, summary_message_id=last_message_id
+                ),
+            )
+        self._summaries.set(conversation_id, (summary, last_message_id))
+        self.refreshes += 1
+        self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 2)
+        print(f"📝 Summarized {len(fold)} messages for conversation {conversation_id}")
+
+    async def aclose(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "trigger_tokens": self.trigger_tokens,
+            "keep_messages": self.keep_messages,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "running": len(self._running),
+            "last_refresh_ms": self.last_refresh_ms,
+            "summaries": self._summaries.stats(),
+        }
+
+
+conversation_summarizer = ConversationSummarizer(
+    enabled=settings.SUMMARY_ENABLED,
+    trigger_tokens=settings.SUMMARY_TRIGGER_TOKENS,
+    keep_messages=settings.SUMMARY_KEEP_TURNS * 2,
+    max_words=settings.SUMMARY_MAX_WORDS,
+)
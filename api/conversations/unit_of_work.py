@@ -0,0 +1,59 @@
+import logging
+
+from api.conversations.entities import ConversationEntities, MessageEntities
+from api.conversations.repositories import ConversationRepository, MessageRepository
+from api.database.client import engine
+
+
+class TurnUnitOfWork:
+    """
+    Buffers the conversation and message rows written during one turn and
+    flushes them in a single transaction: the new conversation (if any)
+    first, then every message in one multi-row insert, then one commit.
+
+    Messages keep the order they were added in. Their `created_at` is taken
+    when the payload is built, so the (created_at, id) order history loading
+    relies on is the same as if they had been inserted one by one.
+    """
+
+    def __init__(
+            self,
+            conversation_repo: ConversationRepository | None = None,
+            message_repo: MessageRepository | None = None,
+        ):
+        self.__conversation_repo = conversation_repo or ConversationRepository()
+        self.__message_repo = message_repo or MessageRepository()
+        self._conversation: ConversationEntities | None = None
+        self._messages: list[MessageEntities] = []
+        self.flushes = 0
+
+    def add_conversation(self, payload: ConversationEntities):
+        self._conversation = payload
+
+    def add_message(self, payload: MessageEntities):
+        self._messages.append(payload)
+
+    def pending_messages(self, conversation_id) -> list[MessageEntities]:
+        return [payload for payload in self._messages if str(payload.conversation_id) == str(conversation_id)]
+
+    @property
+    def has_pending(self) -> bool:
+        return self._conversation is not None or bool(self._messages)
+
+    async def flush(self):
+        if not self.has_pending:
+            return
+
+        conversation_payload, messages = self._conversation, self._messages
+        self._conversation, self._messages = None, []
+        try:
+            async with engine.begin() as conn:
+                if conversation_payload is not None:
+                    await self.__conversation_repo.create_conversation(
+                        conn=conn, payload=conversation_payload, commit=False
+                    )
+                await self.__message_repo.create_messages(conn=conn, payloads=messages)
+        except Exception as e:
+            logging.error(f"Failed to flush conversation writes ({len(messages)} messages): {e}")
+            raise e
+        self.flushes += 1
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Request, Response, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Request, Response, HTTPException
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
+from api.chatbot.context import schema_context_cache
+from api.conversations.caches import intent_sql_cache, semantic_cache
+from api.conversations.history import history_cache
+from api.conversations.summary import conversation_summarizer
+from api.conversations.fast_path import fast_path_router
+from api.flights.fares import fare_view
+from api.flights.fx import fx_rates
+from api.flights.gazetteer import airport_gazetteer
 from api.conversations.services import ChatBotAI
 from api.conversations.schemas import APIMessageParams, ChatModelResponse, ChatModelErrorResponse
-from api.database.database import DBConnection
+from api.config import settings
+from api.llm.registry import LLMRegistry
 
 conversation_router = APIRouter(prefix='/api/v1/conversations', tags=["Conversations"])
 
@@ -11,11 +21,16 @@ conversation_router = APIRouter(prefix='/api/v1/conversations', tags=["Conversat
 async def chat_v2(
     request: Request,
     response:Response,
-    db: DBConnection,
-    params: APIMessageParams
+    registry: LLMRegistry,
+    params: APIMessageParams,
+    background_tasks: BackgroundTasks,
 ):
+    chatbot = ChatBotAI(params=params, registry=registry)
+    # tanpa setting ini create_conversation sudah flush sebelum response
+    if settings.CONVERSATION_WRITES_AFTER_RESPONSE:
+        background_tasks.add_task(chatbot.flush_writes)
     try:
-        chat = await ChatBotAI(params=params).create_conversation(conn=db)
+        chat = await chatbot.create_conversation()
         return ChatModelResponse(resp=chat)
     except HTTPException as ex:
         response.status_code = ex.status_code
@@ -26,4 +41,40 @@ async def chat_v2(
         response.status_code = 500
         return ChatModelErrorResponse(
             message=str("Failed asking the model.\n" + str(ex))
-        )
\ No newline at end of file
+        )
+
+@conversation_router.post("/stream")
+async def chat_stream(
+    request: Request,
+    registry: LLMRegistry,
+    params: APIMessageParams
+):
+    chatbot = ChatBotAI(params=params, registry=registry)
+
+    # ChatBotAI mengambil koneksi sendiri per fase DB, tidak ada koneksi yang
+    # ditahan selama response streaming
+    return StreamingResponse(
+        chatbot.stream_conversation(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(chatbot.flush_writes),
+    )
+
+
+@conversation_router.get("/cache/stats")
+async def cache_stats(
+    request: Request,
+    registry: LLMRegistry,
+):
+    return {
+        "intent_sql": intent_sql_cache.stats(),
+        "semantic_answer": semantic_cache.stats(),
+        "schema_context": schema_context_cache.stats(),
+        "history": history_cache.stats(),
+        "summary": conversation_summarizer.stats(),
+        "fast_path": fast_path_router.stats(),
+        "airports": airport_gazetteer.stats(),
+        "fare_view": fare_view.stats(),
+        "fx_rates": fx_rates.stats(),
+        "embedding": registry.embedding_cache.stats(),
+    }
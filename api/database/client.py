@@ -1,8 +1,23 @@
+import time
+
 from sqlalchemy import URL, MetaData
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from api.config import settings
 from api.helpers.generators import build_connection_url
+from api.helpers.metrics import pool_checked_out, pool_checkout_wait
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+	"""Records how long each checkout waited for a free (or new) connection."""
+
+	def _do_get(self):
+		start = time.perf_counter()
+		try:
+			return super()._do_get()
+		finally:
+			pool_checkout_wait.observe(time.perf_counter() - start)
 
 
 class DatabaseClient:
@@ -12,7 +27,11 @@ class DatabaseClient:
 	def create_engine(self) -> AsyncEngine:
 		return create_async_engine(
 			url=self.connection_url,
-			pool_pre_ping=True,
+			pool_size=settings.DB_POOL_SIZE,
+			max_overflow=settings.DB_MAX_OVERFLOW,
+			pool_timeout=settings.DB_POOL_TIMEOUT,
+			pool_pre_ping=settings.DB_POOL_PRE_PING,
+			poolclass=TimedQueuePool,
 			# echo=True,
 			# echo_pool=True
 		)
@@ -29,4 +48,5 @@ connection_url = build_connection_url(
 
 client = DatabaseClient(database_connection_url=connection_url)
 engine = client.create_engine()
+pool_checked_out.set_function(engine.pool.checkedout)
 metadata = MetaData()
\ No newline at end of file
@@ -0,0 +1,85 @@
+import time
+from dataclasses import dataclass, field
+
+from psycopg import errors as pg_errors
+from sqlalchemy import Executable, RowMapping, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.config import settings
+from api.database.client import engine
+
+
+class SQLExecutionError(Exception):
+    """Generated SQL was rejected by the guards (timeout, write attempt, privileges)."""
+
+
+@dataclass
+class QueryResult:
+    rows: list[RowMapping] = field(default_factory=list)
+    truncated: bool = False
+    elapsed: float = 0.0
+
+
+class GuardedSQLExecutor:
+    """
+    Runs SQL written by the model (or built by the fast path) inside guard
+    rails.
+
+    Every query runs in its own READ ONLY transaction with a transaction-local
+    `statement_timeout`, through a server-side cursor. At most `max_rows`
+    rows are fetched (in chunks of `fetch_size`), one extra row tells whether
+    the result was cut off, and the cursor is closed without reading the rest.
+    """
+
+    GUARD_ERRORS = (
+        pg_errors.QueryCanceled,
+        pg_errors.ReadOnlySqlTransaction,
+        pg_errors.InsufficientPrivilege,
+    )
+
+    def __init__(
+            self,
+            statement_timeout_ms: int,
+            max_rows: int,
+            fetch_size: int,
+            db_engine: AsyncEngine = engine,
+        ):
+        self.statement_timeout_ms = statement_timeout_ms
+        self.max_rows = max_rows
+        self.fetch_size = fetch_size
+        self.engine = db_engine
+
+    async def execute(self, sql: str | Executable) -> QueryResult:
+        start = time.perf_counter()
+        async with self.engine.connect() as conn:
+            try:
+                # dua statement pertama transaksi; keduanya hilang saat rollback
+                await conn.execute(text("SET TRANSACTION READ ONLY"))
+                await conn.execute(text(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}"))
+
+                statement = text(sql) if isinstance(sql, str) else sql
+                result = await conn.stream(statement.execution_options(yield_per=self.fetch_size))
+                try:
+                    rows = await result.mappings().fetchmany(self.max_rows + 1)
+                finally:
+                    await result.close()
+            except DBAPIError as e:
+                if isinstance(e.orig, self.GUARD_ERRORS):
+                    raise SQLExecutionError(str(e.orig)) from e
+                raise e
+            finally:
+                await conn.rollback()
+
+        return QueryResult(
+            rows=rows[:self.max_rows],
+            truncated=len(rows) > self.max_rows,
+            elapsed=time.perf_counter() - start,
+        )
+
+
+sql_executor = GuardedSQLExecutor(
+    statement_timeout_ms=settings.SQL_STATEMENT_TIMEOUT_MS,
+    max_rows=settings.SQL_MAX_ROWS,
+    fetch_size=settings.SQL_FETCH_SIZE,
+)
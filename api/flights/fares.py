@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+
+from api.database.client import engine
+from api.flights.repositories import FlightRepositories
+
+
+class FareViewRefresher:
+    """
+    Keeps the flight_fares materialized view in step with flight_prices.
+
+    data_versions holds the source version (flight_prices + fx_rates) the
+    view was last built from under "flight_fares"; the view is refreshed
+    concurrently whenever a source has moved past it, either right after a
+    fare or rate load or from the periodic check.
+    """
+
+    def __init__(self, flights_repo: FlightRepositories | None = None):
+        self.__flights_repo = flights_repo or FlightRepositories()
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+        self.last_duration: float | None = None
+        self.version: int | None = None
+
+    async def refresh(self, concurrently: bool = True) -> int:
+        async with self._lock:
+            start = time.perf_counter()
+            async with engine.begin() as conn:
+                # versi dibaca sebelum refresh, perubahan di tengah refresh terambil di putaran berikutnya
+                version = await self.__flights_repo.get_fare_source_version(conn=conn)
+                await self.__flights_repo.refresh_fares(conn=conn, concurrently=concurrently)
+                await self.__flights_repo.set_data_version(conn=conn, table_name="flight_fares", version=version)
+            self.last_duration = time.perf_counter() - start
+            self.version = version
+            self.refreshes += 1
+            logging.info(f"flight_fares refreshed to version {version} in {self.last_duration:.2f}s")
+            return version
+
+    async def refresh_if_stale(self) -> bool:
+        async with engine.connect() as conn:
+            source_version = await self.__flights_repo.get_fare_source_version(conn=conn)
+            fares_version = await self.__flights_repo.get_data_version(conn=conn, table_name="flight_fares")
+        self.version = fares_version
+        if fares_version >= source_version:
+            return False
+        await self.refresh()
+        return True
+
+    async def refresh_safely(self):
+        try:
+            await self.refresh_if_stale()
+        except Exception as e:
+            logging.warning(f"flight_fares refresh failed: {e}")
+
+    async def refresh_periodically(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh_safely()
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "refreshes": self.refreshes,
+            "last_duration_ms": round(self.last_duration * 1000, 2) if self.last_duration is not None else None,
+        }
+
+
+fare_view = FareViewRefresher()
@@ -0,0 +1,160 @@
+import asyncio
+import csv
+import json
+import logging
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from api.config import settings
+from api.database.client import engine
+from api.flights.repositories import FlightRepositories
+
+# skala kolom fx_rates.rate_to_base, Numeric(18, 8)
+RATE_QUANTUM = Decimal("1e-8")
+
+
+def parse_rates_file(path: str | Path, base_currency: str) -> dict[str, Decimal]:
+    """
+    Rates from a local JSON or CSV file, rebased onto `base_currency`.
+
+    JSON: {"base": "USD", "rates": {"SGD": 0.74, ...}}
+    CSV:  currency,rate_to_base[,base_currency]
+
+    A rate is the value of one unit of the currency in the file's base.
+    """
+    path = Path(path)
+    try:
+        if path.suffix.lower() == ".json":
+            payload = json.loads(path.read_text())
+            file_base = payload.get("base", base_currency).upper()
+            raw_rates = payload["rates"]
+        else:
+            with path.open(newline="") as f:
+                rows = list(csv.DictReader(f))
+            file_base = (rows[0].get("base_currency") or base_currency).upper() if rows else base_currency
+            raw_rates = {row["currency"]: row["rate_to_base"] for row in rows}
+        rates = {currency.upper(): Decimal(str(rate)) for currency, rate in raw_rates.items()}
+    except (KeyError, TypeError, AttributeError, InvalidOperation, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid FX rates file {path}: {e}") from e
+
+    rates.setdefault(file_base, Decimal(1))
+    if file_base != base_currency:
+        # contoh: file berbasis SGD, base aplikasi USD -> bagi dengan kurs USD di file
+        if base_currency not in rates or not rates[base_currency]:
+            raise ValueError(f"FX rates file {path} has no rate for base currency {base_currency}")
+        pivot = rates[base_currency]
+        rates = {currency: rate / pivot for currency, rate in rates.items()}
+    if any(rate <= 0 for rate in rates.values()):
+        raise ValueError(f"FX rates file {path} has non-positive rates")
+    return rates
+
+
+class FXRateCache:
+    """
+    In-process snapshot of the fx_rates table.
+
+    Reloaded when the fx_rates or flight_prices version in `data_versions`
+    changes. Rates can be loaded from a local file, so normalized prices
+    also work offline.
+
+    Currencies used in flight_prices without a rate are kept in
+    `unrated_currencies` and logged as a warning: their fares have no
+    normalized price, so they cannot be ranked against the others.
+    """
+
+    def __init__(self, base_currency: str, flights_repo: FlightRepositories | None = None):
+        self.base_currency = base_currency.upper()
+        self.__flights_repo = flights_repo or FlightRepositories()
+        self.rates: dict[str, Decimal] = {self.base_currency: Decimal(1)}
+        self.unrated_currencies: list[str] = []
+        self.data_version: int | None = None
+        self.refreshed_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> int:
+        async with self._lock:
+            async with engine.connect() as conn:
+                version = await self.__flights_repo.get_fare_source_version(conn=conn)
+                rows = await self.__flights_repo.get_fx_rates(conn=conn)
+                unrated = await self.__flights_repo.get_unrated_currencies(conn=conn)
+            rates = {self.base_currency: Decimal(1)}
+            for row in rows:
+                if row["base_currency"].upper() != self.base_currency:
+                    logging.warning(f"Skipping FX rate {row['currency']}: based on {row['base_currency']}, not {self.base_currency}")
+                    continue
+                rates[row["currency"].upper()] = Decimal(row["rate_to_base"])
+            if unrated:
+                logging.warning(
+                    f"No FX rate for {', '.join(unrated)} (base {self.base_currency}): these fares have no "
+                    f"normalized price and fare questions skip the fast path. Load rates via FX_RATES_FILE or fx_rates."
+                )
+            self.rates = rates
+            self.unrated_currencies = unrated
+            self.data_version = version
+            self.refreshed_at = time.monotonic()
+            return len(rates)
+
+    async def refresh_if_changed(self) -> bool:
+        async with engine.connect() as conn:
+            version = await self.__flights_repo.get_fare_source_version(conn=conn)
+        if self.refreshed_at is not None and version == self.data_version:
+            return False
+        await self.refresh()
+        return True
+
+    async def refresh_safely(self):
+        try:
+            await self.refresh_if_changed()
+        except Exception as e:
+            logging.warning(f"FX rates refresh failed: {e}")
+
+    async def refresh_periodically(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh_safely()
+
+    async def load_file(self, path: str | Path) -> int:
+        """Upserts the file's rates that differ from fx_rates; returns how many were written."""
+        rates = {currency: rate.quantize(RATE_QUANTUM) for currency, rate in parse_rates_file(path, self.base_currency).items()}
+        async with engine.begin() as conn:
+            current = {
+                row["currency"].upper(): Decimal(row["rate_to_base"])
+                for row in await self.__flights_repo.get_fx_rates(conn=conn)
+                if row["base_currency"].upper() == self.base_currency
+            }
+            # kurs yang sama tidak ditulis ulang: tiap write menaikkan versi fx_rates,
+            # yang memicu refresh flight_fares dan membuat semantic cache basi
+            rows = [
+                {"currency": currency, "base_currency": self.base_currency, "rate_to_base": rate, "source": str(path)}
+                for currency, rate in rates.items()
+                if current.get(currency) != rate
+            ]
+            if rows:
+                await self.__flights_repo.upsert_fx_rates(conn=conn, rows=rows)
+        logging.info(f"Loaded FX rates from {path}: {len(rows)} of {len(rates)} changed")
+        await self.refresh()
+        return len(rows)
+
+    def to_base(self, amount: Decimal, currency: str) -> Decimal | None:
+        rate = self.rates.get(currency.upper())
+        return None if rate is None else amount * rate
+
+    def convert(self, amount: Decimal, currency: str, target: str) -> Decimal | None:
+        base_amount = self.to_base(amount, currency)
+        target_rate = self.rates.get(target.upper())
+        if base_amount is None or target_rate is None:
+            return None
+        return base_amount / target_rate
+
+    def stats(self) -> dict:
+        return {
+            "base_currency": self.base_currency,
+            "currencies": sorted(self.rates),
+            "unrated_currencies": self.unrated_currencies,
+            "data_version": self.data_version,
+            "age_seconds": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at else None,
+        }
+
+
+fx_rates = FXRateCache(base_currency=settings.FX_BASE_CURRENCY)
@@ -0,0 +1,247 @@
+import asyncio
+import bisect
+import logging
+import re
+import time
+from dataclasses import dataclass
+
+from api.config import settings
+from api.database.client import engine
+from api.flights.repositories import FlightRepositories
+
+# nama yang dipakai user tapi tidak ada di tabel airports;
+# hanya dipakai kalau kodenya memang ada di tabel
+AIRPORT_ALIASES: dict[str, tuple[str, ...]] = {
+    "CGK": ("jkt", "soetta", "cengkareng", "soekarno hatta"),
+    "HLP": ("halim", "jakarta halim"),
+    "DPS": ("bali", "ngurah rai"),
+    "SUB": ("juanda", "suroboyo"),
+    "JOG": ("jogja", "yogya", "yogyakarta", "adisucipto"),
+    "YIA": ("jogja", "yogya", "yogyakarta", "kulon progo"),
+    "KNO": ("medan", "kualanamu"),
+    "UPG": ("makassar", "ujung pandang", "hasanuddin"),
+    "LOP": ("lombok", "mataram"),
+    "BPN": ("balikpapan", "sepinggan"),
+    "KUL": ("kl", "klia"),
+    "SIN": ("singapura", "changi"),
+    "BKK": ("suvarnabhumi",),
+    "DMK": ("don mueang",),
+    "NRT": ("tokyo", "narita"),
+    "HND": ("tokyo", "haneda"),
+    "SYD": ("sydney",),
+    "HKG": ("hongkong", "hong kong"),
+}
+
+# kata umum di nama bandara yang tidak boleh dianggap nama tempat
+NAME_STOPWORDS = {"international", "airport", "bandara", "internasional", "udara", "bandar"}
+
+
+def normalize_place(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.casefold()))
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Airport:
+    code: str
+    name: str
+    city: str
+    country: str
+
+
+@dataclass(frozen=True)
+class PlaceMatch:
+    text: str
+    name: str
+    codes: frozenset[str]
+    score: float
+    kind: str
+
+
+class AirportGazetteer:
+    """
+    In-process index of the `airports` table for resolving place names.
+
+    Codes, cities, airport names, countries and a list of common aliases
+    ("Bali", "KL", "Jogja") map to airport codes. Lookups are exact first,
+    then by prefix over a sorted name list, then by trigram similarity for
+    typos, all in memory. The index is rebuilt whenever the `airports`
+    version in `data_versions` changes.
+    """
+
+    def __init__(self, min_similarity: float = 0.5, flights_repo: FlightRepositories | None = None):
+        self.min_similarity = min_similarity
+        self.__flights_repo = flights_repo or FlightRepositories()
+        self.airports: dict[str, Airport] = {}
+        self._names: dict[str, frozenset[str]] = {}
+        self._kinds: dict[str, str] = {}
+        self._sorted_names: list[str] = []
+        self._trigram_index: dict[str, set[str]] = {}
+        self.max_words = 1
+        self.data_version: int | None = None
+        self.refreshed_at: float | None = None
+        self._lock = asyncio.Lock()
+        self.lookups = 0
+        self.fuzzy_hits = 0
+
+    def build(self, rows):
+        airports, names, kinds = {}, {}, {}
+
+        def add(name: str, code: str, kind: str):
+            name = normalize_place(name)
+            if not name or name in NAME_STOPWORDS:
+                return
+            names[name] = names.get(name, frozenset()) | {code}
+            kinds.setdefault(name, kind)
+
+        for row in rows:
+            airport = Airport(code=row["code"], name=row["name"], city=row["city"], country=row["country"])
+            airports[airport.code] = airport
+            add(airport.code, airport.code, "code")
+            add(airport.city, airport.code, "city")
+            add(airport.name, airport.code, "airport")
+            # "Soekarno-Hatta International Airport" -> "soekarno hatta"
+            short_name = " ".join(word for word in normalize_place(airport.name).split() if word not in NAME_STOPWORDS)
+            add(short_name, airport.code, "airport")
+            for alias in AIRPORT_ALIASES.get(airport.code, ()):
+                add(alias, airport.code, "alias")
+
+        # negara paling akhir: nama kota/bandara yang sama dengan negara ("Singapore") tetap menang
+        for airport in airports.values():
+            country = normalize_place(airport.country)
+            if kinds.get(country, "country") == "country":
+                add(country, airport.code, "country")
+
+        trigram_index: dict[str, set[str]] = {}
+        for name in names:
+            for gram in trigrams(name):
+                trigram_index.setdefault(gram, set()).add(name)
+
+        self.airports = airports
+        self._names = names
+        self._kinds = kinds
+        self._sorted_names = sorted(names)
+        self._trigram_index = trigram_index
+        self.max_words = max((len(name.split()) for name in names), default=1)
+
+    async def refresh(self) -> int:
+        async with self._lock:
+            async with engine.connect() as conn:
+                version = await self.__flights_repo.get_data_version(conn=conn, table_name="airports")
+                rows = await self.__flights_repo.get_airports(conn=conn)
+            self.build(rows)
+            self.data_version = version
+            self.refreshed_at = time.monotonic()
+            logging.info(f"Airport gazetteer loaded {len(self.airports)} airports (version {version})")
+            return len(self.airports)
+
+    async def refresh_if_changed(self) -> bool:
+        async with engine.connect() as conn:
+            version = await self.__flights_repo.get_data_version(conn=conn, table_name="airports")
+        if self.refreshed_at is not None and version == self.data_version:
+            return False
+        await self.refresh()
+        return True
+
+    async def refresh_safely(self):
+        try:
+            await self.refresh_if_changed()
+        except Exception as e:
+            logging.warning(f"Airport gazetteer refresh failed: {e}")
+
+    async def refresh_periodically(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh_safely()
+
+    def lookup(self, text: str) -> frozenset[str]:
+        """Airport codes for an exact code, city, airport name, country or alias."""
+        return self._names.get(normalize_place(text), frozenset())
+
+    def kind(self, text: str) -> str | None:
+        """What an exact name is: "code", "city", "airport", "alias" or "country"."""
+        return self._kinds.get(normalize_place(text))
+
+    def _match(self, text: str, name: str, score: float) -> PlaceMatch:
+        return PlaceMatch(text=text, name=name, codes=self._names[name], score=round(score, 3), kind=self._kinds[name])
+
+    def search(self, text: str, limit: int = 5) -> list[PlaceMatch]:
+        """Best matches for `text`: exact, then prefix, then trigram similarity."""
+        self.lookups += 1
+        query = normalize_place(text)
+        if not query:
+            return []
+        if query in self._names:
+            return [self._match(text, query, 1.0)]
+
+        matches: dict[str, float] = {}
+        if len(query) >= 3:
+            start = bisect.bisect_left(self._sorted_names, query)
+            for name in self._sorted_names[start:start + limit]:
+                if not name.startswith(query):
+                    break
+                matches[name] = 0.9 * len(query) / len(name) + 0.1
+
+        query_grams = trigrams(query)
+        counts: dict[str, int] = {}
+        for gram in query_grams:
+            for name in self._trigram_index.get(gram, ()):
+                counts[name] = counts.get(name, 0) + 1
+        for name, shared in counts.items():
+            # Dice coefficient antar trigram
+            score = 2 * shared / (len(query_grams) + len(trigrams(name)))
+            if score >= self.min_similarity and score > matches.get(name, 0.0):
+                matches[name] = score
+
+        ranked = sorted(matches.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [self._match(text, name, score) for name, score in ranked]
+
+    def resolve(self, text: str) -> frozenset[str]:
+        """Codes of the single best match, empty when nothing is close enough or the best match is a tie."""
+        matches = self.search(text, limit=2)
+        if not matches:
+            return frozenset()
+        if len(matches) == 2 and matches[0].score == matches[1].score and matches[0].codes != matches[1].codes:
+            return frozenset()
+        if matches[0].score < 1.0:
+            self.fuzzy_hits += 1
+        return matches[0].codes
+
+    def find_places(self, text: str) -> list[PlaceMatch]:
+        """Every known place mentioned in `text`, longest names first, exact matches only."""
+        words = normalize_place(text).split()
+        found, index = [], 0
+        while index < len(words):
+            for size in range(min(self.max_words, len(words) - index), 0, -1):
+                name = " ".join(words[index:index + size])
+                # kode 3 huruf hanya dihitung kalau ditulis kapital di teks asli
+                if name in self._names and (self._kinds[name] != "code" or name.upper() in text):
+                    found.append(self._match(name, name, 1.0))
+                    index += size
+                    break
+            else:
+                index += 1
+        return found
+
+    def describe(self, codes) -> str:
+        return ", ".join(
+            f"{code} ({self.airports[code].name}, {self.airports[code].city}, {self.airports[code].country})"
+            for code in sorted(codes) if code in self.airports
+        )
+
+    def stats(self) -> dict:
+        return {
+            "airports": len(self.airports),
+            "names": len(self._names),
+            "data_version": self.data_version,
+            "lookups": self.lookups,
+            "fuzzy_hits": self.fuzzy_hits,
+            "age_seconds": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at else None,
+        }
+
+
+airport_gazetteer = AirportGazetteer(min_similarity=settings.AIRPORT_FUZZY_MIN_SIMILARITY)
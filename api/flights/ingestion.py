@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import io
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+import pandas as pd
+
+from psycopg import errors as pg_errors
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.config import settings
+from api.database.client import engine
+from api.flights.fares import FareViewRefresher, fare_view
+from api.flights.models import flight_price
+from api.flights.repositories import FARE_STAGING_COLUMNS, FlightRepositories
+
+FILE_FORMATS = ("csv", "parquet")
+DEFAULT_CURRENCY = flight_price.c.currency.default.arg
+# error data dari COPY/upsert: format angka/tanggal salah, kolom wajib kosong, dll
+DATA_ERRORS = (pg_errors.DataError, pg_errors.IntegrityError)
+
+
+class FareIngestionError(Exception):
+    """The fare file cannot be loaded as a whole (bad columns, bad values, unknown airports in strict mode)."""
+
+
+@dataclass
+class FareIngestionReport:
+    source: str
+    rows_read: int = 0
+    rows_invalid: int = 0
+    rows_duplicate: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    unknown_airports: dict[str, int] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "rows_read": self.rows_read,
+            "rows_invalid": self.rows_invalid,
+            "rows_duplicate": self.rows_duplicate,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "unknown_airports": self.unknown_airports,
+            "timings_ms": {name: round(seconds * 1000, 2) for name, seconds in self.timings.items()},
+            "elapsed_ms": round(self.elapsed * 1000, 2),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def detect_format(path: str | Path) -> str:
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix not in FILE_FORMATS:
+        raise FareIngestionError(f"Cannot tell the format of {path}, expected one of {FILE_FORMATS}")
+    return suffix
+
+
+def read_chunks(path: str | Path, file_format: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if file_format == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False, na_values=[""])
+        return
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise FareIngestionError("Parquet ingestion needs pyarrow installed") from e
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+
+def to_staging_csv(chunk: pd.DataFrame) -> str:
+    """One chunk as header-less CSV in FARE_STAGING_COLUMNS order, codes and classes normalized."""
+    chunk = chunk.rename(columns=lambda name: str(name).strip().lower())
+    if "currency" not in chunk:
+        chunk["currency"] = DEFAULT_CURRENCY
+    missing = [column for column in FARE_STAGING_COLUMNS if column not in chunk]
+    if missing:
+        raise FareIngestionError(f"Missing columns: {missing}")
+
+    chunk = chunk[list(FARE_STAGING_COLUMNS)].copy()
+    for column in ("flight_number", "origin", "destination", "currency"):
+        chunk[column] = chunk[column].astype("string").str.strip().str.upper()
+    chunk["class"] = chunk["class"].astype("string").str.strip().str.lower()
+    chunk["currency"] = chunk["currency"].fillna(DEFAULT_CURRENCY)
+
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, header=False, index=False)
+    return buffer.getvalue()
+
+
+class FareIngestor:
+    """
+    Bulk fare loader: file -> COPY into a staging table -> upsert into flight_prices.
+
+    The file is read in chunks in a worker thread while the previous chunk
+    is streamed through COPY, so neither pandas nor the network sits idle.
+    Airport codes are checked in one set-based query, rows with unknown
+    airports are dropped (or the load is aborted in strict mode), and the
+    upsert on (flight_number, class, origin, destination, valid_from) skips
+    rows whose values did not change. Everything runs in one transaction.
+    """
+
+    def __init__(
+            self,
+            chunk_size: int,
+            flights_repo: FlightRepositories | None = None,
+            fares: FareViewRefresher | None = fare_view,
+            db_engine: AsyncEngine = engine,
+        ):
+        self.chunk_size = chunk_size
+        self.__flights_repo = flights_repo or FlightRepositories()
+        self.fares = fares
+        self.engine = db_engine
+
+    async def ingest(
+            self,
+            path: str | Path,
+            file_format: str | None = None,
+            created_by: str = "ingestion",
+            strict: bool = False,
+        ) -> FareIngestionReport:
+        file_format = file_format or detect_format(path)
+        if file_format not in FILE_FORMATS:
+            raise FareIngestionError(f"Unsupported format {file_format}, expected one of {FILE_FORMATS}")
+        report = FareIngestionReport(source=str(path))
+        start = time.perf_counter()
+
+        try:
+            async with self.engine.begin() as conn:
+                await self.__flights_repo.create_fare_staging(conn=conn)
+
+                phase = time.perf_counter()
+                chunks = self._csv_chunks(read_chunks(path, file_format, self.chunk_size), report)
+                await self.__flights_repo.copy_fare_staging(conn=conn, chunks=chunks)
+                report.timings["copy"] = time.perf_counter() - phase
+
+                phase = time.perf_counter()
+                report.unknown_airports = await self.__flights_repo.get_staging_unknown_airports(conn=conn)
+                if report.unknown_airports and strict:
+                    raise FareIngestionError(f"Unknown airport codes: {sorted(report.unknown_airports)}")
+                if report.unknown_airports:
+                    report.rows_invalid = await self.__flights_repo.delete_staging_unknown_airports(conn=conn)
+                staged, keys = await self.__flights_repo.count_staging(conn=conn)
+                report.rows_duplicate = staged - keys
+                report.timings["validate"] = time.perf_counter() - phase
+
+                phase = time.perf_counter()
+                report.inserted, report.updated = await self.__flights_repo.upsert_fares_from_staging(
+                    conn=conn,
+                    created_by=created_by,
+                )
+                report.unchanged = keys - report.inserted - report.updated
+                report.timings["upsert"] = time.perf_counter() - phase
+        except DBAPIError as e:
+            if isinstance(e.orig, DATA_ERRORS):
+                raise FareIngestionError(str(e.orig)) from e
+            raise
+        except DATA_ERRORS as e:
+            # COPY lewat cursor psycopg langsung, error-nya tidak dibungkus SQLAlchemy
+            raise FareIngestionError(str(e)) from e
+        except (ValueError, pd.errors.ParserError) as e:
+            raise FareIngestionError(str(e)) from e
+
+        if self.fares is not None and (report.inserted or report.updated):
+            phase = time.perf_counter()
+            await self.fares.refresh_safely()
+            report.timings["refresh_fares"] = time.perf_counter() - phase
+
+        report.elapsed = time.perf_counter() - start
+        logging.info(f"Fare ingestion {report.as_dict()}")
+        return report
+
+    async def _csv_chunks(self, chunks: Iterator[pd.DataFrame], report: FareIngestionReport) -> AsyncIterator[str]:
+        def next_csv() -> tuple[int, str] | None:
+            chunk = next(chunks, None)
+            return None if chunk is None else (len(chunk), to_staging_csv(chunk))
+
+        # chunk berikutnya dibaca di thread selama chunk sekarang dikirim lewat COPY
+        pending = asyncio.create_task(asyncio.to_thread(next_csv))
+        try:
+            while True:
+                item = await pending
+                if item is None:
+                    return
+                pending = asyncio.create_task(asyncio.to_thread(next_csv))
+                rows, data = item
+                report.rows_read += rows
+                yield data
+        finally:
+            if not pending.done():
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+
+
+fare_ingestor = FareIngestor(chunk_size=settings.INGEST_CHUNK_SIZE)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bulk-load fares from a CSV or Parquet file into flight_prices.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FILE_FORMATS, default=None, help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.INGEST_CHUNK_SIZE)
+    parser.add_argument("--created-by", default="ingestion")
+    parser.add_argument("--strict", action="store_true", help="abort when any row references an unknown airport")
+    parser.add_argument("--no-refresh", action="store_true", help="do not refresh the flight_fares view afterwards")
+    args = parser.parse_args()
+
+    ingestor = FareIngestor(chunk_size=args.chunk_size, fares=None if args.no_refresh else fare_view)
+    try:
+        report = await ingestor.ingest(args.path, file_format=args.format, created_by=args.created_by, strict=args.strict)
+        print(json.dumps(report.as_dict(), indent=2))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
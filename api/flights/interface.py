@@ -1,6 +1,9 @@
-from typing import Protocol, Sequence
+import uuid
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, Protocol, Sequence
 from sqlalchemy.ext.asyncio import AsyncConnection
-from sqlalchemy import RowMapping
+from sqlalchemy import RowMapping, Table
 
 from api.flights.schemas import FlightsFilter
 
@@ -9,7 +12,87 @@ class FlightsInterface(Protocol):
     async def get_flights(
         self, 
         conn: AsyncConnection,
-        filter: FlightsFilter
+        filter: FlightsFilter,
+        after: tuple[date, uuid.UUID] | None = None,
+        table: Table = ...,
+        price_range: tuple[Decimal | None, Decimal | None] = (None, None),
+    ) -> Sequence[RowMapping]: ...
+
+    async def get_data_version(
+        self,
+        conn: AsyncConnection,
+        table_name: str,
+    ) -> int: ...
+
+    async def get_fare_source_version(
+        self,
+        conn: AsyncConnection,
+    ) -> int: ...
+
+    async def set_data_version(
+        self,
+        conn: AsyncConnection,
+        table_name: str,
+        version: int,
+    ): ...
+
+    async def refresh_fares(
+        self,
+        conn: AsyncConnection,
+        concurrently: bool = True,
+    ): ...
+
+    async def get_fx_rates(
+        self,
+        conn: AsyncConnection,
+    ) -> Sequence[RowMapping]: ...
+
+    async def get_unrated_currencies(
+        self,
+        conn: AsyncConnection,
+    ) -> list[str]: ...
+
+    async def upsert_fx_rates(
+        self,
+        conn: AsyncConnection,
+        rows: list[dict],
+    ): ...
+
+    async def create_fare_staging(
+        self,
+        conn: AsyncConnection,
+    ): ...
+
+    async def copy_fare_staging(
+        self,
+        conn: AsyncConnection,
+        chunks: AsyncIterator[str],
+    ) -> int: ...
+
+    async def get_staging_unknown_airports(
+        self,
+        conn: AsyncConnection,
+    ) -> dict[str, int]: ...
+
+    async def delete_staging_unknown_airports(
+        self,
+        conn: AsyncConnection,
+    ) -> int: ...
+
+    async def count_staging(
+        self,
+        conn: AsyncConnection,
+    ) -> tuple[int, int]: ...
+
+    async def upsert_fares_from_staging(
+        self,
+        conn: AsyncConnection,
+        created_by: str,
+    ) -> tuple[int, int]: ...
+
+    async def get_airports(
+        self,
+        conn: AsyncConnection,
     ) -> Sequence[RowMapping]: ...
 
     async def vector_stores(
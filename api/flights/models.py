@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, String, Numeric, Date, UUID, ForeignKey
+from sqlalchemy import MetaData, Table, Column, String, Numeric, Date, UUID, ForeignKey, BigInteger, DateTime
 from sqlalchemy.sql import func
 
 from api.models.base import get_audit_columns
@@ -35,4 +35,52 @@ airports = Table(
     Column("country", String(50), nullable=False), # Negara
     Column("timezone", String(50)),               # Timezone
     *get_audit_columns()
-)
\ No newline at end of file
+)
+
+# Versi data per tabel, dinaikkan oleh trigger setiap kali isi tabel berubah
+data_versions = Table(
+    "data_versions",
+    metadata,
+    Column("table_name", String(63), primary_key=True),
+    Column("version", BigInteger, nullable=False, server_default="0"),
+    Column("updated_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+# Kurs ke mata uang dasar: 1 unit currency = rate_to_base unit base_currency
+fx_rates = Table(
+    "fx_rates",
+    metadata,
+    Column("currency", String(3), primary_key=True),
+    Column("base_currency", String(3), nullable=False),
+    Column("rate_to_base", Numeric(18, 8), nullable=False),
+    Column("source", String(255)),
+    Column("updated_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+# Materialized view flight_fares (dibuat lewat migration). Sengaja tidak di
+# metadata utama supaya alembic autogenerate tidak membuatnya sebagai tabel.
+flight_fares = Table(
+    "flight_fares",
+    MetaData(),
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("flight_number", String(20)),
+    Column("class", String(20)),
+    Column("origin", String(3)),
+    Column("origin_name", String(100)),
+    Column("origin_city", String(50)),
+    Column("origin_country", String(50)),
+    Column("destination", String(3)),
+    Column("destination_name", String(100)),
+    Column("destination_city", String(50)),
+    Column("destination_country", String(50)),
+    Column("base_price", Numeric(10, 2)),
+    Column("tax", Numeric(10, 2)),
+    Column("fee", Numeric(10, 2)),
+    Column("total_price", Numeric(12, 2)),
+    Column("currency", String(3)),
+    Column("valid_from", Date),
+    Column("valid_to", Date),
+    # total_price dalam mata uang dasar fx_rates, NULL kalau kurs belum ada
+    Column("total_price_normalized", Numeric(14, 2)),
+    Column("normalized_currency", String(3)),
+)
@@ -1,30 +1,357 @@
-from typing import Sequence
+import uuid
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, Sequence
 from sqlalchemy.ext.asyncio import AsyncConnection
-from sqlalchemy import RowMapping, select, func, cast, insert, desc
+from sqlalchemy import RowMapping, Select, Table, select, func, cast, insert, desc, asc, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from api.flights.interface import FlightsInterface
 from api.flights.schemas import FlightsFilter
-from api.flights.models import flight_price
+from api.flights.models import flight_price, flight_fares, fx_rates, airports, data_versions
+from api.models.base import get_audit_columns
+
+AUDIT_COLUMNS = {column.name for column in get_audit_columns()}
+# tabel sumber flight_fares; perubahan kurs juga mengubah harga ternormalisasi
+FARE_SOURCE_TABLES = ("flight_prices", "fx_rates")
+# kunci upsert ingestion, sama dengan ux_flight_prices_fare_key
+FARE_KEY = ("flight_number", "class", "origin", "destination", "valid_from")
+FARE_STAGING_TABLE = "flight_prices_staging"
+FARE_STAGING_COLUMNS = (
+    "flight_number", "class", "origin", "destination",
+    "base_price", "tax", "fee", "currency", "valid_from", "valid_to",
+)
+
+
+def fare_source_version():
+    """Sum of the source tables' versions, it grows whenever any of them changes."""
+    return (
+        select(func.coalesce(func.sum(data_versions.c.version), 0))
+        .where(data_versions.c.table_name.in_(FARE_SOURCE_TABLES))
+        .scalar_subquery()
+    )
+
+
+def fare_view_version():
+    """Source version the flight_fares view was last refreshed to (see `FareViewRefresher`)."""
+    return (
+        select(func.coalesce(func.max(data_versions.c.version), 0))
+        .where(data_versions.c.table_name == "flight_fares")
+        .scalar_subquery()
+    )
+
+
+def fare_search_stmt(
+        origins: Sequence[str] = (),
+        destinations: Sequence[str] = (),
+        travel_date: date | None = None,
+        flight_class: str | None = None,
+        descending: bool = False,
+        limit: int = 20,
+    ) -> Select:
+    """
+    Parameterized fare lookup used by the rule-based fast path, ordered by
+    total price in the base currency. Reads the flight_fares view, where
+    normalized total price and city names are precomputed. Fares without an
+    FX rate are kept, last, in their own currency; the fast path is bypassed
+    while such currencies exist (see `FXRateCache.unrated_currencies`).
+    """
+    stmt = select(
+        flight_fares.c.flight_number,
+        flight_fares.c["class"],
+        flight_fares.c.origin,
+        flight_fares.c.origin_city,
+        flight_fares.c.destination,
+        flight_fares.c.destination_city,
+        flight_fares.c.base_price,
+        flight_fares.c.tax,
+        flight_fares.c.fee,
+        flight_fares.c.total_price,
+        flight_fares.c.currency,
+        flight_fares.c.total_price_normalized,
+        flight_fares.c.normalized_currency,
+        flight_fares.c.valid_from,
+        flight_fares.c.valid_to,
+    )
+    if origins:
+        stmt = stmt.where(flight_fares.c.origin.in_(list(origins)))
+    if destinations:
+        stmt = stmt.where(flight_fares.c.destination.in_(list(destinations)))
+    if travel_date is not None:
+        stmt = stmt.where(flight_fares.c.valid_from <= travel_date, flight_fares.c.valid_to >= travel_date)
+    if flight_class is not None:
+        stmt = stmt.where(flight_fares.c["class"] == flight_class)
+
+    order = desc(flight_fares.c.total_price_normalized) if descending else asc(flight_fares.c.total_price_normalized)
+    return stmt.order_by(order.nulls_last(), flight_fares.c.flight_number).limit(limit)
+
+
+def flight_listing_stmt(
+        table: Table,
+        filter: FlightsFilter,
+        after: tuple[date, uuid.UUID] | None,
+        limit: int,
+        price_range: tuple[Decimal | None, Decimal | None] = (None, None),
+    ) -> Select:
+    """
+    Filtered fare listing with keyset pagination on (valid_from, id).
+
+    Every page is an index range scan starting right after the previous
+    page's last row, so deep pages cost the same as the first one. The
+    ix_flight_prices_*_valid_from_id indexes match the filter/order shapes.
+    `price_range` is in the base currency and needs total_price_normalized,
+    i.e. the flight_fares view.
+    """
+    # flight_prices tanpa kolom audit, flight_fares dengan semua kolomnya
+    stmt = select(*(column for column in table.c if column.name not in AUDIT_COLUMNS))
+    if filter.origin:
+        stmt = stmt.where(table.c.origin == filter.origin.upper())
+    if filter.destination:
+        stmt = stmt.where(table.c.destination == filter.destination.upper())
+    if filter.flight_class:
+        stmt = stmt.where(table.c["class"] == filter.flight_class.lower())
+    if filter.currency:
+        stmt = stmt.where(table.c.currency == filter.currency.upper())
+    if filter.search:
+        stmt = stmt.where(table.c.flight_number.startswith(filter.search.upper(), autoescape=True))
+    if filter.date_from:
+        stmt = stmt.where(table.c.valid_to >= filter.date_from)
+    if filter.date_to:
+        stmt = stmt.where(table.c.valid_from <= filter.date_to)
+    min_price, max_price = price_range
+    if min_price is not None:
+        stmt = stmt.where(table.c.total_price_normalized >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(table.c.total_price_normalized <= max_price)
+    if after is not None:
+        stmt = stmt.where(tuple_(table.c.valid_from, table.c.id) > tuple_(*after))
+
+    return stmt.order_by(table.c.valid_from, table.c.id).limit(limit)
+
 
 class FlightRepositories(FlightsInterface):
     async def get_flights(
             self, 
             conn: AsyncConnection, 
-            filter: FlightsFilter
+            filter: FlightsFilter,
+            after: tuple[date, uuid.UUID] | None = None,
+            table: Table = flight_price,
+            price_range: tuple[Decimal | None, Decimal | None] = (None, None),
         ) -> Sequence[RowMapping]:
-        stmt = select(
-            flight_price.c.id,
-            flight_price.c.flight_number,
-            flight_price.c.base_price,
-            flight_price.c.tax,
-            flight_price.c.fee
+        # satu row lebih untuk tahu apakah masih ada halaman berikutnya
+        stmt = flight_listing_stmt(
+            table=table,
+            filter=filter,
+            after=after,
+            limit=filter.limit + 1,
+            price_range=price_range,
         )
 
-        stmt = stmt.limit(filter.limit).offset(filter.offset)
-
         try:
             # Execute paginated query
             result = await conn.execute(statement=stmt)
             return result.mappings().fetchall()
+        except Exception as e:
+            raise e
+
+    async def get_data_version(self, conn: AsyncConnection, table_name: str) -> int:
+        stmt = select(data_versions.c.version).where(data_versions.c.table_name == table_name)
+        try:
+            result = await conn.execute(statement=stmt)
+            return result.scalar() or 0
+        except Exception as e:
+            raise e
+
+    async def get_fare_source_version(self, conn: AsyncConnection) -> int:
+        try:
+            result = await conn.execute(statement=select(fare_source_version()))
+            return int(result.scalar() or 0)
+        except Exception as e:
+            raise e
+
+    async def set_data_version(self, conn: AsyncConnection, table_name: str, version: int):
+        stmt = pg_insert(data_versions).values(table_name=table_name, version=version)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[data_versions.c.table_name],
+            set_={"version": stmt.excluded.version, "updated_at": func.now()},
+        )
+        try:
+            await conn.execute(statement=stmt)
+        except Exception as e:
+            raise e
+
+    async def refresh_fares(self, conn: AsyncConnection, concurrently: bool = True):
+        # CONCURRENTLY: pembaca tetap bisa SELECT selama refresh, butuh ux_flight_fares_id
+        stmt = text(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}flight_fares")
+        try:
+            await conn.execute(statement=stmt)
+        except Exception as e:
+            raise e
+
+    async def get_fx_rates(self, conn: AsyncConnection) -> Sequence[RowMapping]:
+        stmt = select(fx_rates.c.currency, fx_rates.c.base_currency, fx_rates.c.rate_to_base)
+        try:
+            result = await conn.execute(statement=stmt)
+            return result.mappings().fetchall()
+        except Exception as e:
+            raise e
+
+    async def get_unrated_currencies(self, conn: AsyncConnection) -> list[str]:
+        # currency di flight_prices tanpa kurs: harga ternormalisasinya NULL di flight_fares
+        stmt = (
+            select(flight_price.c.currency)
+            .where(~select(fx_rates.c.currency).where(fx_rates.c.currency == flight_price.c.currency).exists())
+            .distinct()
+            .order_by(flight_price.c.currency)
+        )
+        try:
+            result = await conn.execute(statement=stmt)
+            return list(result.scalars().all())
+        except Exception as e:
+            raise e
+
+    async def upsert_fx_rates(self, conn: AsyncConnection, rows: list[dict]):
+        stmt = pg_insert(fx_rates).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[fx_rates.c.currency],
+            set_={
+                "base_currency": stmt.excluded.base_currency,
+                "rate_to_base": stmt.excluded.rate_to_base,
+                "source": stmt.excluded.source,
+                "updated_at": func.now(),
+            },
+        )
+        try:
+            await conn.execute(statement=stmt)
+        except Exception as e:
+            raise e
+
+    async def create_fare_staging(self, conn: AsyncConnection):
+        # temp table per transaksi: ingestion paralel tidak saling tabrak, hilang sendiri saat commit
+        stmt = text(f"""
+            CREATE TEMP TABLE {FARE_STAGING_TABLE} (
+                line_no bigserial,
+                flight_number varchar(20) NOT NULL,
+                class varchar(20) NOT NULL,
+                origin varchar(3) NOT NULL,
+                destination varchar(3) NOT NULL,
+                base_price numeric(10, 2) NOT NULL,
+                tax numeric(10, 2) NOT NULL,
+                fee numeric(10, 2) NOT NULL,
+                currency varchar(3) NOT NULL,
+                valid_from date NOT NULL,
+                valid_to date NOT NULL
+            ) ON COMMIT DROP
+        """)
+        try:
+            await conn.execute(statement=stmt)
+        except Exception as e:
+            raise e
+
+    async def copy_fare_staging(self, conn: AsyncConnection, chunks: AsyncIterator[str]) -> int:
+        """
+        Streams CSV chunks (no header, FARE_STAGING_COLUMNS order) into the
+        staging table with COPY. Returns the number of bytes written.
+        """
+        raw = await conn.get_raw_connection()
+        columns = ", ".join(FARE_STAGING_COLUMNS)
+        written = 0
+        try:
+            async with raw.driver_connection.cursor() as cursor:
+                async with cursor.copy(f"COPY {FARE_STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)") as copy:
+                    async for chunk in chunks:
+                        await copy.write(chunk)
+                        written += len(chunk)
+            await conn.execute(statement=text(f"ANALYZE {FARE_STAGING_TABLE}"))
+        except Exception as e:
+            raise e
+        return written
+
+    async def get_staging_unknown_airports(self, conn: AsyncConnection) -> dict[str, int]:
+        stmt = text(f"""
+            SELECT refs.code, count(*) AS occurrences
+            FROM (
+                SELECT origin AS code FROM {FARE_STAGING_TABLE}
+                UNION ALL
+                SELECT destination FROM {FARE_STAGING_TABLE}
+            ) refs
+            WHERE NOT EXISTS (SELECT 1 FROM airports a WHERE a.code = refs.code)
+            GROUP BY refs.code
+        """)
+        try:
+            result = await conn.execute(statement=stmt)
+            return {row["code"]: row["occurrences"] for row in result.mappings()}
+        except Exception as e:
+            raise e
+
+    async def delete_staging_unknown_airports(self, conn: AsyncConnection) -> int:
+        stmt = text(f"""
+            DELETE FROM {FARE_STAGING_TABLE} s
+            WHERE NOT EXISTS (SELECT 1 FROM airports a WHERE a.code = s.origin)
+               OR NOT EXISTS (SELECT 1 FROM airports a WHERE a.code = s.destination)
+        """)
+        try:
+            result = await conn.execute(statement=stmt)
+            return result.rowcount
+        except Exception as e:
+            raise e
+
+    async def count_staging(self, conn: AsyncConnection) -> tuple[int, int]:
+        """Staged rows and distinct fare keys among them."""
+        key = ", ".join(FARE_KEY)
+        stmt = text(f"""
+            SELECT
+                (SELECT count(*) FROM {FARE_STAGING_TABLE}) AS rows,
+                (SELECT count(*) FROM (SELECT DISTINCT {key} FROM {FARE_STAGING_TABLE}) k) AS keys
+        """)
+        try:
+            result = await conn.execute(statement=stmt)
+            row = result.mappings().one()
+            return row["rows"], row["keys"]
+        except Exception as e:
+            raise e
+
+    async def upsert_fares_from_staging(self, conn: AsyncConnection, created_by: str) -> tuple[int, int]:
+        """Upserts staged fares on FARE_KEY, last line wins per key. Returns (inserted, updated)."""
+        key = ", ".join(FARE_KEY)
+        values = ", ".join(FARE_STAGING_COLUMNS)
+        changed = ("base_price", "tax", "fee", "currency", "valid_to")
+        stmt = text(f"""
+            WITH upserted AS (
+                INSERT INTO flight_prices (id, {values}, created_by)
+                SELECT DISTINCT ON ({key}) gen_random_uuid(), {values}, :created_by
+                FROM {FARE_STAGING_TABLE}
+                ORDER BY {key}, line_no DESC
+                ON CONFLICT ({key}) DO UPDATE SET
+                    {", ".join(f"{column} = EXCLUDED.{column}" for column in changed)},
+                    updated_by = EXCLUDED.created_by,
+                    updated_at = now()
+                -- baris yang isinya sama tidak ditulis ulang
+                WHERE ({", ".join(f"flight_prices.{column}" for column in changed)})
+                    IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in changed)})
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                count(*) FILTER (WHERE inserted) AS inserted,
+                count(*) FILTER (WHERE NOT inserted) AS updated
+            FROM upserted
+        """)
+        try:
+            result = await conn.execute(statement=stmt, parameters={"created_by": created_by})
+            row = result.mappings().one()
+            return row["inserted"], row["updated"]
+        except Exception as e:
+            raise e
+
+    async def get_airports(self, conn: AsyncConnection) -> Sequence[RowMapping]:
+        stmt = select(
+            airports.c.code,
+            airports.c.name,
+            airports.c.city,
+            airports.c.country,
+        ).order_by(airports.c.code)
+        try:
+            result = await conn.execute(statement=stmt)
+            return result.mappings().fetchall()
         except Exception as e:
             raise e
\ No newline at end of file
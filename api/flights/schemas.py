@@ -1,10 +1,38 @@
-from pydantic import BaseModel
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from pydantic import BaseModel, Field
 
 class FlightsFilter(BaseModel):
-    limit: int = 10
-    offset: int = 0
+    limit: int = Field(default=10, ge=1, le=100)
+    # opaque, diambil dari next_cursor response sebelumnya
+    cursor: str | None = None
+    # prefix nomor penerbangan, contoh "GA"
     search: str | None = None
+    origin: str | None = Field(default=None, min_length=3, max_length=3)
+    destination: str | None = Field(default=None, min_length=3, max_length=3)
+    flight_class: str | None = None
+    currency: str | None = Field(default=None, min_length=3, max_length=3)
+    # tarif yang masa berlakunya beririsan dengan [date_from, date_to]
+    date_from: date | None = None
+    date_to: date | None = None
+    # rentang total harga, hanya untuk /fares; dikonversi ke mata uang dasar
+    min_price: Decimal | None = Field(default=None, ge=0)
+    max_price: Decimal | None = Field(default=None, ge=0)
+    price_currency: str | None = Field(default=None, min_length=3, max_length=3)
 
 
 class FlightsVectorRequest(BaseModel):
-    schemas: str
\ No newline at end of file
+    schemas: str
+
+
+class VectorDocument(BaseModel):
+    content: str = Field(min_length=1)
+    metadata: dict[str, Any] = Field(default_factory=dict)
+
+
+class FlightsVectorBatchRequest(BaseModel):
+    documents: list[VectorDocument] = Field(min_length=1)
+    # default: collection POSTGRES_DB, sama dengan /vector_store
+    collection_name: str | None = None
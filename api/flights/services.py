@@ -1,60 +1,116 @@
 import logging
+import uuid
+from datetime import date
+from decimal import Decimal
 
-from langchain_community.llms import OpenAI
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_community.vectorstores import PGVector
-from langchain_core.documents import Document
-
+from sqlalchemy import Table
 from sqlalchemy.ext.asyncio import AsyncConnection
 
+from api.flights.fx import FXRateCache, fx_rates
+from api.flights.models import flight_price
 from api.flights.repositories import FlightRepositories
-from api.flights.schemas import FlightsFilter, FlightsVectorRequest
-from api.database.client import connection_url
+from api.flights.schemas import FlightsFilter, FlightsVectorBatchRequest, FlightsVectorRequest, VectorDocument
+from api.chatbot.context import schema_context_cache
 from api.config import settings
+from api.helpers.pagination import decode_cursor, encode_cursor
+from api.langchain_pg.services import VectorIngestionReport, VectorStoreIngestor
+from api.llm.registry import LLMClientRegistry, llm_registry
 
 class FlightServices:
     def __init__(
             self,
-            flights_repo: FlightRepositories
+            flights_repo: FlightRepositories,
+            registry: LLMClientRegistry = llm_registry,
+            fx: FXRateCache = fx_rates,
         ):
         self.__flights_repo = flights_repo
-        
-        self.embeddings = OpenAIEmbeddings()
-        self.llm = OpenAI(temperature = 0)
+        self.__registry = registry
+        self.__fx_rates = fx
+
+    @property
+    def embeddings(self):
+        # only resolved by endpoints that embed, plain listings never touch it
+        return self.__registry.embeddings
 
     async def get_flights(
             self,
             conn: AsyncConnection,
-            filter: FlightsFilter
-        ):
-        result = await self.__flights_repo.get_flights(
+            filter: FlightsFilter,
+            table: Table = flight_price,
+        ) -> dict:
+        after = None
+        if filter.cursor:
+            values = decode_cursor(filter.cursor)
+            try:
+                after = (date.fromisoformat(values["valid_from"]), uuid.UUID(values["id"]))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError("Invalid cursor") from e
+
+        price_range = self._price_range(filter, table)
+        rows = await self.__flights_repo.get_flights(
             conn=conn,
-            filter=filter
+            filter=filter,
+            after=after,
+            table=table,
+            price_range=price_range,
         )
-        return result
+        page = rows[:filter.limit]
+        next_cursor = None
+        if len(rows) > filter.limit:
+            last = page[-1]
+            next_cursor = encode_cursor({"valid_from": last["valid_from"].isoformat(), "id": str(last["id"])})
+
+        return {"data": [dict(row) for row in page], "next_cursor": next_cursor}
     
+    def _price_range(self, filter: FlightsFilter, table: Table) -> tuple[Decimal | None, Decimal | None]:
+        if filter.min_price is None and filter.max_price is None:
+            return None, None
+        if "total_price_normalized" not in table.c:
+            raise ValueError("Price filters are only supported on /fares")
+
+        currency = filter.price_currency or self.__fx_rates.base_currency
+        bounds = []
+        for amount in (filter.min_price, filter.max_price):
+            if amount is None:
+                bounds.append(None)
+                continue
+            converted = self.__fx_rates.to_base(amount, currency)
+            if converted is None:
+                raise ValueError(f"No FX rate for {currency}")
+            bounds.append(converted)
+        return bounds[0], bounds[1]
+
+    @property
+    def vector_ingestor(self) -> VectorStoreIngestor:
+        return VectorStoreIngestor(
+            embeddings=self.embeddings,
+            chunk_size=settings.VECTOR_CHUNK_SIZE,
+            chunk_overlap=settings.VECTOR_CHUNK_OVERLAP,
+            batch_size=settings.VECTOR_EMBED_BATCH_SIZE,
+            concurrency=settings.VECTOR_EMBED_CONCURRENCY,
+        )
+
     async def vector_embeddings(
             self,
             schemas: FlightsVectorRequest,
-    ):
-        try:
-            docs = Document(
-                page_content=schemas.schemas,
-            )
-
-            logging.info(f"Add {docs} as {settings.POSTGRES_DB} collections")
-
-            self.vector_store = PGVector.from_documents(
-                documents=[docs],
-                embedding=self.embeddings,
-                connection_string=connection_url,
-                collection_name=settings.POSTGRES_DB
-            )
-            
-            print("Vector store berhasil disetup!")
-            return self.vector_store
-            
-        except Exception as e:
-            logging.error(f"Error setting up vector store: {e}")
+    ) -> VectorIngestionReport:
+        return await self.vector_embeddings_batch(
+            FlightsVectorBatchRequest(documents=[VectorDocument(content=schemas.schemas)])
+        )
+
+    async def vector_embeddings_batch(
+            self,
+            request: FlightsVectorBatchRequest,
+    ) -> VectorIngestionReport:
+        collection_name = request.collection_name or settings.POSTGRES_DB
+        logging.info(f"Add {len(request.documents)} documents to {collection_name} collection")
+        report = await self.vector_ingestor.ingest(
+            documents=[(document.content, document.metadata) for document in request.documents],
+            collection_name=collection_name,
+        )
+
+        if report.inserted:
+            await schema_context_cache.refresh_safely()
+        return report
 
         
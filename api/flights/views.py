@@ -1,13 +1,23 @@
-from typing import Annotated, Text
-from fastapi import APIRouter, Path, Query, Request, status
+import tempfile
+from typing import Annotated, Literal, Text
+from fastapi import APIRouter, HTTPException, Path, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 
 from api.database.database import DBConnection
+from api.llm.registry import LLMRegistry
+from api.flights.fares import fare_view
+from api.flights.fx import fx_rates
+from api.flights.ingestion import FareIngestionError, fare_ingestor
+from api.flights.models import flight_fares
 from api.flights.services import FlightServices
 from api.flights.repositories import FlightRepositories
-from api.flights.schemas import FlightsFilter, FlightsVectorRequest
+from api.flights.schemas import FlightsFilter, FlightsVectorBatchRequest, FlightsVectorRequest
 
 flights_router = APIRouter(prefix="/api/v1/flights", tags=["Flights"])
 
+# body upload ditulis ke disk per ~1 MiB, bukan per chunk kecil dari client
+UPLOAD_WRITE_BYTES = 1 << 20
+
 @flights_router.get("/")
 async def get_flights(
     request: Request,
@@ -15,25 +25,102 @@ async def get_flights(
     query_parameter: Annotated[FlightsFilter, Query()],
 ):
     flights_service = FlightServices(flights_repo=FlightRepositories())
-    flights = await flights_service.get_flights(
-        conn=db,
-        filter=query_parameter
-    )
+    try:
+        flights = await flights_service.get_flights(
+            conn=db,
+            filter=query_parameter
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return flights
+
+@flights_router.get("/fares")
+async def get_fares(
+    request: Request,
+    db: DBConnection,
+    query_parameter: Annotated[FlightsFilter, Query()],
+):
+    # sama seperti listing flights, dari view flight_fares (total_price dan nama kota sudah ada)
+    flights_service = FlightServices(flights_repo=FlightRepositories())
+    try:
+        fares = await flights_service.get_flights(
+            conn=db,
+            filter=query_parameter,
+            table=flight_fares,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return fares
 
-    results = [flight for flight in flights]
+@flights_router.post("/fares/refresh")
+async def refresh_fares():
+    version = await fare_view.refresh()
+    return {
+        "message": "flight_fares refreshed",
+        "version": version,
+        **fare_view.stats(),
+    }
+
+@flights_router.get("/fx")
+async def get_fx_rates():
+    return {
+        **fx_rates.stats(),
+        "rates": fx_rates.rates,
+    }
+
+@flights_router.post("/ingest")
+async def ingest_fares(
+    request: Request,
+    format: Annotated[Literal["csv", "parquet"], Query()] = "csv",
+    strict: bool = False,
+    created_by: str = "ingestion",
+):
+    # body = isi file mentah, ditulis ke file sementara sambil diterima lalu di-COPY per chunk
+    with tempfile.NamedTemporaryFile(suffix=f".{format}") as upload:
+        # write ke disk di thread pool supaya event loop tidak ikut tertahan
+        buffer = bytearray()
+        async for chunk in request.stream():
+            buffer += chunk
+            if len(buffer) >= UPLOAD_WRITE_BYTES:
+                await run_in_threadpool(upload.write, bytes(buffer))
+                buffer.clear()
+        await run_in_threadpool(upload.write, bytes(buffer))
+        await run_in_threadpool(upload.flush)
+        try:
+            report = await fare_ingestor.ingest(
+                upload.name,
+                file_format=format,
+                created_by=created_by,
+                strict=strict,
+            )
+        except FareIngestionError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return results
+    return report.as_dict()
 
 @flights_router.post("/vector_store")
 async def vector_stores(
     request: Request,
+    registry: LLMRegistry,
     schemas: FlightsVectorRequest
 ):
-    flights_service = FlightServices(flights_repo=FlightRepositories())
+    flights_service = FlightServices(flights_repo=FlightRepositories(), registry=registry)
     vectors = await flights_service.vector_embeddings(
         schemas=schemas
     )
     return {
         "message": "Vector embeddings successfully stored",
         "collection_name": vectors.collection_name
-    }
\ No newline at end of file
+    }
+
+@flights_router.post("/vector_store/batch")
+async def vector_stores_batch(
+    request: Request,
+    registry: LLMRegistry,
+    schemas: FlightsVectorBatchRequest
+):
+    flights_service = FlightServices(flights_repo=FlightRepositories(), registry=registry)
+    report = await flights_service.vector_embeddings_batch(request=schemas)
+    return report.as_dict()
\ No newline at end of file
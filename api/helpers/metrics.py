@@ -0,0 +1,101 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.helpers.pipeline import StageTiming
+
+# dari query DB ~1ms sampai LLM call yang lambat
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+stage_duration = Histogram(
+    "chatbot_stage_duration_seconds",
+    "Time spent in one stage of a conversation turn.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent getting a connection from the pool, including opening a new one.",
+    buckets=LATENCY_BUCKETS,
+)
+pool_checked_out = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool.",
+)
+http_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled, until the last body chunk is sent.",
+    ["method", "route"],
+)
+http_duration = Histogram(
+    "http_request_duration_seconds",
+    "Request latency until the last body chunk is sent.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def observe_stage(timing: StageTiming, outputs: dict[str, Any] | None = None):
+    """`Pipeline.run` on_stage_end callback."""
+    stage_duration.labels(timing.name).observe(timing.duration)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times work outside the pipeline into the same stage histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration.labels(stage).observe(time.perf_counter() - start)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """
+    Tracks in-flight requests and latency per route template. Pure ASGI, so
+    a streamed response counts until its last chunk, not until the headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], self._route_template(scope)
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = http_in_flight.labels(method, route)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            http_duration.labels(method, route, str(status)).observe(time.perf_counter() - start)
+
+    def _route_template(self, scope: Scope) -> str:
+        # path template, bukan path mentah, supaya jumlah label tetap kecil
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "unmatched")
+        return "unmatched"
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One step of a pipeline.
+
+    `func` is called with the declared `inputs` as keyword arguments and must
+    return a dict holding every name in `outputs`.
+    """
+
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+
+
+@dataclass
+class StageTiming:
+    name: str
+    started_at: float
+    duration: float
+
+
+@dataclass
+class PipelineResult:
+    context: dict[str, Any]
+    timings: list[StageTiming] = field(default_factory=list)
+    total: float = 0.0
+
+    def timings_ms(self) -> dict[str, float]:
+        return {timing.name: round(timing.duration * 1000, 2) for timing in self.timings}
+
+
+class Pipeline:
+    """
+    Runs stages as soon as their inputs exist, so independent stages run
+    concurrently and the wall time follows the real data dependencies.
+    """
+
+    def __init__(self, stages: list[Stage], initial: tuple[str, ...] = ()):
+        self.stages = stages
+        self.initial = initial
+        self._validate()
+
+    def _validate(self):
+        produced = set(self.initial)
+        names = set()
+        for stage in self.stages:
+            if stage.name in names:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            names.add(stage.name)
+            for output in stage.outputs:
+                if output in produced:
+                    raise ValueError(f"'{output}' is produced more than once (stage {stage.name})")
+                produced.add(output)
+
+        for stage in self.stages:
+            missing = set(stage.inputs) - produced
+            if missing:
+                raise ValueError(f"Stage {stage.name} needs {sorted(missing)} which no stage produces")
+
+    async def run(
+            self,
+            context: dict[str, Any],
+            on_stage_end: Callable[[StageTiming, dict[str, Any]], Awaitable[None] | None] | None = None,
+        ) -> PipelineResult:
+        missing = set(self.initial) - set(context)
+        if missing:
+            raise ValueError(f"Missing initial values: {sorted(missing)}")
+
+        context = dict(context)
+        result = PipelineResult(context=context)
+        pending = list(self.stages)
+        running: dict[asyncio.Task, Stage] = {}
+        pipeline_start = time.perf_counter()
+
+        async def execute(stage: Stage) -> tuple[StageTiming, dict[str, Any]]:
+            started_at = time.perf_counter()
+            value = await stage.func(**{name: context[name] for name in stage.inputs})
+            finished_at = time.perf_counter()
+
+            outputs = {name: value[name] for name in stage.outputs}
+            timing = StageTiming(
+                name=stage.name,
+                started_at=started_at - pipeline_start,
+                duration=finished_at - started_at,
+            )
+            return timing, outputs
+
+        try:
+            while pending or running:
+                ready = [stage for stage in pending if all(name in context for name in stage.inputs)]
+                for stage in ready:
+                    pending.remove(stage)
+                    running[asyncio.create_task(execute(stage))] = stage
+
+                if not running:
+                    raise RuntimeError(f"Pipeline stalled, waiting stages: {[stage.name for stage in pending]}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.pop(task)
+                    timing, outputs = task.result()
+                    context.update(outputs)
+                    result.timings.append(timing)
+                    if on_stage_end is not None:
+                        callback = on_stage_end(timing, outputs)
+                        if asyncio.iscoroutine(callback):
+                            await callback
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        result.total = time.perf_counter() - pipeline_start
+        return result
@@ -0,0 +1,124 @@
+import csv
+import io
+import math
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Mapping, Sequence
+
+from api.helpers.tokens import count_tokens
+
+
+@dataclass
+class EncodedResult:
+    text: str
+    rows_included: int
+    rows_total: int
+    tokens: int
+
+
+def format_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        # 1250000.00 -> 1250000, 12.50 -> 12.5
+        text = format(value, "f")
+        return text.rstrip("0").rstrip(".") if "." in text else text
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="minutes")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float):
+        return format(value, "g")
+    return str(value)
+
+
+def sample_indices(total: int, size: int) -> list[int]:
+    """
+    Deterministic sample of `size` row indices out of `total`, in order: the
+    first half are the leading rows (the ones ORDER BY put first), the rest
+    are spread evenly over the remaining rows.
+    """
+    if size >= total:
+        return list(range(total))
+    if size <= 0:
+        return []
+
+    head = math.ceil(size / 2)
+    rest = size - head
+    if rest == 0:
+        return list(range(head))
+    span = total - head
+    step = span / rest
+    return list(range(head)) + [head + int(i * step + step / 2) for i in range(rest)]
+
+
+class ResultEncoder:
+    """
+    Encodes SQL result rows for an LLM prompt: a one-line header, a CSV or
+    markdown table without Python reprs, and a "N more rows omitted" footer
+    when the rows had to be sampled to fit `max_tokens`.
+    """
+
+    FORMATS = ("csv", "markdown")
+
+    def __init__(self, max_tokens: int, output_format: str = "csv"):
+        if output_format not in self.FORMATS:
+            raise ValueError(f"Unknown result format: {output_format}, use one of {self.FORMATS}")
+        self.max_tokens = max_tokens
+        self.output_format = output_format
+
+    def _lines(self, columns: list[str], rows: Sequence[Mapping]) -> tuple[str, list[str]]:
+        values = [[format_value(row[column]) for column in columns] for row in rows]
+        if self.output_format == "markdown":
+            def line(cells):
+                return "| " + " | ".join(cell.replace("|", "\\|").replace("\n", " ") for cell in cells) + " |"
+            header = line(columns) + "\n" + "|" + "---|" * len(columns)
+            return header, [line(cells) for cells in values]
+
+        def line(cells):
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator="").writerow(cells)
+            return buffer.getvalue()
+        return line(columns), [line(cells) for cells in values]
+
+    @staticmethod
+    def _footer(omitted: int, total: int, truncated: bool) -> str:
+        footer = f"... {omitted} more rows omitted"
+        if truncated:
+            footer += f" (query result was capped at {total} rows)"
+        return footer
+
+    def encode(self, rows: Sequence[Mapping] | None, truncated: bool = False) -> EncodedResult:
+        rows = list(rows or [])
+        if not rows:
+            return EncodedResult(text="(no rows)", rows_included=0, rows_total=0, tokens=count_tokens("(no rows)"))
+
+        columns = list(rows[0].keys())
+        table_header, lines = self._lines(columns, rows)
+        line_tokens = [count_tokens(line) + 1 for line in lines]
+        total = len(rows)
+        more = "+" if truncated else ""
+        header = f"rows: {total}{more}, columns: {len(columns)}\n{table_header}"
+        fixed = count_tokens(header) + count_tokens(self._footer(total, total, truncated)) + 2
+
+        def cost(size: int) -> int:
+            return fixed + sum(line_tokens[i] for i in sample_indices(total, size))
+
+        # cost naik monoton terhadap jumlah row, cari sampel terbesar yang muat
+        low, high = 0, total
+        while low < high:
+            middle = (low + high + 1) // 2
+            if cost(middle) <= self.max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        # minimal satu row supaya model tetap melihat bentuk datanya
+        indices = sample_indices(total, max(low, 1))
+
+        parts = [header, *(lines[i] for i in indices)]
+        omitted = total - len(indices)
+        if omitted or truncated:
+            parts.append(self._footer(omitted, total, truncated))
+        text = "\n".join(parts)
+        return EncodedResult(text=text, rows_included=len(indices), rows_total=total, tokens=count_tokens(text))
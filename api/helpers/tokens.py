@@ -0,0 +1,61 @@
+import logging
+from functools import lru_cache
+
+import tiktoken
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+
+
+@lru_cache
+def get_encoding(encoding_name: str = "o200k_base"):
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        # encoding belum ter-download (offline), pakai estimasi kasar
+        logging.warning(f"tiktoken encoding {encoding_name} unavailable, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: list[BaseMessage]) -> int:
+    # +4 token overhead per message seperti format chat OpenAI
+    return sum(count_tokens(str(message.content)) + 4 for message in messages)
+
+
+def trim_to_token_budget(messages: list[BaseMessage], max_tokens: int) -> list[BaseMessage]:
+    """Drops the oldest messages until the rest fits in `max_tokens`; the newest one is always kept."""
+    kept, total = [], 0
+    for message in reversed(messages):
+        tokens = count_tokens(str(message.content)) + 4
+        if kept and total + tokens > max_tokens:
+            break
+        kept.append(message)
+        total += tokens
+    return list(reversed(kept))
+
+
+class PromptTokenCounter(BaseCallbackHandler):
+    """
+    Callback that counts the prompt tokens of every LLM call it is attached
+    to, keyed by `label`, into the shared `counts` dict.
+    """
+
+    def __init__(self, counts: dict[str, int], label: str):
+        self.counts = counts
+        self.label = label
+
+    def _add(self, tokens: int):
+        self.counts[self.label] = self.counts.get(self.label, 0) + tokens
+
+    def on_chat_model_start(self, serialized, messages: list[list[BaseMessage]], **kwargs):
+        self._add(sum(count_message_tokens(batch) for batch in messages))
+
+    def on_llm_start(self, serialized, prompts: list[str], **kwargs):
+        self._add(sum(count_tokens(prompt) for prompt in prompts))
@@ -0,0 +1,24 @@
+import uuid
+from typing import Protocol, Sequence
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+class VectorStoreInterface(Protocol):
+    async def get_or_create_collection(
+        self,
+        conn: AsyncConnection,
+        name: str,
+    ) -> uuid.UUID: ...
+
+    async def get_existing_hashes(
+        self,
+        conn: AsyncConnection,
+        collection_id: uuid.UUID,
+        hashes: Sequence[str],
+    ) -> set[str]: ...
+
+    async def insert_embeddings(
+        self,
+        conn: AsyncConnection,
+        rows: list[dict],
+    ) -> int: ...
@@ -8,6 +8,14 @@ from sqlalchemy.dialects.postgresql import JSONB
 
 from api.database.client import metadata
 
+langchain_pg_collection = Table(
+    'langchain_pg_collection',
+    metadata,
+    Column("name", String, nullable=True),
+    Column("cmetadata", JSONB, nullable=True),
+    Column("uuid", UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+)
+
 langchain_pg_embedding = Table(
     'langchain_pg_embedding',
     metadata,
@@ -17,4 +25,4 @@ langchain_pg_embedding = Table(
     Column("cmetadata", JSONB, nullable=True),
     Column("custom_id", Text, nullable=True),
     Column("uuid", UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-)
\ No newline at end of file
+)
@@ -0,0 +1,60 @@
+import uuid
+from typing import Sequence
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy import Text, bindparam, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from api.langchain_pg.interface import VectorStoreInterface
+from api.langchain_pg.models import langchain_pg_collection, langchain_pg_embedding
+
+# ditulis literal (bukan bind parameter) supaya cocok dengan expression ux_langchain_pg_embedding_content_hash
+content_hash = literal_column("langchain_pg_embedding.cmetadata->>'content_hash'", type_=Text)
+CONTENT_HASH_INDEX_ELEMENTS = ["collection_id", literal_column("(cmetadata->>'content_hash')")]
+
+
+class VectorStoreRepository(VectorStoreInterface):
+    async def get_or_create_collection(self, conn: AsyncConnection, name: str) -> uuid.UUID:
+        stmt = select(langchain_pg_collection.c.uuid).where(langchain_pg_collection.c.name == name)
+        try:
+            result = await conn.execute(statement=stmt)
+            collection_id = result.scalar()
+            if collection_id is None:
+                collection_id = uuid.uuid4()
+                await conn.execute(
+                    langchain_pg_collection.insert().values(uuid=collection_id, name=name, cmetadata={})
+                )
+            return collection_id
+        except Exception as e:
+            raise e
+
+    async def get_existing_hashes(
+            self,
+            conn: AsyncConnection,
+            collection_id: uuid.UUID,
+            hashes: Sequence[str],
+        ) -> set[str]:
+        if not hashes:
+            return set()
+        stmt = select(content_hash).where(
+            langchain_pg_embedding.c.collection_id == collection_id,
+            content_hash.in_(bindparam("hashes", value=list(hashes), expanding=True)),
+        )
+        try:
+            result = await conn.execute(statement=stmt)
+            return set(result.scalars())
+        except Exception as e:
+            raise e
+
+    async def insert_embeddings(self, conn: AsyncConnection, rows: list[dict]) -> int:
+        # satu INSERT multi-row per batch; konten yang sudah masuk lewat request paralel dilewati
+        stmt = (
+            pg_insert(langchain_pg_embedding)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=CONTENT_HASH_INDEX_ELEMENTS)
+            .returning(langchain_pg_embedding.c.uuid)
+        )
+        try:
+            result = await conn.execute(statement=stmt)
+            return len(result.fetchall())
+        except Exception as e:
+            raise e
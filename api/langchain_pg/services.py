@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.database.client import engine
+from api.langchain_pg.repositories import VectorStoreRepository
+from api.llm.services import hash_text
+
+
+@dataclass
+class BatchTiming:
+    batch: int
+    documents: int
+    inserted: int
+    embed_ms: float
+    insert_ms: float
+
+
+@dataclass
+class VectorIngestionReport:
+    collection_name: str
+    documents: int = 0
+    chunks: int = 0
+    duplicates_in_request: int = 0
+    already_stored: int = 0
+    inserted: int = 0
+    batches: list[BatchTiming] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "collection_name": self.collection_name,
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "duplicates_in_request": self.duplicates_in_request,
+            "already_stored": self.already_stored,
+            "inserted": self.inserted,
+            "batches": [vars(timing) for timing in self.batches],
+            "elapsed_ms": round(self.elapsed * 1000, 2),
+        }
+
+
+class VectorStoreIngestor:
+    """
+    Batched writer for the PGVector tables, replacing `PGVector.from_documents`.
+
+    Documents are split into chunks and keyed by the sha256 of the
+    normalized chunk text, stored as `content_hash` in cmetadata. Chunks
+    repeated in the request or already in the collection are skipped before
+    anything is embedded. The rest is embedded in batches, up to
+    `concurrency` batches at a time, and every batch is written with one
+    multi-row INSERT as soon as its vectors arrive.
+    """
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            chunk_size: int,
+            chunk_overlap: int,
+            batch_size: int,
+            concurrency: int,
+            vector_repo: VectorStoreRepository | None = None,
+            db_engine: AsyncEngine = engine,
+        ):
+        self.embeddings = embeddings
+        self.splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.batch_size = max(batch_size, 1)
+        self.concurrency = max(concurrency, 1)
+        self.__vector_repo = vector_repo or VectorStoreRepository()
+        self.engine = db_engine
+
+    def split(self, documents: list[tuple[str, dict]]) -> tuple[dict[str, tuple[str, dict]], int]:
+        """Unique chunks by content hash, plus how many repeated chunks were dropped."""
+        chunks: dict[str, tuple[str, dict]] = {}
+        total = 0
+        for content, metadata in documents:
+            # source_hash + chunk menjaga urutan potongan satu dokumen saat context schema disusun ulang
+            source_hash = hash_text(content)
+            for index, chunk in enumerate(self.splitter.split_text(content)):
+                total += 1
+                chunks.setdefault(hash_text(chunk), (chunk, {**metadata, "source_hash": source_hash, "chunk": index}))
+        return chunks, total - len(chunks)
+
+    async def ingest(self, documents: list[tuple[str, dict]], collection_name: str) -> VectorIngestionReport:
+        report = VectorIngestionReport(collection_name=collection_name, documents=len(documents))
+        start = time.perf_counter()
+
+        chunks, report.duplicates_in_request = self.split(documents)
+        report.chunks = len(chunks) + report.duplicates_in_request
+
+        async with self.engine.begin() as conn:
+            collection_id = await self.__vector_repo.get_or_create_collection(conn=conn, name=collection_name)
+            existing = await self.__vector_repo.get_existing_hashes(
+                conn=conn,
+                collection_id=collection_id,
+                hashes=list(chunks),
+            )
+        report.already_stored = len(existing)
+        pending = [(content_hash, *chunks[content_hash]) for content_hash in chunks if content_hash not in existing]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        timings = await asyncio.gather(*(
+            self._ingest_batch(number, batch, collection_id, semaphore)
+            for number, batch in enumerate(batches, start=1)
+        ))
+
+        report.batches = list(timings)
+        report.inserted = sum(timing.inserted for timing in timings)
+        report.elapsed = time.perf_counter() - start
+        logging.info(
+            f"Vector store ingestion into {collection_name}: {report.inserted} inserted, "
+            f"{report.already_stored} already stored, {report.duplicates_in_request} repeated, "
+            f"{len(batches)} batches in {report.elapsed:.2f}s"
+        )
+        return report
+
+    async def _ingest_batch(
+            self,
+            number: int,
+            batch: list[tuple[str, str, dict]],
+            collection_id: uuid.UUID,
+            semaphore: asyncio.Semaphore,
+        ) -> BatchTiming:
+        async with semaphore:
+            embed_start = time.perf_counter()
+            vectors = await self.embeddings.aembed_documents([content for _, content, _ in batch])
+            embed_elapsed = time.perf_counter() - embed_start
+
+            rows = [
+                {
+                    "uuid": uuid.uuid4(),
+                    "collection_id": collection_id,
+                    "embedding": vector,
+                    "document": content,
+                    "cmetadata": {**metadata, "content_hash": content_hash},
+                    "custom_id": content_hash,
+                }
+                for (content_hash, content, metadata), vector in zip(batch, vectors)
+            ]
+            insert_start = time.perf_counter()
+            async with self.engine.begin() as conn:
+                inserted = await self.__vector_repo.insert_embeddings(conn=conn, rows=rows)
+            insert_elapsed = time.perf_counter() - insert_start
+
+        return BatchTiming(
+            batch=number,
+            documents=len(batch),
+            inserted=inserted,
+            embed_ms=round(embed_elapsed * 1000, 2),
+            insert_ms=round(insert_elapsed * 1000, 2),
+        )
@@ -0,0 +1,11 @@
+from typing import Protocol
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+class EmbeddingCacheInterface(Protocol):
+    async def get_embedding(self, conn: AsyncConnection, model: str, text_hash: str) -> list[float] | None: ...
+
+    async def save_embedding(self, conn: AsyncConnection, model: str, text_hash: str, embedding: list[float]): ...
+
+    async def prune(self, conn: AsyncConnection, max_rows: int) -> int: ...
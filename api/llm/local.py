@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import math
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel, LLM
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+INDONESIAN_WORDS = {"yang", "dari", "ke", "tiket", "berapa", "apa", "ada", "untuk", "dan", "tanggal", "paling", "murah", "besok"}
+
+
+def _last_line(prompt: str) -> str:
+    lines = [line.strip() for line in prompt.strip().splitlines() if line.strip()]
+    return re.sub(r"^(human|user):\s*", "", lines[-1], flags=re.IGNORECASE) if lines else ""
+
+
+def _detect_language(prompt: str) -> str:
+    words = set(re.findall(r"[a-z]+", _last_line(prompt).casefold()))
+    return "Indonesian" if words & INDONESIAN_WORDS else "English"
+
+
+class ChatScript:
+    """
+    Canned replies for the app's prompts, picked by a marker phrase in the
+    prompt. Enough for the pipeline to run end to end without a real model.
+    """
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.rules: list[tuple[str, Callable[[str], str]]] = [
+            ("language detection model", _detect_language),
+            ("SQL analyst assistant", lambda prompt: f"QUERY_INTENT: {_last_line(prompt)}"),
+            ("expert SQL generator", lambda prompt: self.sql),
+            ("error log", lambda prompt: "Maaf, data tersebut belum bisa kami ambil. Coba ubah pertanyaannya ya."),
+            ("asisten pelaporan", lambda prompt: "Berikut pilihan penerbangan yang kami temukan untukmu. Mau cek tanggal atau kelas lain?"),
+            ("meringkas percakapan", lambda prompt: "User mencari tiket pesawat dan membandingkan harga beberapa penerbangan."),
+        ]
+
+    def reply(self, prompt: str) -> str:
+        for marker, rule in self.rules:
+            if marker in prompt:
+                return rule(prompt)
+        return "OK"
+
+
+def _messages_text(messages: list[BaseMessage]) -> str:
+    return "\n".join(f"{message.type}: {message.content}" for message in messages)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model answering from a `ChatScript` after a fixed latency; streams word by word."""
+
+    script: ChatScript
+    latency_ms: float = 0.0
+    chunk_latency_ms: float = 0.0
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat"
+
+    def _generate(
+            self,
+            messages: list[BaseMessage],
+            stop: list[str] | None = None,
+            run_manager: CallbackManagerForLLMRun | None = None,
+            **kwargs: Any,
+        ) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        content = self.script.reply(_messages_text(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _agenerate(
+            self,
+            messages: list[BaseMessage],
+            stop: list[str] | None = None,
+            run_manager: AsyncCallbackManagerForLLMRun | None = None,
+            **kwargs: Any,
+        ) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        content = self.script.reply(_messages_text(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(
+            self,
+            messages: list[BaseMessage],
+            stop: list[str] | None = None,
+            run_manager: CallbackManagerForLLMRun | None = None,
+            **kwargs: Any,
+        ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_ms / 1000)
+        for word in re.findall(r"\S+\s*", self.script.reply(_messages_text(messages))):
+            time.sleep(self.chunk_latency_ms / 1000)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+    async def _astream(
+            self,
+            messages: list[BaseMessage],
+            stop: list[str] | None = None,
+            run_manager: AsyncCallbackManagerForLLMRun | None = None,
+            **kwargs: Any,
+        ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        for word in re.findall(r"\S+\s*", self.script.reply(_messages_text(messages))):
+            await asyncio.sleep(self.chunk_latency_ms / 1000)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+
+
+class ScriptedLLM(LLM):
+    """Completion model counterpart of `ScriptedChatModel`."""
+
+    script: ChatScript
+    latency_ms: float = 0.0
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-completion"
+
+    def _call(
+            self,
+            prompt: str,
+            stop: list[str] | None = None,
+            run_manager: CallbackManagerForLLMRun | None = None,
+            **kwargs: Any,
+        ) -> str:
+        time.sleep(self.latency_ms / 1000)
+        return self.script.reply(prompt)
+
+    async def _acall(
+            self,
+            prompt: str,
+            stop: list[str] | None = None,
+            run_manager: AsyncCallbackManagerForLLMRun | None = None,
+            **kwargs: Any,
+        ) -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self.script.reply(prompt)
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic local embeddings via the hashing trick.
+
+    Words and word bigrams are hashed into `dimensions` signed buckets with
+    sublinear term frequency, then L2-normalized, so texts sharing words
+    get a positive cosine similarity. No network, no model files.
+    """
+
+    def __init__(self, dimensions: int, latency_ms: float = 0.0):
+        self.dimensions = dimensions
+        self.latency_ms = latency_ms
+
+    def _features(self, text: str) -> dict[str, int]:
+        words = re.findall(r"[a-z0-9]+", text.casefold())
+        counts: dict[str, int] = {}
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            counts[feature] = counts.get(feature, 0) + 1
+        return counts
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        for feature, count in self._features(text).items():
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dimensions] += sign * (1 + math.log(count))
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self.latency_ms / 1000)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
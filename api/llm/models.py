@@ -0,0 +1,17 @@
+from pgvector.sqlalchemy import Vector
+
+from sqlalchemy import Table, Column, String, DateTime, PrimaryKeyConstraint
+from sqlalchemy.sql import func
+
+from api.database.client import metadata
+
+embedding_cache = Table(
+    "embedding_cache",
+    metadata,
+    Column("model", String(100), nullable=False),
+    Column("text_hash", String(64), nullable=False),  # sha256 dari teks yang sudah dinormalisasi
+    Column("embedding", Vector, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("last_used_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    PrimaryKeyConstraint("model", "text_hash", name="pk_embedding_cache"),
+)
@@ -0,0 +1,68 @@
+import httpx
+
+from langchain.chat_models import init_chat_model
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel, BaseLLM
+from langchain_openai import OpenAI, OpenAIEmbeddings
+
+from api.config import settings
+from api.llm.local import ChatScript, HashingEmbeddings, ScriptedChatModel, ScriptedLLM
+
+PROVIDERS = ("openai", "local")
+
+
+def _check(provider: str):
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider {provider!r}, expected one of {PROVIDERS}")
+
+
+def create_chat_model(http_client: httpx.Client, http_async_client: httpx.AsyncClient) -> BaseChatModel:
+    _check(settings.LLM_PROVIDER)
+    if settings.LLM_PROVIDER == "local":
+        return ScriptedChatModel(
+            script=ChatScript(sql=settings.LOCAL_LLM_SQL),
+            latency_ms=settings.LOCAL_LLM_LATENCY_MS,
+            chunk_latency_ms=settings.LOCAL_LLM_CHUNK_LATENCY_MS,
+        )
+    return init_chat_model(
+        model=settings.OPENAI_CHAT_MODEL,
+        model_provider="openai",
+        stream_usage=True,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
+
+
+def create_completion_model(http_client: httpx.Client, http_async_client: httpx.AsyncClient) -> BaseLLM:
+    _check(settings.LLM_PROVIDER)
+    if settings.LLM_PROVIDER == "local":
+        return ScriptedLLM(
+            script=ChatScript(sql=settings.LOCAL_LLM_SQL),
+            latency_ms=settings.LOCAL_LLM_LATENCY_MS,
+        )
+    return OpenAI(
+        temperature=0,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
+
+
+def create_embeddings(http_client: httpx.Client, http_async_client: httpx.AsyncClient) -> Embeddings:
+    _check(settings.EMBEDDING_PROVIDER)
+    if settings.EMBEDDING_PROVIDER == "local":
+        return HashingEmbeddings(
+            dimensions=settings.EMBEDDING_DIMENSIONS,
+            latency_ms=settings.LOCAL_EMBEDDING_LATENCY_MS,
+        )
+    return OpenAIEmbeddings(
+        model=settings.OPENAI_EMBEDDING_MODEL,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
+
+
+def embedding_model_name() -> str:
+    # kunci embedding_cache: vektor lokal tidak boleh tercampur dengan vektor OpenAI
+    if settings.EMBEDDING_PROVIDER == "local":
+        return f"local-hashing-{settings.EMBEDDING_DIMENSIONS}"
+    return settings.OPENAI_EMBEDDING_MODEL
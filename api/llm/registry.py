@@ -0,0 +1,105 @@
+from typing import Annotated
+
+import httpx
+
+from fastapi import Depends
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel, BaseLLM
+
+from api.config import settings
+from api.llm.providers import create_chat_model, create_completion_model, create_embeddings, embedding_model_name
+from api.llm.services import EmbeddingBatcher, EmbeddingCacheService
+
+
+class LLMClientRegistry:
+    """
+    Process-wide holder of the chat, completion and embedding clients.
+
+    The backends come from LLM_PROVIDER / EMBEDDING_PROVIDER, see
+    api.llm.providers.
+
+    All clients share one sync and one async httpx client, so keep-alive
+    connections (and their TLS sessions) to the OpenAI API are reused across
+    requests instead of being rebuilt for every ChatBotAI / FlightServices.
+    """
+
+    def __init__(self):
+        self._http_client: httpx.Client | None = None
+        self._http_async_client: httpx.AsyncClient | None = None
+        self._chat_model: BaseChatModel | None = None
+        self._completion_model: BaseLLM | None = None
+        self._embeddings: Embeddings | None = None
+        self._embedding_cache: EmbeddingCacheService | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._http_client is not None
+
+    def startup(self):
+        if self.started:
+            return
+
+        limits = httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(settings.OPENAI_REQUEST_TIMEOUT)
+        self._http_client = httpx.Client(limits=limits, timeout=timeout)
+        self._http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+
+        self._chat_model = create_chat_model(self._http_client, self._http_async_client)
+        self._completion_model = create_completion_model(self._http_client, self._http_async_client)
+        self._embeddings = create_embeddings(self._http_client, self._http_async_client)
+        self._embedding_cache = EmbeddingCacheService(
+            embeddings=self._embeddings,
+            model_name=embedding_model_name(),
+            batcher=EmbeddingBatcher(
+                embeddings=self._embeddings,
+                window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            ),
+        )
+
+    async def shutdown(self):
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+        if self._http_client is not None:
+            self._http_client.close()
+
+        self._http_client = None
+        self._http_async_client = None
+        self._chat_model = None
+        self._completion_model = None
+        self._embeddings = None
+        self._embedding_cache = None
+
+    @property
+    def chat_model(self) -> BaseChatModel:
+        self.startup()
+        return self._chat_model
+
+    @property
+    def completion_model(self) -> BaseLLM:
+        self.startup()
+        return self._completion_model
+
+    @property
+    def embeddings(self) -> Embeddings:
+        self.startup()
+        return self._embeddings
+
+    @property
+    def embedding_cache(self) -> EmbeddingCacheService:
+        self.startup()
+        return self._embedding_cache
+
+
+llm_registry = LLMClientRegistry()
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    return llm_registry
+
+
+LLMRegistry = Annotated[LLMClientRegistry, Depends(get_llm_registry)]
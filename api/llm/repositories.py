@@ -0,0 +1,57 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy import select, update, delete, func, desc, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from api.llm.interface import EmbeddingCacheInterface
+from api.llm.models import embedding_cache
+
+
+class EmbeddingCacheRepository(EmbeddingCacheInterface):
+    async def get_embedding(self, conn: AsyncConnection, model: str, text_hash: str) -> list[float] | None:
+        # lookup dan update last_used_at dalam satu round trip
+        stmt = (
+            update(embedding_cache)
+            .where(
+                embedding_cache.c.model == model,
+                embedding_cache.c.text_hash == text_hash,
+            )
+            .values(last_used_at=func.now())
+            .returning(embedding_cache.c.embedding)
+        )
+        try:
+            result = await conn.execute(statement=stmt)
+            row = result.first()
+            await conn.commit()
+        except Exception as e:
+            raise e
+
+        return None if row is None else [float(value) for value in row.embedding]
+
+    async def save_embedding(self, conn: AsyncConnection, model: str, text_hash: str, embedding: list[float]):
+        stmt = (
+            insert(embedding_cache)
+            .values(model=model, text_hash=text_hash, embedding=embedding)
+            .on_conflict_do_nothing(index_elements=["model", "text_hash"])
+        )
+        try:
+            await conn.execute(statement=stmt)
+            await conn.commit()
+        except Exception as e:
+            raise e
+
+    async def prune(self, conn: AsyncConnection, max_rows: int) -> int:
+        # hapus entry yang paling lama tidak dipakai di luar batas max_rows
+        stale = (
+            select(embedding_cache.c.model, embedding_cache.c.text_hash)
+            .order_by(desc(embedding_cache.c.last_used_at))
+            .offset(max_rows)
+        )
+        stmt = delete(embedding_cache).where(
+            tuple_(embedding_cache.c.model, embedding_cache.c.text_hash).in_(stale)
+        )
+        try:
+            result = await conn.execute(statement=stmt)
+            await conn.commit()
+        except Exception as e:
+            raise e
+        return result.rowcount
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import logging
+import re
+
+from langchain_core.embeddings import Embeddings
+
+from api.config import settings
+from api.database.client import engine
+from api.helpers.cache import LRUCache
+from api.llm.repositories import EmbeddingCacheRepository
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent `aembed_query` calls into batched embedding requests.
+
+    Queries arriving within `window_ms` of the first pending one (or until
+    `max_batch_size` is reached) are sent as one `aembed_documents` call and
+    the vectors are fanned back out to the waiting callers. Nothing here
+    blocks the event loop.
+    """
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            window_ms: float,
+            max_batch_size: int,
+        ):
+        self.embeddings = embeddings
+        self.window = window_ms / 1000
+        self.max_batch_size = max(max_batch_size, 1)
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.queries = 0
+
+    async def aembed_query(self, text: str) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.queries += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._embed_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _embed_batch(self, batch: list[tuple[str, asyncio.Future]]):
+        # teks yang sama dalam satu window cukup di-embed sekali
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        try:
+            vectors = await self.embeddings.aembed_documents(texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "mean_batch_size": round(self.queries / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class EmbeddingCacheService:
+    """
+    Two-tier cache in front of `Embeddings.aembed_query`.
+
+    Tier 1 is an in-process LRU, tier 2 is the `embedding_cache` table, both
+    keyed by (model, sha256 of the normalized text). A question that was
+    embedded before, by this process or any other, never reaches the
+    embeddings API again.
+    """
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            model_name: str,
+            batcher: EmbeddingBatcher | None = None,
+            cache_repo: EmbeddingCacheRepository | None = None,
+        ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.batcher = batcher
+        self.__cache_repo = cache_repo or EmbeddingCacheRepository()
+        self.memory = LRUCache(maxsize=settings.EMBEDDING_CACHE_MAX_ITEMS)
+        self.db_enabled = settings.EMBEDDING_CACHE_DB_ENABLED
+        self.db_hits = 0
+        self.misses = 0
+        self._db_writes = 0
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = (self.model_name, hash_text(text))
+
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached
+
+        cached = await self._get_from_db(key)
+        if cached is not None:
+            self.db_hits += 1
+            self.memory.set(key, cached)
+            return cached
+
+        self.misses += 1
+        vector = await self._embed(text)
+        self.memory.set(key, vector)
+        await self._save_to_db(key, vector)
+        return vector
+
+    async def _embed(self, text: str) -> list[float]:
+        if self.batcher is not None:
+            return await self.batcher.aembed_query(text)
+        return await self.embeddings.aembed_query(text)
+
+    async def _get_from_db(self, key: tuple[str, str]) -> list[float] | None:
+        if not self.db_enabled:
+            return None
+        model, text_hash = key
+        try:
+            async with engine.connect() as conn:
+                return await self.__cache_repo.get_embedding(conn=conn, model=model, text_hash=text_hash)
+        except Exception as e:
+            logging.warning(f"Embedding cache lookup failed, falling back to API: {e}")
+            return None
+
+    async def _save_to_db(self, key: tuple[str, str], vector: list[float]):
+        if not self.db_enabled:
+            return
+        model, text_hash = key
+        try:
+            async with engine.connect() as conn:
+                await self.__cache_repo.save_embedding(
+                    conn=conn, model=model, text_hash=text_hash, embedding=vector
+                )
+                self._db_writes += 1
+                if self._db_writes % settings.EMBEDDING_CACHE_DB_PRUNE_EVERY == 0:
+                    pruned = await self.__cache_repo.prune(conn=conn, max_rows=settings.EMBEDDING_CACHE_DB_MAX_ROWS)
+                    logging.info(f"Pruned {pruned} rows from embedding_cache")
+        except Exception as e:
+            logging.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> dict:
+        memory_stats = self.memory.stats()
+        lookups = memory_stats["hits"] + self.db_hits + self.misses
+        return {
+            "model": self.model_name,
+            "memory": memory_stats,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((memory_stats["hits"] + self.db_hits) / lookups, 4) if lookups else 0.0,
+            "batching": self.batcher.stats() if self.batcher is not None else None,
+        }
@@ -0,0 +1,84 @@
+"""
+Per-request LLM client setup cost, before and after the shared registry.
+
+    python -m benchmarks.bench_client_setup --iterations 200
+    python -m benchmarks.bench_client_setup --iterations 20 --network
+
+"before" rebuilds OpenAI / init_chat_model / OpenAIEmbeddings the way every
+request used to. "after" builds ChatBotAI and FlightServices on top of the
+started process-wide registry. With --network each iteration also sends one
+embedding request, so the TLS handshake of a fresh client shows up in the
+numbers (needs a valid OPENAI_API_KEY).
+"""
+import argparse
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from langchain.chat_models import init_chat_model
+from langchain_openai import OpenAI, OpenAIEmbeddings
+
+from api.config import settings
+from api.conversations.schemas import APIMessageParams
+from api.conversations.services import ChatBotAI
+from api.flights.repositories import FlightRepositories
+from api.flights.services import FlightServices
+from api.llm.registry import LLMClientRegistry
+
+
+def per_request_clients(network: bool):
+    OpenAI(temperature=0)
+    init_chat_model(model=settings.OPENAI_CHAT_MODEL, model_provider="openai", stream_usage=True)
+    embeddings = OpenAIEmbeddings(model=settings.OPENAI_EMBEDDING_MODEL)
+    if network:
+        embeddings.embed_query("tiket jakarta bali")
+
+
+def shared_clients(registry: LLMClientRegistry, network: bool):
+    params = APIMessageParams(message="tiket jakarta bali")
+    chatbot = ChatBotAI(params=params, registry=registry)
+    FlightServices(flights_repo=FlightRepositories(), registry=registry)
+    if network:
+        chatbot.embeddings.embed_query(params.message)
+
+
+def measure(fn, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(
+        f"{label:<8} mean={statistics.mean(timings):8.3f}ms "
+        f"p50={statistics.median(timings):8.3f}ms p95={p95:8.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--network", action="store_true", help="also send one embedding request per iteration")
+    args = parser.parse_args()
+
+    registry = LLMClientRegistry()
+    registry.startup()
+
+    # warm imports and lazy module state so the first sample is not an outlier
+    per_request_clients(network=False)
+    shared_clients(registry, network=False)
+
+    report("before", measure(lambda: per_request_clients(args.network), args.iterations))
+    report("after", measure(lambda: shared_clients(registry, args.network), args.iterations))
+
+
+if __name__ == "__main__":
+    main()
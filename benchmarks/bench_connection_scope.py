@@ -0,0 +1,117 @@
+"""
+Concurrent conversation turns: request-scoped vs phase-scoped connections.
+
+    python -m benchmarks.bench_connection_scope --turns 200 --llm-latency 1.0
+
+Every simulated turn has the shape of the conversation pipeline: short DB
+phases (conversation lookup, history, SQL execution, message flush)
+separated by LLM calls (intent, SQL, report). The LLM calls are simulated
+with `asyncio.sleep`, the DB phases run `pg_sleep` on the app's engine, so
+the pool is the one configured through DB_POOL_SIZE / DB_MAX_OVERFLOW /
+DB_POOL_TIMEOUT.
+
+"request" holds one connection for the whole turn, like the old
+`get_connection` dependency. "phase" checks a connection out per DB phase,
+like ChatBotAI does now. The report shows how many turns were waiting on the
+LLM at the same time; with request scope that number is capped by the pool.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from api.config import settings
+from api.database.client import engine
+
+DB_PHASES = 4
+LLM_CALLS = 3
+
+
+class Gauge:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        self.current -= 1
+
+
+async def db_phase(conn, db_ms: float):
+    await conn.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": db_ms / 1000})
+
+
+async def request_scoped_turn(llm_latency: float, db_ms: float, in_llm: Gauge):
+    async with engine.connect() as conn:
+        for phase in range(DB_PHASES):
+            await db_phase(conn, db_ms)
+            if phase < LLM_CALLS:
+                with in_llm:
+                    await asyncio.sleep(llm_latency)
+
+
+async def phase_scoped_turn(llm_latency: float, db_ms: float, in_llm: Gauge):
+    for phase in range(DB_PHASES):
+        async with engine.connect() as conn:
+            await db_phase(conn, db_ms)
+        if phase < LLM_CALLS:
+            with in_llm:
+                await asyncio.sleep(llm_latency)
+
+
+async def run(label: str, turn, turns: int, llm_latency: float, db_ms: float):
+    in_llm = Gauge()
+    latencies, errors = [], 0
+
+    async def timed():
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            await turn(llm_latency, db_ms, in_llm)
+            latencies.append(time.perf_counter() - start)
+        except PoolTimeoutError:
+            errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(turns)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)] if latencies else 0.0
+    print(
+        f"{label:<8} wall={wall:8.2f}s turns/s={len(latencies) / wall:8.2f} "
+        f"mean={statistics.mean(latencies) if latencies else 0.0:7.2f}s p95={p95:7.2f}s "
+        f"peak_in_llm={in_llm.peak:<5} pool_timeouts={errors}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds per simulated LLM call")
+    parser.add_argument("--db-ms", type=float, default=5.0, help="milliseconds per DB phase")
+    args = parser.parse_args()
+
+    print(
+        f"pool_size={settings.DB_POOL_SIZE} max_overflow={settings.DB_MAX_OVERFLOW} "
+        f"pool_timeout={settings.DB_POOL_TIMEOUT}s turns={args.turns}"
+    )
+    try:
+        await run("request", request_scoped_turn, args.turns, args.llm_latency, args.db_ms)
+        await run("phase", phase_scoped_turn, args.turns, args.llm_latency, args.db_ms)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+"""
+Flights listing latency by page depth: LIMIT/OFFSET vs keyset cursor.
+
+    python -m benchmarks.bench_flight_pagination --rows 1000000 --pages 1 100 1000 10000
+
+A scratch copy of flight_prices (bench_flight_prices) is filled with random
+fares and gets the same indexes as the listing migration. For every depth
+the page is fetched once with OFFSET and once with a keyset cursor pointing
+at the previous page's last row, both through `flight_listing_stmt`,
+unfiltered and filtered on a route. The scratch table is dropped at the end.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import MetaData, text
+
+from api.database.client import engine
+from api.flights.models import flight_price
+from api.flights.repositories import flight_listing_stmt
+from api.flights.schemas import FlightsFilter
+
+BENCH_TABLE = "bench_flight_prices"
+INSERT_BATCH = 100000
+AIRPORT_CODES = ["CGK", "DPS", "SUB", "SIN", "KUL", "BKK"]
+INDEXES = {
+    "valid_from_id": "valid_from, id",
+    "origin_valid_from_id": "origin, valid_from, id",
+    "destination_valid_from_id": "destination, valid_from, id",
+    "route_valid_from_id": "origin, destination, valid_from, id",
+}
+
+bench_table = flight_price.to_metadata(MetaData(), name=BENCH_TABLE)
+
+
+async def prepare(rows: int):
+    codes = "ARRAY[" + ", ".join(f"'{code}'" for code in AIRPORT_CODES) + "]"
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        await conn.execute(text(f"""
+            CREATE TABLE {BENCH_TABLE} (
+                id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+                flight_number varchar(20) NOT NULL,
+                class varchar(20) NOT NULL,
+                base_price numeric(10, 2) NOT NULL,
+                tax numeric(10, 2) NOT NULL,
+                fee numeric(10, 2) NOT NULL,
+                currency varchar(3),
+                valid_from date NOT NULL,
+                valid_to date NOT NULL,
+                origin varchar(3) NOT NULL,
+                destination varchar(3) NOT NULL,
+                created_at timestamptz NOT NULL DEFAULT now(),
+                updated_at timestamptz NOT NULL DEFAULT now()
+            )
+        """))
+
+    for offset in range(0, rows, INSERT_BATCH):
+        batch = min(INSERT_BATCH, rows - offset)
+        async with engine.begin() as conn:
+            await conn.execute(text(f"""
+                INSERT INTO {BENCH_TABLE}
+                    (flight_number, class, base_price, tax, fee, currency, valid_from, valid_to, origin, destination)
+                SELECT
+                    'GA' || (g % 900 + 100),
+                    (ARRAY['economy', 'business', 'first'])[g % 3 + 1],
+                    round((random() * 900 + 50)::numeric, 2),
+                    round((random() * 50)::numeric, 2),
+                    round((random() * 20)::numeric, 2),
+                    'USD',
+                    d,
+                    d + 30,
+                    ({codes})[g % {len(AIRPORT_CODES)} + 1],
+                    ({codes})[(g / {len(AIRPORT_CODES)}) % {len(AIRPORT_CODES)} + 1]
+                FROM generate_series({offset + 1}, {offset + batch}) AS g,
+                    LATERAL (SELECT DATE '2026-01-01' + (random() * 365)::int AS d) AS dates
+            """))
+
+    async with engine.begin() as conn:
+        for name, columns in INDEXES.items():
+            await conn.execute(text(f"CREATE INDEX bench_{name} ON {BENCH_TABLE} ({columns})"))
+        await conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+
+
+async def fetch(stmt) -> list:
+    async with engine.connect() as conn:
+        result = await conn.execute(stmt)
+        return result.mappings().fetchall()
+
+
+async def timed(stmt, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fetch(stmt)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def run_depth(filter: FlightsFilter, page: int, repeat: int) -> tuple[list[float], list[float]] | None:
+    skipped = page * filter.limit
+    offset_stmt = flight_listing_stmt(table=bench_table, filter=filter, after=None, limit=filter.limit).offset(skipped)
+
+    # cursor = row terakhir halaman sebelumnya, diambil di luar pengukuran
+    after = None
+    if skipped:
+        previous = await fetch(flight_listing_stmt(table=bench_table, filter=filter, after=None, limit=1).offset(skipped - 1))
+        if not previous:
+            return None
+        after = (previous[0]["valid_from"], previous[0]["id"])
+    keyset_stmt = flight_listing_stmt(table=bench_table, filter=filter, after=after, limit=filter.limit)
+
+    return await timed(offset_stmt, repeat), await timed(keyset_stmt, repeat)
+
+
+def report(label: str, page: int, name: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(f"{label:<8} page={page:<7} {name:<7} mean={statistics.mean(timings):9.2f}ms p95={p95:9.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    scenarios = {
+        "all": FlightsFilter(limit=args.limit),
+        "route": FlightsFilter(limit=args.limit, origin="CGK", destination="DPS"),
+    }
+    try:
+        print(f"Preparing {args.rows} rows...")
+        await prepare(args.rows)
+        for label, filter in scenarios.items():
+            for page in args.pages:
+                timings = await run_depth(filter, page, args.repeat)
+                if timings is None:
+                    print(f"{label:<8} page={page:<7} past the last row, skipped")
+                    continue
+                report(label, page, "offset", timings[0])
+                report(label, page, "keyset", timings[1])
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Report prompt size: raw RowMapping repr vs the compact result encoder.
+
+    python -m benchmarks.bench_result_encoding --rows 5 50 500
+    python -m benchmarks.bench_result_encoding --rows 50 --with-llm
+
+Rows are synthetic flight_prices rows with the same column types the SQL
+stage returns (Decimal prices, dates). For every size the raw `str(rows)`
+the report prompt used to get is compared with `ResultEncoder` in csv and
+markdown. --with-llm also sends the full report prompt to the configured
+chat model for both encodings and reports the generation latency.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from langchain_core.prompts import PromptTemplate
+
+from api.config import settings
+from api.conversations.prompts import REPORT_PROMPT
+from api.helpers.results import ResultEncoder
+from api.helpers.tokens import count_tokens
+
+AIRPORTS = ["CGK", "DPS", "SUB", "KNO", "UPG", "YIA", "SIN", "KUL", "BKK", "NRT"]
+CLASSES = ["economy", "business", "first"]
+
+
+def make_rows(size: int) -> list[dict]:
+    rng = random.Random(size)
+    rows = []
+    for i in range(size):
+        origin, destination = rng.sample(AIRPORTS, 2)
+        valid_from = date(2026, 1, 1) + timedelta(days=rng.randrange(300))
+        rows.append({
+            "flight_number": f"GA{rng.randrange(100, 999)}",
+            "class": rng.choice(CLASSES),
+            "base_price": Decimal(rng.randrange(500_000, 9_000_000)) + Decimal("0.00"),
+            "tax": Decimal(rng.randrange(50_000, 900_000)) / 100,
+            "fee": Decimal("25000.00"),
+            "currency": "IDR",
+            "valid_from": valid_from,
+            "valid_to": valid_from + timedelta(days=30),
+            "origin": origin,
+            "destination": destination,
+        })
+    return rows
+
+
+async def time_generation(model, prompt: str, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await model.ainvoke(prompt)
+        timings.append(time.perf_counter() - start)
+    return statistics.mean(timings) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[5, 50, 500])
+    parser.add_argument("--max-tokens", type=int, default=settings.REPORT_RESULT_MAX_TOKENS)
+    parser.add_argument("--with-llm", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    model = None
+    if args.with_llm:
+        from api.llm.registry import llm_registry
+        llm_registry.startup()
+        model = llm_registry.chat_model
+
+    template = PromptTemplate.from_template(REPORT_PROMPT)
+    try:
+        for size in args.rows:
+            rows = make_rows(size)
+            encodings = {"raw": str(rows)}
+            for output_format in ResultEncoder.FORMATS:
+                start = time.perf_counter()
+                encoded = ResultEncoder(max_tokens=args.max_tokens, output_format=output_format).encode(rows)
+                encode_ms = (time.perf_counter() - start) * 1000
+                encodings[output_format] = encoded.text
+                print(
+                    f"rows={size:<5} {output_format:<8} tokens={encoded.tokens:<7} "
+                    f"rows_included={encoded.rows_included:<5} encode={encode_ms:7.2f}ms"
+                )
+            print(f"rows={size:<5} {'raw':<8} tokens={count_tokens(encodings['raw']):<7}")
+
+            if model is not None:
+                for label in ("raw", "csv"):
+                    prompt = template.format(question="tiket termurah minggu depan?", result_query=encodings[label])
+                    latency = await time_generation(model, prompt, args.repeats)
+                    print(f"rows={size:<5} {label:<8} prompt_tokens={count_tokens(prompt):<7} generation={latency:8.2f}ms")
+    finally:
+        if model is not None:
+            await llm_registry.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Schema retrieval latency: full-table fetch vs indexed top-k.
+
+    python -m benchmarks.bench_vector_search --sizes 10000 100000 1000000
+
+For every size a scratch copy of langchain_pg_embedding (bench_pg_embedding)
+is filled with random vectors. "legacy" is the old query shape, which pulled
+every row with its embedding into the API process. "topk" is
+`similarity_search_stmt` with the same HNSW expression index the alembic
+migration creates. The scratch table is dropped at the end.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import MetaData, select, text
+
+from api.chatbot.repositories import similarity_search_stmt
+from api.config import settings
+from api.database.client import engine
+from api.langchain_pg.models import langchain_pg_embedding
+
+BENCH_TABLE = "bench_pg_embedding"
+INSERT_BATCH = 10000
+
+bench_table = langchain_pg_embedding.to_metadata(MetaData(), name=BENCH_TABLE)
+
+
+async def prepare(size: int, dimensions: int):
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        await conn.execute(text(f"""
+            CREATE TABLE {BENCH_TABLE} (
+                uuid uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+                collection_id uuid,
+                embedding vector,
+                document text,
+                cmetadata jsonb,
+                custom_id text
+            )
+        """))
+
+    for offset in range(0, size, INSERT_BATCH):
+        batch = min(INSERT_BATCH, size - offset)
+        async with engine.begin() as conn:
+            await conn.execute(text(f"""
+                INSERT INTO {BENCH_TABLE} (embedding, document, cmetadata)
+                SELECT
+                    (SELECT array_agg(random() + g * 0) FROM generate_series(1, {dimensions}))::vector,
+                    'document ' || g,
+                    jsonb_build_object('n', g)
+                FROM generate_series({offset + 1}, {offset + batch}) AS g
+            """))
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"""
+            CREATE INDEX ON {BENCH_TABLE}
+            USING hnsw ((embedding::vector({dimensions})) vector_cosine_ops)
+        """))
+        await conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+
+
+async def run_legacy(vector: list[float]) -> int:
+    stmt = select(
+        bench_table.c.embedding,
+        bench_table.c.document,
+        (1 - bench_table.c.embedding.cosine_distance(vector)).label("similarity_score"),
+    )
+    async with engine.connect() as conn:
+        result = await conn.execute(stmt)
+        return len(result.mappings().fetchall())
+
+
+async def run_topk(vector: list[float], limit: int) -> int:
+    stmt = similarity_search_stmt(table=bench_table, message=vector, similarity_threshold=-1.0, limit=limit)
+    async with engine.connect() as conn:
+        result = await conn.execute(stmt)
+        return len(result.mappings().fetchall())
+
+
+async def measure(fn, queries: int, dimensions: int) -> tuple[list[float], int]:
+    timings, rows = [], 0
+    for _ in range(queries):
+        vector = [random.random() for _ in range(dimensions)]
+        start = time.perf_counter()
+        rows = await fn(vector)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, rows
+
+
+def report(size: int, label: str, timings: list[float], rows: int):
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(
+        f"rows={size:<9} {label:<7} mean={statistics.mean(timings):10.2f}ms "
+        f"p95={p95:10.2f}ms rows_returned={rows}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--skip-legacy-above", type=int, default=200000,
+                        help="the legacy query ships every vector, skip it for larger tables")
+    args = parser.parse_args()
+    dimensions = settings.EMBEDDING_DIMENSIONS
+
+    try:
+        for size in args.sizes:
+            print(f"Preparing {size} rows...")
+            await prepare(size, dimensions)
+            if size <= args.skip_legacy_above:
+                timings, rows = await measure(run_legacy, max(args.queries // 4, 1), dimensions)
+                report(size, "legacy", timings, rows)
+            timings, rows = await measure(lambda vector: run_topk(vector, args.limit), args.queries, dimensions)
+            report(size, "topk", timings, rows)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,302 @@
+"""
+End-to-end HTTP load test for main:app.
+
+    python -m benchmarks.load_test --spawn --duration 60 --concurrency 32 --output runs/$(git rev-parse --short HEAD).json
+
+Drives three operations against a running app:
+
+    new        POST /api/v1/conversations/ without conversation_id
+    follow_up  POST /api/v1/conversations/ on a conversation started earlier
+    flights    GET  /api/v1/flights/ with random filters, following next_cursor
+
+Closed loop (default): `--concurrency` workers send back to back. Open loop
+(`--rate N`): Poisson arrivals at N requests/s, at most `--concurrency` in
+flight, and latency is measured from the scheduled arrival so a slow server
+cannot hide its queueing delay.
+
+`--spawn` starts uvicorn with LLM_PROVIDER=local / EMBEDDING_PROVIDER=local,
+so only a local Postgres (migrated, with airports and fares) is needed.
+Throughput, p50/p95/p99 latency and error rates per operation go to the
+JSON file together with the git commit, so runs can be compared.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+NEW_QUESTIONS = [
+    "tiket dari Jakarta ke Bali besok",
+    "penerbangan termurah CGK ke DPS",
+    "cheapest flight from Singapore to Kuala Lumpur",
+    "tiket bisnis Surabaya ke Jakarta",
+    "ada penerbangan ke Bangkok minggu depan?",
+    "berapa harga tiket ke Singapura?",
+]
+FOLLOW_UPS = [
+    "yang paling murah?",
+    "kalau kelas bisnis?",
+    "bagaimana dengan lusa?",
+    "yang paling mahal berapa?",
+    "ada yang dari Surabaya?",
+]
+AIRPORT_CODES = ["CGK", "DPS", "SUB", "SIN", "KUL", "BKK"]
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, mix: dict[str, float], max_turns: int):
+        self.client = client
+        self.mix = mix
+        self.max_turns = max_turns
+        self.conversations: dict[str, int] = {}
+        self.cursors: list[str] = []
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+        self.errors: dict[str, Counter] = defaultdict(Counter)
+
+    def pick(self) -> str:
+        operation = random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if operation == "follow_up" and not self.conversations:
+            return "new"
+        return operation
+
+    async def run_one(self, operation: str, started_at: float | None = None):
+        started_at = started_at or time.perf_counter()
+        try:
+            status = await getattr(self, f"_{operation}")()
+            self.statuses[operation][status] += 1
+            if status >= 400:
+                self.errors[operation][f"http_{status}"] += 1
+        except httpx.HTTPError as e:
+            self.errors[operation][type(e).__name__] += 1
+        self.latencies[operation].append((time.perf_counter() - started_at) * 1000)
+
+    async def _converse(self, message: str, conversation_id: str = "") -> int:
+        response = await self.client.post(
+            "/api/v1/conversations/",
+            json={"message": message, "conversation_id": conversation_id},
+        )
+        if response.status_code < 400:
+            new_id = response.json()["resp"]["conversation_id"]
+            self.conversations[new_id] = self.conversations.get(new_id, 0) + 1
+            if self.conversations[new_id] >= self.max_turns:
+                self.conversations.pop(new_id, None)
+        return response.status_code
+
+    async def _new(self) -> int:
+        return await self._converse(random.choice(NEW_QUESTIONS))
+
+    async def _follow_up(self) -> int:
+        conversation_id = random.choice(list(self.conversations)) if self.conversations else ""
+        return await self._converse(random.choice(FOLLOW_UPS), conversation_id)
+
+    async def _flights(self) -> int:
+        params = {"limit": 20}
+        if self.cursors and random.random() < 0.5:
+            params["cursor"] = self.cursors.pop()
+        elif random.random() < 0.5:
+            params["origin"] = random.choice(AIRPORT_CODES)
+        response = await self.client.get("/api/v1/flights/", params=params)
+        if response.status_code < 400:
+            next_cursor = response.json().get("next_cursor")
+            if next_cursor and len(self.cursors) < 1000:
+                self.cursors.append(next_cursor)
+        return response.status_code
+
+    async def closed_loop(self, concurrency: int, deadline: float):
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self.run_one(self.pick())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def open_loop(self, rate: float, concurrency: int, deadline: float):
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = set()
+
+        async def request(operation: str, arrival: float):
+            async with semaphore:
+                await self.run_one(operation, started_at=arrival)
+
+        next_arrival = time.perf_counter()
+        while next_arrival < deadline:
+            await asyncio.sleep(max(next_arrival - time.perf_counter(), 0))
+            task = asyncio.create_task(request(self.pick(), next_arrival))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            next_arrival += random.expovariate(rate)
+        await asyncio.gather(*tasks)
+
+    def summary(self, elapsed: float) -> dict:
+        operations = {}
+        for operation in sorted(self.latencies):
+            operations[operation] = self._stats(self.latencies[operation], self.errors[operation], elapsed)
+            operations[operation]["status_counts"] = {str(code): count for code, count in self.statuses[operation].items()}
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        all_errors = sum((errors for errors in self.errors.values()), Counter())
+        return {"total": self._stats(all_latencies, all_errors, elapsed), "operations": operations}
+
+    @staticmethod
+    def _stats(latencies: list[float], errors: Counter, elapsed: float) -> dict:
+        requests = len(latencies)
+        error_count = sum(errors.values())
+        return {
+            "requests": requests,
+            "errors": error_count,
+            "error_rate": round(error_count / requests, 4) if requests else 0.0,
+            "error_types": dict(errors),
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(statistics.mean(latencies), 2) if latencies else 0.0,
+                "p50": round(percentile(latencies, 50), 2),
+                "p95": round(percentile(latencies, 95), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "max": round(max(latencies), 2) if latencies else 0.0,
+            },
+        }
+
+
+def git_revision() -> dict:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def spawn_app(host: str, port: int, llm_latency_ms: float, embedding_latency_ms: float) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "LLM_PROVIDER": "local",
+        "EMBEDDING_PROVIDER": "local",
+        "LOCAL_LLM_LATENCY_MS": str(llm_latency_ms),
+        "LOCAL_EMBEDDING_LATENCY_MS": str(embedding_latency_ms),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", host, "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if time.perf_counter() > deadline:
+            raise RuntimeError("App did not become healthy in time")
+        await asyncio.sleep(0.5)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("new", "follow_up", "flights"):
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8088")
+    parser.add_argument("--spawn", action="store_true", help="start uvicorn main:app with local model providers")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="only with --spawn")
+    parser.add_argument("--embedding-latency-ms", type=float, default=50.0, help="only with --spawn")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of unmeasured load first")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=0.0, help="open loop arrivals per second, 0 = closed loop")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("new=1,follow_up=2,flights=2"))
+    parser.add_argument("--max-turns", type=int, default=5, help="turns per conversation before it is retired")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0, help="fixed seed keeps the request mix comparable across runs")
+    parser.add_argument("--output", default="load_test.json")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    url = httpx.URL(args.base_url)
+    app = spawn_app(url.host, url.port or 80, args.llm_latency_ms, args.embedding_latency_ms) if args.spawn else None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            await wait_until_healthy(client, timeout=60.0 if app else 5.0)
+
+            async def run(seconds: float) -> tuple[LoadTest, float]:
+                load = LoadTest(client, mix=args.mix, max_turns=args.max_turns)
+                start = time.perf_counter()
+                if args.rate > 0:
+                    await load.open_loop(args.rate, args.concurrency, start + seconds)
+                else:
+                    await load.closed_loop(args.concurrency, start + seconds)
+                return load, time.perf_counter() - start
+
+            if args.warmup > 0:
+                await run(args.warmup)
+            load, elapsed = await run(args.duration)
+    finally:
+        if app is not None:
+            app.terminate()
+            app.wait(timeout=30)
+
+    result = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision(),
+        "config": {
+            "base_url": args.base_url,
+            "spawned": args.spawn,
+            "llm_latency_ms": args.llm_latency_ms if args.spawn else None,
+            "embedding_latency_ms": args.embedding_latency_ms if args.spawn else None,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "rate": args.rate or None,
+            "mix": args.mix,
+            "max_turns": args.max_turns,
+            "seed": args.seed,
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        **load.summary(elapsed),
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+
+    total = result["total"]
+    print(
+        f"{total['requests']} requests in {elapsed:.1f}s: {total['throughput_rps']} req/s, "
+        f"p50={total['latency_ms']['p50']}ms p95={total['latency_ms']['p95']}ms "
+        f"p99={total['latency_ms']['p99']}ms errors={total['error_rate']:.2%}"
+    )
+    for operation, stats in result["operations"].items():
+        print(
+            f"  {operation:<10} {stats['requests']:>6} req {stats['throughput_rps']:>8} req/s "
+            f"p50={stats['latency_ms']['p50']}ms p95={stats['latency_ms']['p95']}ms "
+            f"p99={stats['latency_ms']['p99']}ms errors={stats['error_rate']:.2%}"
+        )
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
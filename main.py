@@ -1,18 +1,69 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from dotenv import load_dotenv
 
+from api.chatbot.context import schema_context_cache
 from api.chatbot.views import chat_router
+from api.config import settings
+from api.flights.fares import fare_view
+from api.flights.fx import fx_rates
+from api.flights.gazetteer import airport_gazetteer
 from api.flights.views import flights_router
+from api.helpers.metrics import MetricsMiddleware, metrics_endpoint
+from api.conversations.caches import semantic_cache
+from api.conversations.summary import conversation_summarizer
 from api.conversations.views import conversation_router
+from api.llm.registry import llm_registry
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    llm_registry.startup()
+    await semantic_cache.check_dimensions()
+    await schema_context_cache.refresh_safely()
+    await airport_gazetteer.refresh_safely()
+    if settings.FX_RATES_FILE:
+        try:
+            await fx_rates.load_file(settings.FX_RATES_FILE)
+        except Exception as e:
+            logging.warning(f"Loading FX rates from {settings.FX_RATES_FILE} failed: {e}")
+    await fx_rates.refresh_safely()
+    await fare_view.refresh_safely()
+    schema_refresher = asyncio.create_task(
+        schema_context_cache.refresh_periodically(settings.SCHEMA_CONTEXT_REFRESH_SECONDS)
+    )
+    airport_refresher = asyncio.create_task(
+        airport_gazetteer.refresh_periodically(settings.AIRPORT_GAZETTEER_REFRESH_SECONDS)
+    )
+    fx_refresher = asyncio.create_task(
+        fx_rates.refresh_periodically(settings.FX_REFRESH_SECONDS)
+    )
+    fare_refresher = asyncio.create_task(
+        fare_view.refresh_periodically(settings.FARE_VIEW_REFRESH_SECONDS)
+    )
+    yield
+    schema_refresher.cancel()
+    airport_refresher.cancel()
+    fx_refresher.cancel()
+    fare_refresher.cancel()
+    await conversation_summarizer.aclose()
+    await llm_registry.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 # app.include_router(chat_router)
 app.include_router(flights_router)
 app.include_router(conversation_router)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 @app.get("/health")
 def health_check():
-    return "Health Chek is success"
\ No newline at end of file
+    return "Health Chek is success"
@@ -0,0 +1,13 @@
+import os
+
+# Settings() wajib punya koneksi DB; test tidak pernah membuka koneksi
+for name, value in {
+    "APP_NAME": "test",
+    "SECRET_KEY": "test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+}.items():
+    os.environ.setdefault(name, value)
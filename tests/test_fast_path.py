@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from api.conversations.fast_path import FastPathRouter
+from api.flights.fx import FXRateCache
+from api.flights.gazetteer import AirportGazetteer
+
+TODAY = date(2026, 10, 18)
+AIRPORTS = [
+    {"code": "CGK", "name": "Soekarno-Hatta International Airport", "city": "Jakarta", "country": "Indonesia"},
+    {"code": "DPS", "name": "Ngurah Rai International Airport", "city": "Denpasar", "country": "Indonesia"},
+    {"code": "MLG", "name": "Abdul Rachman Saleh Airport", "city": "Malang", "country": "Indonesia"},
+    {"code": "BDO", "name": "Husein Sastranegara International Airport", "city": "Bandung", "country": "Indonesia"},
+    {"code": "SIN", "name": "Changi Airport", "city": "Singapore", "country": "Singapore"},
+    {"code": "ADA", "name": "Adana Sakirpasa Airport", "city": "Adana", "country": "Turkey"},
+]
+
+
+@pytest.fixture
+def fx():
+    return FXRateCache(base_currency="USD")
+
+
+@pytest.fixture
+def router(fx):
+    gazetteer = AirportGazetteer()
+    gazetteer.build(AIRPORTS)
+    return FastPathRouter(enabled=True, result_limit=20, gazetteer=gazetteer, fx=fx)
+
+
+def test_route_question_is_parsed(router):
+    query = router.match("tiket dari jakarta ke bali termurah", conversation_id="", today=TODAY)
+
+    assert query.origins == ("CGK",)
+    assert query.destinations == ("DPS",)
+    assert query.sort == "cheapest"
+
+
+def test_unrated_currency_sends_question_to_llm(router, fx):
+    fx.unrated_currencies = ["SGD"]
+
+    assert router.match("tiket dari jakarta ke singapore termurah", conversation_id="", today=TODAY) is None
+    assert router.stats()["unrated_currency_skips"] == 1
+
+
+def test_misspelled_place_after_marker_is_corrected(router):
+    query = router.match("tiket dari jakarta ke denpsar", conversation_id="", today=TODAY)
+
+    assert query.destinations == ("DPS",)
+
+
+@pytest.mark.parametrize("question", [
+    "tiket ke bali malam",
+    "tiket balik ke bali",
+    "tiket ke bali jam 10.30",
+    "tiket ke bali dan singapore",
+    "tiket dari jakarta ke bali atau singapore",
+])
+def test_unknown_words_go_to_llm(router, question):
+    assert router.match(question, conversation_id="", today=TODAY) is None
+
+
+def test_place_qualifier_keeps_marker(router):
+    query = router.match("tiket dari bandara jakarta ke kota bandung", conversation_id="", today=TODAY)
+
+    assert query.origins == ("CGK",)
+    assert query.destinations == ("BDO",)
+
+
+def test_dotted_date_needs_year(router):
+    query = router.match("tiket ke bali tanggal 7.11.2026", conversation_id="", today=TODAY)
+
+    assert query.travel_date == date(2026, 11, 7)
+
+
+def test_filler_word_is_not_read_as_airport_code(router):
+    query = router.match("tiket ke bali yang ada", conversation_id="", today=TODAY)
+
+    assert query.origins == ()
+    assert query.destinations == ("DPS",)
+
+
+def test_airport_code_needs_uppercase(router):
+    query = router.match("tiket dari CGK ke DPS", conversation_id="", today=TODAY)
+
+    assert (query.origins, query.destinations) == (("CGK",), ("DPS",))
+    assert router.match("tiket dari cgk ke bali", conversation_id="", today=TODAY) is None
+
+
+def test_unmarked_places_read_as_route(router):
+    query = router.match("tiket jakarta bali", conversation_id="", today=TODAY)
+
+    assert (query.origins, query.destinations) == (("CGK",), ("DPS",))
@@ -0,0 +1,52 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from decimal import Decimal
+
+import pytest
+
+import api.flights.fx as fx
+from api.flights.fx import FXRateCache
+
+
+class FakeEngine:
+    @asynccontextmanager
+    async def connect(self):
+        yield None
+
+    begin = connect
+
+
+class FakeFlightsRepository:
+    def __init__(self):
+        self.rates = {"USD": Decimal("1.00000000")}
+        self.writes: list[list[str]] = []
+
+    async def get_fx_rates(self, conn):
+        return [{"currency": currency, "base_currency": "USD", "rate_to_base": rate} for currency, rate in self.rates.items()]
+
+    async def upsert_fx_rates(self, conn, rows: list[dict]):
+        self.writes.append(sorted(row["currency"] for row in rows))
+        self.rates.update({row["currency"]: row["rate_to_base"] for row in rows})
+
+    async def get_fare_source_version(self, conn) -> int:
+        return 1
+
+    async def get_unrated_currencies(self, conn) -> list[str]:
+        return []
+
+
+@pytest.fixture(autouse=True)
+def fake_engine(monkeypatch):
+    monkeypatch.setattr(fx, "engine", FakeEngine())
+
+
+def test_reloading_unchanged_rates_file_writes_nothing(tmp_path):
+    rates_file = tmp_path / "rates.json"
+    rates_file.write_text(json.dumps({"base": "SGD", "rates": {"USD": 1.35, "MYR": 3.3}}))
+    repo = FakeFlightsRepository()
+    cache = FXRateCache(base_currency="USD", flights_repo=repo)
+
+    assert asyncio.run(cache.load_file(rates_file)) == 2
+    assert asyncio.run(cache.load_file(rates_file)) == 0
+    assert repo.writes == [["MYR", "SGD"]]
@@ -0,0 +1,39 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+import api.conversations.caches as caches
+from api.conversations.caches import SemanticAnswerCache
+
+
+class FakeEngine:
+    @asynccontextmanager
+    async def connect(self):
+        yield None
+
+
+class FakeCacheRepository:
+    def __init__(self, dimensions: int | None):
+        self.dimensions = dimensions
+
+    async def get_embedding_dimensions(self, conn) -> int | None:
+        return self.dimensions
+
+
+@pytest.fixture(autouse=True)
+def fake_engine(monkeypatch):
+    monkeypatch.setattr(caches, "engine", FakeEngine())
+
+
+@pytest.mark.parametrize("column_dimensions, enabled", [(1536, True), (384, False), (None, False)])
+def test_check_dimensions_disables_cache_on_mismatch(column_dimensions, enabled):
+    cache = SemanticAnswerCache(
+        enabled=True,
+        similarity_threshold=0.95,
+        dimensions=1536,
+        cache_repo=FakeCacheRepository(column_dimensions),
+    )
+
+    assert asyncio.run(cache.check_dimensions()) is enabled
+    assert cache.enabled is enabled
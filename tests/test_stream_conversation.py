@@ -0,0 +1,99 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+import api.conversations.services as services
+from api.conversations.history import history_cache
+from api.conversations.models import MessageTypeEnum
+from api.conversations.schemas import APIMessageParams
+from api.database.executor import QueryResult
+from api.llm.local import ChatScript, ScriptedChatModel, ScriptedLLM
+
+
+class FakeEngine:
+    @asynccontextmanager
+    async def connect(self):
+        yield None
+
+
+class FakeRegistry:
+    def __init__(self):
+        script = ChatScript(sql="SELECT 1")
+        self.chat_model = ScriptedChatModel(script=script)
+        self.completion_model = ScriptedLLM(script=script)
+        self.embedding_cache = None
+
+
+class DisabledAnswerCache:
+    enabled = False
+
+
+class PrebuiltSchemaContext:
+    covers_store = True
+    context = "flight_fares(origin, destination, total_price)"
+    context_version = "test"
+
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    async def execute_query(self, sql_query):
+        return QueryResult(rows=[{"flight_number": "GA100", "total_price": 120}])
+
+    monkeypatch.setattr(services, "engine", FakeEngine())
+    monkeypatch.setattr(services.ChatBotAI, "execute_query", execute_query)
+    return services.ChatBotAI(
+        APIMessageParams(message="halo, apa kabar?", conversation_id=""),
+        registry=FakeRegistry(),
+        answer_cache=DisabledAnswerCache(),
+        schema_context=PrebuiltSchemaContext(),
+    )
+
+
+def stream(chatbot) -> list[str]:
+    async def collect():
+        return [event async for event in chatbot.stream_conversation()]
+    return asyncio.run(collect())
+
+
+def test_streamed_turn_saves_question_and_answer_once(chatbot, monkeypatch):
+    monkeypatch.setattr(services.settings, "CONVERSATION_WRITES_AFTER_RESPONSE", True)
+
+    events = stream(chatbot)
+
+    assert events[-1].startswith("event: done")
+    saved = chatbot.unit_of_work.pending_messages(chatbot.conversation_id)
+    assert [payload.message_type for payload in saved] == [MessageTypeEnum.question, MessageTypeEnum.answer]
+    assert saved[1].content == chatbot.streamed_content
+    assert [message.type for message in history_cache.get(chatbot.conversation_id)] == ["human", "ai"]
+
+
+def test_streamed_error_answer_is_saved_once(chatbot, monkeypatch):
+    async def failing_query(self, sql_query):
+        raise services.SQLExecutionError("relation does not exist")
+
+    monkeypatch.setattr(services.settings, "CONVERSATION_WRITES_AFTER_RESPONSE", True)
+    monkeypatch.setattr(services.ChatBotAI, "execute_query", failing_query)
+
+    stream(chatbot)
+
+    saved = chatbot.unit_of_work.pending_messages(chatbot.conversation_id)
+    assert [payload.message_type for payload in saved] == [MessageTypeEnum.question, MessageTypeEnum.answer]
+    assert [message.type for message in history_cache.get(chatbot.conversation_id)] == ["human", "ai"]
+
+
+def test_second_flush_is_a_no_op(chatbot, monkeypatch):
+    refreshed = []
+
+    async def flush():
+        chatbot.unit_of_work._conversation, chatbot.unit_of_work._messages = None, []
+
+    monkeypatch.setattr(services.settings, "CONVERSATION_WRITES_AFTER_RESPONSE", True)
+    monkeypatch.setattr(chatbot.unit_of_work, "flush", flush)
+    monkeypatch.setattr(chatbot.summarizer, "maybe_refresh", refreshed.append)
+    stream(chatbot)
+
+    asyncio.run(chatbot.flush_writes())
+    asyncio.run(chatbot.flush_writes())
+
+    assert refreshed == [chatbot.conversation_id]